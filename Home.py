@@ -1,7 +1,8 @@
 # python -m streamlit run Home.py
 
 import streamlit as st
-from utils.sessao import inicializar_app
+from utils.desempenho import mostrar_painel_desempenho
+from utils.sessao import inicializar_app, mostrar_preaquecimento
 
 inicializar_app()
 
@@ -20,4 +21,14 @@ Use a barra lateral para configurar os caminhos dos arquivos ou para navegar pel
 - `prodMercado.csv` (cadastro de produtos)
 
 Caso seus arquivos estejam em outro local, ajuste os caminhos na barra lateral para carregá-los corretamente.
+O caminho de vendas também pode ser um diretório com várias exportações CSV (por exemplo, uma por dia)
+ou um padrão como `dados/vendas_2024-*.csv`: os arquivos são lidos em paralelo e novos arquivos são
+anexados sem recarregar os anteriores.
+
+Origens de vendas muito grandes (acima de 1 GB) são lidas em blocos, mantendo em memória apenas as
+tabelas agregadas; nesse caso, a página com as vendas item a item (Original) fica indisponível.
 """)
+
+# Progresso da preparação dos dados, feita em segundo plano desde a inicialização
+mostrar_painel_desempenho()
+mostrar_preaquecimento()
@@ -0,0 +1,58 @@
+# python -m benchmarks.bench_agrupamento [num_linhas]
+
+import sys
+import time
+import pandas as pd
+from benchmarks.gerador import gerar_df_vendas
+from utils.carregamento import adicionar_colunas_temporais, agrupar_vendas_por_controle
+
+def agrupar_com_groupby(df: pd.DataFrame) -> pd.DataFrame:
+    """Implementação anterior: um "first" por coluna de cabeçalho."""
+    return (
+        df.groupby("Controle", as_index=False, observed=True)
+          .agg({
+              "Cliente": "first",
+              "TotalItem": "sum",
+              "Data": "first",
+              "ProCod": "count",
+              "Controle": "first",
+              "Ano": "first",
+              "Semestre": "first",
+              "Trimestre": "first",
+              "MesPeriodo": "first",
+              "SemanaInicioDt": "first",
+              "Dia": "first",
+              "DiaSemana": "first",
+              "Bairro": "first",
+          })
+          .rename(columns={"TotalItem": "TotalVenda", "ProCod": "QuantidadeItens"})
+    )
+
+def medir(funcao, df: pd.DataFrame, repeticoes: int = 3) -> float:
+    """Menor tempo entre as repetições, em segundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(df)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def main(num_linhas: int = 3_000_000) -> None:
+    df = adicionar_colunas_temporais(gerar_df_vendas(num_linhas))
+    df["Bairro"] = df["Bairro"].astype("category")
+
+    pd.testing.assert_frame_equal(
+        agrupar_vendas_por_controle(df),
+        agrupar_com_groupby(df),
+        check_dtype=False,
+        check_categorical=False,
+    )
+
+    antes = medir(agrupar_com_groupby, df)
+    depois = medir(agrupar_vendas_por_controle, df)
+    print(f"{num_linhas:,} linhas")
+    print(f"groupby com 'first' por coluna: {antes:.3f}s")
+    print(f"passada única por controle:    {depois:.3f}s ({antes / depois:.1f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3_000_000)
@@ -0,0 +1,47 @@
+# python -m benchmarks.bench_chaves_cache [num_linhas]
+#
+# Mede o custo de um acerto de cache (o que acontece a cada rerun da página)
+# em uma função com @st.cache_data que recebe os DataFrames como argumentos
+# (hasheados pelo Streamlit) e na mesma função recebendo a chave de versão dos
+# dados, com os DataFrames em parâmetros com "_" (não hasheados).
+
+import logging
+import sys
+import time
+import pandas as pd
+import streamlit as st
+from benchmarks.gerador import gerar_df_cadastro, gerar_df_vendas
+
+@st.cache_data
+def detalhar_com_dataframes(df_vendas: pd.DataFrame, df_cadastro: pd.DataFrame, periodo: str) -> pd.DataFrame:
+    return df_vendas.groupby("ProCod", as_index=False)["Quantidade"].sum()
+
+@st.cache_data
+def detalhar_com_versao(versao_dados: str, _df_vendas: pd.DataFrame, _df_cadastro: pd.DataFrame, periodo: str) -> pd.DataFrame:
+    return _df_vendas.groupby("ProCod", as_index=False)["Quantidade"].sum()
+
+def medir_rerun(funcao, *argumentos, repeticoes: int = 5) -> float:
+    """Menor tempo de uma chamada já em cache, em segundos."""
+    funcao(*argumentos)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*argumentos)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def main(num_linhas: int = 1_000_000) -> None:
+    # Fora do "streamlit run" o Streamlit avisa que não há contexto de execução
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    df_vendas = gerar_df_vendas(num_linhas)
+    df_cadastro = gerar_df_cadastro()
+
+    antes = medir_rerun(detalhar_com_dataframes, df_vendas, df_cadastro, "Mês")
+    depois = medir_rerun(detalhar_com_versao, "versao-exemplo", df_vendas, df_cadastro, "Mês")
+    print(f"{num_linhas:,} linhas")
+    print(f"rerun hasheando os DataFrames: {antes * 1000:.1f} ms")
+    print(f"rerun com chave de versão:     {depois * 1000:.3f} ms ({antes / depois:,.0f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,202 @@
+# python -m benchmarks.bench_etapas [tamanhos...] [--dados DIR] [--saida ARQUIVO.json]
+#                                   [--comparar ANTERIOR.json] [--tolerancia 0.25]
+#
+# Mede o tempo e o pico de memória de cada etapa do processamento do dashboard
+# sobre arquivos sintéticos `NotasFW_ProdInfo.csv`/`prodMercado.csv` gerados
+# por benchmarks/gerador.py (produtos e clientes com distribuição de Zipf e o
+# cliente anônimo 99999). O pico de memória de cada etapa é o medido pelo
+# tracemalloc (alocações do Python e do numpy); como a leitura do CSV pelo
+# pyarrow aloca fora dele, também é registrado o pico de memória residente do
+# processo (RSS máximo) ao fim de cada etapa, que é cumulativo. A geração dos
+# arquivos e a medição de cada tamanho rodam em processos separados, para que
+# o RSS de uma não afete o da outra (o RSS máximo passa do processo pai ao filho).
+#
+# Os tamanhos padrão são 100 mil e 1 milhão de linhas; 10 milhões é pedido com
+# `python -m benchmarks.bench_etapas 10000000`.
+#
+# Com `--dados`, os CSVs gerados ficam no diretório informado e são reutilizados
+# nas execuções seguintes. Com `--saida`, os resultados são gravados em JSON;
+# com `--comparar`, cada etapa é comparada com um resultado gravado antes, e o
+# processo termina com código 1 se alguma ficar mais lenta ou usar mais memória
+# que o anterior além da tolerância.
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from benchmarks.gerador import gerar_df_cadastro, gerar_df_vendas, salvar_csv
+from utils.analise import calcular_indicadores_temporais, calcular_produtos_vendidos, filtrar_vendas_agrupadas
+from utils.carregamento import ler_df_cadastro, ler_df_vendas
+from utils.clientes import calcular_metricas_clientes
+from utils.giro import ROTULOS_PERIODO, montar_giro
+from utils.incremental import montar_base_vendas
+from utils.moeda import formatar_coluna_moeda
+from utils.produtos import montar_dimensao_produtos
+
+TAMANHOS_PADRAO = [100_000, 1_000_000]
+
+# Etapas abaixo do ruído de medição não são comparadas
+SEGUNDOS_MINIMOS_COMPARACAO = 0.05
+MB_MINIMOS_COMPARACAO = 5.0
+
+def caminhos_arquivos(diretorio: str, num_linhas: int) -> Tuple[str, str]:
+    """Caminhos dos CSVs de vendas (com `num_linhas` linhas) e de cadastro no diretório."""
+    return (
+        os.path.join(diretorio, f"NotasFW_ProdInfo_{num_linhas}.csv"),
+        os.path.join(diretorio, "prodMercado.csv"),
+    )
+
+def gerar_arquivos(diretorio: str, num_linhas: int) -> int:
+    """Gera os CSVs de vendas e de cadastro que ainda não existirem no diretório."""
+    caminho_vendas, caminho_cadastro = caminhos_arquivos(diretorio, num_linhas)
+    if not os.path.exists(caminho_cadastro):
+        salvar_csv(gerar_df_cadastro(), caminho_cadastro)
+    if not os.path.exists(caminho_vendas):
+        inicio = time.perf_counter()
+        salvar_csv(gerar_df_vendas(num_linhas), caminho_vendas)
+        print(f"  gerado {os.path.basename(caminho_vendas)} em {time.perf_counter() - inicio:.1f}s")
+    return 0
+
+def rss_maximo_mb() -> float:
+    """Pico de memória residente do processo até agora, em MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def medir(funcao: Callable[[], object]) -> Tuple[object, float, float]:
+    """
+    Resultado, tempo em segundos e pico de memória alocada durante a chamada
+    (tracemalloc), em MB. O tempo é medido em uma execução sem o tracemalloc,
+    que deixa a leitura do CSV bem mais lenta; o resultado é o da segunda.
+    """
+    inicio = time.perf_counter()
+    funcao()
+    tempo = time.perf_counter() - inicio
+    tracemalloc.start()
+    resultado = funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tempo, pico / 1024 ** 2
+
+def medir_etapas(caminho_vendas: str, caminho_cadastro: str) -> Dict[str, Dict[str, float]]:
+    """
+    Executa as etapas em sequência, cada uma com o resultado das anteriores.
+    Os nomes são os das funções das páginas cujo custo a etapa representa.
+    """
+    dados: Dict[str, object] = {}
+
+    def preparar_produtos():
+        df = calcular_produtos_vendidos(dados["base"]["df_produtos_totais"], dados["dimensao"])
+        df["TotalFormatado"] = formatar_coluna_moeda(df["TotalItem"])
+        return df
+
+    etapas: List[Tuple[str, str, Callable[[], object]]] = [
+        ("carregar_df_cadastro", "dimensao",
+         lambda: montar_dimensao_produtos(ler_df_cadastro(caminho_cadastro))),
+        ("carregar_df_vendas", "df_vendas",
+         lambda: ler_df_vendas(caminho_vendas)),
+        # Agrupamento por controle, totais por produto e cubo diário
+        ("processa_df_venda_agrupado", "base",
+         lambda: montar_base_vendas(dados["df_vendas"], {})),
+        ("agrupar_tabelas_temporais", None,
+         lambda: calcular_indicadores_temporais(dados["base"]["cubo_diario"], True)),
+        ("preparar_produtos", None, preparar_produtos),
+        ("detalhar_giro_vendas", None,
+         lambda: [montar_giro(dados["df_vendas"], dados["dimensao"], periodo) for periodo in ROTULOS_PERIODO]),
+        ("calcular_metricas_clientes", None,
+         lambda: calcular_metricas_clientes(filtrar_vendas_agrupadas(dados["base"]["df_vendas_agrupado"], True))),
+    ]
+
+    resultados = {}
+    for nome, guardar_em, funcao in etapas:
+        resultado, tempo, pico = medir(funcao)
+        if guardar_em:
+            dados[guardar_em] = resultado
+        rss = rss_maximo_mb()
+        resultados[nome] = {"segundos": round(tempo, 4), "pico_mb": round(pico, 1), "rss_max_mb": round(rss, 1)}
+        print(f"  {nome:28s} {tempo:8.2f}s  pico {pico:8.1f} MB  RSS máximo {rss:8.0f} MB")
+    return resultados
+
+def comparar(anteriores: Dict[str, Dict], atuais: Dict[str, Dict], tolerancia: float) -> List[str]:
+    """Etapas que ficaram mais lentas ou usaram mais memória que a tolerância permite."""
+    regressoes = []
+    for tamanho, etapas in atuais.items():
+        for nome, atual in etapas.items():
+            anterior = anteriores.get(tamanho, {}).get(nome)
+            if anterior is None:
+                continue
+            for medida, minimo in (
+                ("segundos", SEGUNDOS_MINIMOS_COMPARACAO),
+                ("pico_mb", MB_MINIMOS_COMPARACAO),
+                ("rss_max_mb", MB_MINIMOS_COMPARACAO),
+            ):
+                if medida in anterior and atual[medida] > max(anterior[medida], minimo) * (1 + tolerancia):
+                    regressoes.append(
+                        f"{tamanho} linhas, {nome}: {medida} {anterior[medida]} -> {atual[medida]}"
+                    )
+    return regressoes
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Tempo e pico de memória por etapa do dashboard.")
+    parser.add_argument("tamanhos", nargs="*", type=int, default=TAMANHOS_PADRAO)
+    parser.add_argument("--dados", help="diretório para gerar e reaproveitar os CSVs sintéticos")
+    parser.add_argument("--saida", help="grava os resultados neste arquivo JSON")
+    parser.add_argument("--comparar", help="compara com resultados gravados antes por --saida")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="aumento relativo aceito (padrão: 0.25)")
+    args = parser.parse_args()
+
+    temporario = None
+    if args.dados:
+        os.makedirs(args.dados, exist_ok=True)
+        diretorio = args.dados
+    else:
+        temporario = tempfile.TemporaryDirectory(prefix="bench_etapas_")
+        diretorio = temporario.name
+
+    resultados = {}
+    try:
+        for num_linhas in args.tamanhos:
+            print(f"{num_linhas:,} linhas")
+            arquivo_resultado = os.path.join(diretorio, f"resultado_{num_linhas}.json")
+            for argumentos in (
+                ["--gerar", diretorio, str(num_linhas)],
+                ["--medir", *caminhos_arquivos(diretorio, num_linhas), arquivo_resultado],
+            ):
+                subprocess.run([sys.executable, "-m", "benchmarks.bench_etapas", *argumentos], check=True)
+            with open(arquivo_resultado, encoding="utf-8") as origem:
+                resultados[str(num_linhas)] = json.load(origem)
+            os.remove(arquivo_resultado)
+    finally:
+        if temporario is not None:
+            temporario.cleanup()
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as destino:
+            json.dump(resultados, destino, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as origem:
+            regressoes = comparar(json.load(origem), resultados, args.tolerancia)
+        for regressao in regressoes:
+            print(f"⚠️ Regressão: {regressao}")
+        if regressoes:
+            return 1
+        print("✅ Nenhuma regressão acima da tolerância.")
+    return 0
+
+def medir_em_processo(caminho_vendas: str, caminho_cadastro: str, arquivo_resultado: str) -> int:
+    """Mede as etapas (no processo filho) e grava os resultados em JSON."""
+    with open(arquivo_resultado, "w", encoding="utf-8") as destino:
+        json.dump(medir_etapas(caminho_vendas, caminho_cadastro), destino)
+    return 0
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--gerar":
+        sys.exit(gerar_arquivos(sys.argv[2], int(sys.argv[3])))
+    if len(sys.argv) > 1 and sys.argv[1] == "--medir":
+        sys.exit(medir_em_processo(*sys.argv[2:5]))
+    sys.exit(main())
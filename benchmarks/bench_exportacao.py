@@ -0,0 +1,60 @@
+# python -m benchmarks.bench_exportacao [num_linhas]
+
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from benchmarks.gerador import gerar_df_vendas
+from utils.exportacao import exportar_arquivo
+
+def medir(funcao) -> tuple:
+    """
+    Tempo em segundos e pico de memória alocada (tracemalloc) em MB durante a
+    chamada. O tempo é medido sem o tracemalloc, que deixa o CSV muito mais lento.
+    """
+    inicio = time.perf_counter()
+    funcao()
+    tempo = time.perf_counter() - inicio
+    tracemalloc.start()
+    resultado = funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tempo, pico / 1024 ** 2
+
+def em_memoria(df: pd.DataFrame, posicoes: np.ndarray, formato: str) -> bytes:
+    """Exportação anterior: o arquivo inteiro montado em memória a partir da visão ordenada."""
+    visao = df.take(posicoes)
+    if formato == "CSV":
+        return visao.to_csv(index=False).encode("utf-8")
+    buffer = io.BytesIO()
+    visao.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+def main(num_linhas: int = 300_000) -> None:
+    df = gerar_df_vendas(num_linhas)
+    posicoes = np.argsort(df["TotalItem"].to_numpy(), kind="stable")
+    print(f"{len(df):,} linhas, {df.memory_usage(deep=True).sum() / 1024 ** 2:.0f} MB em memória")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        for formato in ("CSV", "Parquet"):
+            dados, tempo_antes, pico_antes = medir(lambda: em_memoria(df, posicoes, formato))
+            caminho, tempo_depois, pico_depois = medir(lambda: exportar_arquivo(df, formato, diretorio, "vendas", posicoes))
+
+            if formato == "CSV":
+                with open(caminho, "rb") as arquivo:
+                    assert arquivo.read() == dados
+            else:
+                pd.testing.assert_frame_equal(
+                    pd.read_parquet(caminho), pd.read_parquet(io.BytesIO(dados)), check_dtype=False
+                )
+
+            print(f"{formato} ({os.path.getsize(caminho) / 1024 ** 2:.0f} MB)")
+            print(f"  em memória: {tempo_antes:.2f}s, pico {pico_antes:.0f} MB")
+            print(f"  em blocos:  {tempo_depois:.2f}s, pico {pico_depois:.0f} MB")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000)
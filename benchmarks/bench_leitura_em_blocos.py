@@ -0,0 +1,47 @@
+# python -m benchmarks.bench_leitura_em_blocos [num_linhas]
+#
+# Compara o pico de memória (RSS máximo do processo) da base completa com o da
+# base resumida, lida em blocos. Cada modo roda em um processo separado, para
+# que um não afete o pico do outro.
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.gerador import gerar_df_vendas, salvar_csv
+
+def executar_modo(modo: str, caminho: str) -> None:
+    """Monta a base no modo informado e imprime o tempo e o pico de memória do processo."""
+    import utils.incremental as incremental
+
+    # O limite decide o modo: 0 força a leitura em blocos, infinito a leitura completa
+    incremental.BYTES_LEITURA_EM_BLOCOS = 0 if modo == "blocos" else float("inf")
+
+    inicio = time.perf_counter()
+    base = incremental.atualizar_base_vendas(caminho)
+    tempo = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{modo:9s} {tempo:6.2f}s  pico {pico:6.0f} MB  ({len(base['df_vendas_agrupado']):,} vendas)")
+
+def main(num_linhas: int = 5_000_000) -> None:
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "vendas.csv")
+        salvar_csv(gerar_df_vendas(num_linhas), caminho)
+        print(f"{num_linhas:,} linhas, {os.path.getsize(caminho) / 1024 ** 2:.0f} MB em CSV")
+
+        for modo in ("completo", "blocos"):
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_leitura_em_blocos", "--modo", modo, caminho],
+                check=True,
+                # Sem snapshots: a leitura completa seria servida pelo Parquet gerado antes
+                cwd=diretorio,
+                env={**os.environ, "PYTHONPATH": os.getcwd()},
+            )
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--modo":
+        executar_modo(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000)
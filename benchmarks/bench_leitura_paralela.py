@@ -0,0 +1,59 @@
+# python -m benchmarks.bench_leitura_paralela [num_linhas] [num_arquivos]
+#
+# Lê uma origem com vários arquivos mensais com 1, 2, 4, ... processos (até o
+# número de núcleos) e confere que o resultado é igual ao da leitura sequencial.
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+import pandas as pd
+import utils.incremental as incremental
+from benchmarks.gerador import gerar_df_vendas, salvar_csv
+from utils.constantes import DIRETORIO_SNAPSHOTS
+
+def gerar_arquivos_mensais(diretorio: str, num_linhas: int, num_arquivos: int) -> None:
+    """Divide as vendas sintéticas em `num_arquivos` CSVs, um por mês."""
+    df = gerar_df_vendas(num_linhas, dias=num_arquivos * 30)
+    meses = (df["Data"] - df["Data"].min()).dt.days // 30
+    for mes, parte in df.groupby(meses.clip(upper=num_arquivos - 1)):
+        salvar_csv(parte, os.path.join(diretorio, f"vendas_{mes:03d}.csv"))
+
+def ler(origem: str, processos: int) -> tuple:
+    """Tempo da leitura completa (sem snapshots) com a quantidade de processos informada."""
+    shutil.rmtree(DIRETORIO_SNAPSHOTS, ignore_errors=True)
+    incremental.PROCESSOS_LEITURA = processos
+    incremental.BYTES_LEITURA_PARALELA = 0
+    inicio = time.perf_counter()
+    base = incremental.atualizar_base_vendas(origem)
+    return time.perf_counter() - inicio, base
+
+def medir_escalabilidade(diretorio: str, num_linhas: int, num_arquivos: int) -> None:
+    gerar_arquivos_mensais(diretorio, num_linhas, num_arquivos)
+    origem = os.path.join(diretorio, "vendas_*.csv")
+    print(f"{num_linhas:,} linhas em {num_arquivos} arquivos, {os.cpu_count()} núcleo(s)")
+
+    tempo_sequencial, referencia = ler(origem, 1)
+    print(f"1 processo:  {tempo_sequencial:.2f}s")
+
+    processos = 2
+    while processos <= max(2, os.cpu_count() or 1):
+        tempo, base = ler(origem, processos)
+        for chave in ("df_vendas", "df_vendas_agrupado", "df_produtos_totais"):
+            pd.testing.assert_frame_equal(base[chave], referencia[chave])
+        print(f"{processos} processos: {tempo:.2f}s ({tempo_sequencial / tempo:.1f}x)")
+        processos *= 2
+
+def main(num_linhas: int = 4_000_000, num_arquivos: int = 24) -> None:
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Snapshots gravados no diretório temporário, e não no do projeto
+        os.chdir(diretorio)
+        try:
+            medir_escalabilidade(diretorio, num_linhas, num_arquivos)
+        finally:
+            os.chdir(original)
+
+if __name__ == "__main__":
+    main(*(int(argumento) for argumento in sys.argv[1:3]))
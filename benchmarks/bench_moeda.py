@@ -0,0 +1,36 @@
+# python -m benchmarks.bench_moeda [num_valores]
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from utils.moeda import formatar_coluna_moeda, formatar_moeda_brasileira
+
+def gerar_valores(num_valores: int, semente: int = 0) -> pd.Series:
+    """Valores em reais com magnitudes variadas, negativos, nulos e empates de meio centavo."""
+    rng = np.random.default_rng(semente)
+    valores = np.round(rng.lognormal(4.0, 2.5, num_valores), 3) * rng.choice([1, -1], num_valores, p=[0.9, 0.1])
+    valores[rng.random(num_valores) < 0.01] = np.nan
+    return pd.Series(valores)
+
+def medir(funcao, valores: pd.Series, repeticoes: int = 3) -> float:
+    """Menor tempo entre as repetições, em segundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(valores)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def main(num_valores: int = 1_000_000) -> None:
+    valores = gerar_valores(num_valores)
+    pd.testing.assert_series_equal(formatar_coluna_moeda(valores), valores.map(formatar_moeda_brasileira))
+
+    antes = medir(lambda serie: serie.map(formatar_moeda_brasileira), valores)
+    depois = medir(formatar_coluna_moeda, valores)
+    print(f"{num_valores:,} valores")
+    print(f"map por elemento: {antes:.3f}s")
+    print(f"vetorizado:       {depois:.3f}s ({antes / depois:.1f}x)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
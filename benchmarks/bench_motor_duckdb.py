@@ -0,0 +1,138 @@
+# python -m benchmarks.bench_motor_duckdb [num_linhas]
+#
+# Compara os motores de agregação "pandas" e "duckdb" (MOTOR_AGREGACAO) em
+# cada função que os aceita, sobre vendas sintéticas gravadas em CSV e lidas
+# como no app (com os tipos do esquema), com valores nulos injetados em
+# produto, quantidade, valor, cliente, bairro e controle.
+#
+# Verifica se os resultados são os mesmos (colunas, tipos, ordem das linhas e
+# valores; somas em float64 com tolerância relativa de 1e-12, já que a ordem
+# das parcelas muda) e mede o tempo de cada motor. Termina com código 1 se
+# algum resultado divergir.
+
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from typing import Callable, List, Tuple
+from benchmarks.gerador import gerar_df_cadastro, gerar_df_vendas, salvar_csv
+from utils.analise import calcular_vendas_por_local
+from utils.carregamento import agrupar_vendas_por_controle, calcular_vendas_agrupadas, ler_df_vendas
+from utils.clientes import calcular_metricas_clientes
+from utils.cubo import montar_cubo_diario
+from utils.giro import ROTULOS_PERIODO, montar_giro
+from utils.produtos import montar_dimensao_produtos
+
+TOLERANCIA_RELATIVA = 1e-12
+
+def injetar_nulos(df: pd.DataFrame, fracao: float = 0.01, semente: int = 1) -> pd.DataFrame:
+    """Apaga uma fração dos valores das colunas que podem vir vazias do ERP."""
+    rng = np.random.default_rng(semente)
+    df = df.astype({"ProCod": "Int32", "Cliente": "Int32", "Controle": "Int32", "Quantidade": "float64"})
+    for coluna in ["ProCod", "Quantidade", "TotalItem", "Cliente", "Bairro"]:
+        df.loc[rng.random(len(df)) < fracao, coluna] = None
+    df.loc[rng.random(len(df)) < fracao / 10, "Controle"] = None
+    return df
+
+def diferenca_relativa(esperado: pd.DataFrame, obtido: pd.DataFrame) -> float:
+    """Maior diferença relativa entre as colunas float dos dois resultados."""
+    maior = 0.0
+    for coluna in esperado.columns:
+        if pd.api.types.is_float_dtype(esperado[coluna].dtype):
+            a = esperado[coluna].to_numpy(dtype=float)
+            b = obtido[coluna].to_numpy(dtype=float)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                relativa = np.abs(a - b) / np.maximum(np.abs(a), np.finfo(float).tiny)
+            maior = max(maior, float(np.nanmax(relativa, initial=0.0)))
+    return maior
+
+def comparar(
+    nome: str,
+    calcular: Callable[[str], object],
+    tabela: Callable[[object], pd.DataFrame],
+    motor: str = "duckdb",
+    tolerancia: float = TOLERANCIA_RELATIVA,
+) -> Tuple[str, float, float, float, str]:
+    """
+    Tempo do pandas e do `motor`, maior diferença relativa e o erro da
+    comparação (vazio se os resultados forem iguais).
+    """
+    tempos, resultados = {}, {}
+    for nome_motor in ("pandas", motor):
+        inicio = time.perf_counter()
+        resultados[nome_motor] = calcular(nome_motor)
+        tempos[nome_motor] = time.perf_counter() - inicio
+
+    esperado, obtido = tabela(resultados["pandas"]), tabela(resultados[motor])
+    erro = ""
+    try:
+        pd.testing.assert_frame_equal(esperado, obtido, check_exact=False, rtol=tolerancia, atol=0)
+        if isinstance(resultados["pandas"], dict) and "indice" in resultados["pandas"]:
+            assert resultados["pandas"]["indice"] == resultados[motor]["indice"], "índice de períodos diferente"
+        if isinstance(resultados["pandas"], tuple):
+            assert resultados["pandas"][:2] == resultados[motor][:2], "totais de clientes diferentes"
+    except AssertionError as e:
+        erro = str(e).splitlines()[0] if str(e) else "resultados diferentes"
+    return nome, tempos["pandas"], tempos[motor], diferenca_relativa(esperado, obtido), erro
+
+def imprimir_resultados(resultados: List[Tuple[str, float, float, float, str]], motor: str = "duckdb") -> int:
+    """Imprime a tabela de comparação; retorna 1 se algum resultado divergir."""
+    print(f"{'função':<40}{'pandas':>10}{motor:>10}{'razão':>8}{'dif. rel.':>12}  resultado")
+    for nome, pandas_s, motor_s, diferenca, erro in resultados:
+        print(
+            f"{nome:<40}{pandas_s:>9.3f}s{motor_s:>9.3f}s{pandas_s / motor_s:>7.1f}x"
+            f"{diferenca:>12.1e}  {erro or 'iguais'}"
+        )
+    return 1 if any(erro for *_, erro in resultados) else 0
+
+def main(num_linhas: int = 1_000_000) -> int:
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "NotasFW_ProdInfo.csv")
+        salvar_csv(injetar_nulos(gerar_df_vendas(num_linhas)), caminho)
+        df_vendas = ler_df_vendas(caminho)
+    dimensao = montar_dimensao_produtos(gerar_df_cadastro())
+    df_agrupado = agrupar_vendas_por_controle(df_vendas, motor="pandas")
+
+    resultados: List[Tuple[str, float, float, float, str]] = [
+        comparar(
+            "calcular_vendas_agrupadas",
+            lambda motor: calcular_vendas_agrupadas(df_vendas, motor=motor),
+            lambda df: df,
+        ),
+        comparar(
+            "agrupar_vendas_por_controle",
+            lambda motor: agrupar_vendas_por_controle(df_vendas, motor=motor),
+            lambda df: df,
+        ),
+        comparar(
+            "montar_cubo_diario",
+            lambda motor: montar_cubo_diario(df_agrupado, motor=motor),
+            lambda cubo: cubo["fatos"],
+        ),
+        *[
+            comparar(
+                f"montar_giro ({periodo})",
+                lambda motor, periodo=periodo: montar_giro(df_vendas, dimensao, periodo, motor=motor),
+                lambda giro: giro["tabela"],
+            )
+            for periodo in ROTULOS_PERIODO
+        ],
+        comparar(
+            "calcular_vendas_por_local",
+            lambda motor: calcular_vendas_por_local(df_agrupado, "Bairro", motor=motor),
+            lambda df: df,
+        ),
+        comparar(
+            "calcular_metricas_clientes",
+            lambda motor: calcular_metricas_clientes(df_agrupado, motor=motor),
+            lambda resultado: resultado[2],
+        ),
+    ]
+
+    print(f"{num_linhas:,} linhas de vendas")
+    return imprimir_resultados(resultados)
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
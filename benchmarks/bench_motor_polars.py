@@ -0,0 +1,113 @@
+# python -m benchmarks.bench_motor_polars [num_linhas]
+#
+# Compara a leitura das vendas e o agrupamento por controle pelo pandas e pelo
+# Polars (MOTOR_LEITURA_VENDAS e MOTOR_AGREGACAO = "polars"), sobre vendas
+# sintéticas com valores nulos injetados (ver bench_motor_duckdb.py).
+#
+# A leitura é comparada também em arquivos com datas fora do formato ISO, com
+# fração de segundo, apenas com a data e em memória (como os enviados pela
+# página de arquivos). Os resultados devem ser iguais, exceto os totais em
+# reais do agrupamento: o Polars não tem soma compensada, e a diferença
+# relativa aceita é de TOLERANCIA_SOMAS (muito abaixo de um centavo). Termina
+# com código 1 se algum resultado divergir. As mesmas comparações, em tamanho
+# menor, estão em tests/test_motor_polars.py.
+
+import io
+import os
+import sys
+import tempfile
+import pandas as pd
+from typing import Dict, List, Tuple
+from benchmarks.bench_motor_duckdb import comparar, imprimir_resultados, injetar_nulos
+from benchmarks.gerador import gerar_df_vendas, salvar_csv
+from utils.carregamento import agrupar_vendas_por_controle, calcular_vendas_agrupadas, ler_df_vendas
+
+TOLERANCIA_SOMAS = 1e-9
+
+def variantes_datas(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Vendas com a coluna de data em formatos que a leitura precisa tratar como o pandas."""
+    datas = df["Data"]
+    fora_do_formato = datas.dt.strftime("%Y-%m-%d %H:%M:%S").astype(object)
+    fora_do_formato.iloc[::997] = "invalida"
+    fora_do_formato.iloc[5::1009] = datas.iloc[5::1009].dt.strftime("%d/%m/%Y")
+    fora_do_formato.iloc[7::1013] = None
+    return {
+        "datas fora do formato": df.assign(Data=fora_do_formato),
+        "fração de segundo": df.assign(Data=datas + pd.to_timedelta(250, unit="ms")),
+        "apenas a data": df.assign(Data=datas.dt.normalize().dt.strftime("%Y-%m-%d")),
+    }
+
+def main(num_linhas: int = 1_000_000) -> int:
+    df = injetar_nulos(gerar_df_vendas(num_linhas))
+    resultados: List[Tuple[str, float, float, float, str]] = []
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "NotasFW_ProdInfo.csv")
+        salvar_csv(df, caminho)
+
+        resultados.append(comparar(
+            "ler_df_vendas",
+            lambda motor: ler_df_vendas(caminho, motor=motor),
+            lambda vendas: vendas,
+            motor="polars",
+        ))
+
+        with open(caminho, "rb") as arquivo:
+            conteudo = arquivo.read()
+        resultados.append(comparar(
+            "ler_df_vendas (em memória)",
+            lambda motor: ler_df_vendas(io.BytesIO(conteudo), motor=motor),
+            lambda vendas: vendas,
+            motor="polars",
+        ))
+
+        amostra = df.head(100_000)
+        for nome, variante in variantes_datas(amostra).items():
+            caminho_variante = os.path.join(diretorio, f"{nome}.csv")
+            salvar_csv(variante, caminho_variante)
+            resultados.append(comparar(
+                f"ler_df_vendas ({nome})",
+                lambda motor, caminho_variante=caminho_variante: ler_df_vendas(caminho_variante, motor=motor),
+                lambda vendas: vendas,
+                motor="polars",
+            ))
+
+        df_vendas = ler_df_vendas(caminho, motor="pandas")
+
+        resultados.append(comparar(
+            "agrupar_vendas_por_controle",
+            lambda motor: agrupar_vendas_por_controle(df_vendas, motor=motor),
+            lambda agrupado: agrupado,
+            motor="polars",
+            tolerancia=TOLERANCIA_SOMAS,
+        ))
+        resultados.append(comparar(
+            "calcular_vendas_agrupadas",
+            lambda motor: calcular_vendas_agrupadas(df_vendas, motor=motor),
+            lambda totais: totais,
+            motor="polars",
+            tolerancia=TOLERANCIA_SOMAS,
+        ))
+
+        # Leitura, agrupamento por controle e totais por produto, como na montagem da base
+        def pipeline(motor: str) -> Dict[str, pd.DataFrame]:
+            vendas = ler_df_vendas(caminho, motor=motor)
+            return {
+                "df_vendas_agrupado": agrupar_vendas_por_controle(vendas, motor=motor),
+                "df_produtos_totais": calcular_vendas_agrupadas(vendas, motor=motor),
+            }
+
+        for tabela in ("df_vendas_agrupado", "df_produtos_totais"):
+            resultados.append(comparar(
+                f"pipeline completo ({tabela})",
+                pipeline,
+                lambda tabelas, tabela=tabela: tabelas[tabela],
+                motor="polars",
+                tolerancia=TOLERANCIA_SOMAS,
+            ))
+
+    print(f"{num_linhas:,} linhas de vendas")
+    return imprimir_resultados(resultados, motor="polars")
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from utils.constantes import CLIENTE_ANONIMO
+
+BAIRROS = [
+    "Centro", "Jardim América", "Vila Nova", "Santa Cruz", "Boa Vista",
+    "São José", "Industrial", "Primavera", "Bela Vista", "Alto da Colina",
+]
+
+def gerar_df_cadastro(num_produtos: int = 5_000, semente: int = 0) -> pd.DataFrame:
+    """Gera um cadastro sintético de produtos no formato de `prodMercado.csv`."""
+    rng = np.random.default_rng(semente)
+    codigos = np.arange(1, num_produtos + 1, dtype=np.int32)
+    return pd.DataFrame({
+        "ProCod": codigos,
+        "ProNom": [f"PRODUTO SINTÉTICO {codigo:06d}" for codigo in codigos],
+        "Preco": np.round(rng.gamma(2.0, 12.0, num_produtos) + 0.5, 2),
+    })
+
+def gerar_df_vendas(
+    num_linhas: int,
+    num_produtos: int = 5_000,
+    num_clientes: int = 50_000,
+    itens_por_venda: float = 4.0,
+    fracao_anonima: float = 0.25,
+    inicio: str = "2019-01-01",
+    dias: int = 5 * 365,
+    semente: int = 0,
+) -> pd.DataFrame:
+    """
+    Gera vendas sintéticas no formato de `NotasFW_ProdInfo.csv`.
+
+    Produtos e clientes seguem distribuições de Zipf (poucos concentram a maior
+    parte das vendas), uma fração das vendas é do cliente anônimo 99999 e os
+    campos de cabeçalho (cliente, data, bairro) são iguais em todos os itens de
+    uma mesma venda.
+    """
+    rng = np.random.default_rng(semente)
+    num_vendas = max(1, int(num_linhas / itens_por_venda))
+
+    # Cabeçalho das vendas
+    cliente_venda = (rng.zipf(1.3, num_vendas) % num_clientes + 1).astype(np.int32)
+    cliente_venda[rng.random(num_vendas) < fracao_anonima] = CLIENTE_ANONIMO
+    segundos = np.sort(rng.integers(0, dias * 86_400, num_vendas))
+    data_venda = pd.Timestamp(inicio) + pd.to_timedelta(segundos, unit="s")
+    bairro_venda = rng.integers(0, len(BAIRROS), num_vendas)
+
+    # Itens: cada linha pertence a uma venda, em ordem de controle
+    venda = np.sort(rng.integers(0, num_vendas, num_linhas))
+    produto = (rng.zipf(1.2, num_linhas) % num_produtos + 1).astype(np.int32)
+    quantidade = rng.integers(1, 6, num_linhas)
+    preco = np.round(rng.gamma(2.0, 12.0, num_produtos) + 0.5, 2)
+
+    return pd.DataFrame({
+        "Controle": (venda + 1).astype(np.int32),
+        "Cliente": cliente_venda[venda],
+        "Data": data_venda[venda],
+        "ProCod": produto,
+        "Quantidade": quantidade,
+        "TotalItem": np.round(quantidade * preco[produto - 1], 2),
+        "Bairro": np.array(BAIRROS, dtype=object)[bairro_venda[venda]],
+    })
+
+def salvar_csv(df: pd.DataFrame, caminho: str) -> None:
+    """Grava o DataFrame no formato CSV usado pelo ERP (separador ';')."""
+    df.to_csv(caminho, sep=";", index=False, date_format="%Y-%m-%d %H:%M:%S")
@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
 import math
-from typing import Tuple, Optional
-from utils.processamento import processa_df_venda_agrupado
-from utils.moeda import formatar_moeda_brasileira
+from typing import Optional
+from utils.processamento import carregar_indicadores_temporais
+from utils.constantes import DIAS_SEMANA_ORDENADOS
+from utils.desempenho import mostrar_painel_desempenho
+from utils.moeda import formatar_coluna_moeda, formatar_moeda_brasileira
 from utils.sessao import inicializar_app
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
@@ -11,66 +13,13 @@ st.set_page_config(page_title="Indicadores de Vendas", layout="wide")
 inicializar_app()
 st.title("📊 Indicadores Gerais de Vendas")
 
-# ---------------- CARREGAMENTO E VERIFICAÇÃO ----------------
-if "df_vendas_agrupado" not in st.session_state:
-    processa_df_venda_agrupado()
-
-df: Optional[pd.DataFrame] = st.session_state.get("df_vendas_agrupado")
-
-if not isinstance(df, pd.DataFrame) or df.empty:
-    st.error("❌ O DataFrame 'df_vendas_agrupado' não está disponível ou está vazio.")
-    st.stop()
-
-df_vendas_agrupado: pd.DataFrame = df.copy()
-
 # ---------------- FILTRAGEM OPCIONAL ----------------
 ignore_99999 = st.checkbox("Ignorar cliente não identificado (ID 99999)", value=True)
-if ignore_99999:
-    df_vendas_agrupado = df_vendas_agrupado[df_vendas_agrupado["Cliente"] != 99999]
 
 # ---------------- AGRUPAMENTO TEMPORAL ----------------
-
-@st.cache_data
-def agrupar_tabelas_temporais(df: pd.DataFrame) -> Tuple[pd.DataFrame, ...]:
-    """Agrupa dados por variações temporais padrão."""
-
-    def agrupar(coluna: str) -> pd.DataFrame:
-        if coluna not in df.columns:
-            return pd.DataFrame()
-
-        soma_vendas = df.groupby(coluna)["TotalVenda"].sum()
-        quant_clientes = df.groupby(coluna)["Cliente"].nunique()
-        media_por_venda = df.groupby(coluna)["TotalVenda"].mean()
-
-        agrupado = pd.DataFrame({
-            coluna: soma_vendas.index,
-            "TotalVenda": soma_vendas.values,
-            "QuantClientes": quant_clientes.values,
-            "QuantVendas": df.groupby(coluna)["Controle"].count().values,
-            "MediaPorCliente": soma_vendas.values / quant_clientes.replace(0, pd.NA).fillna(1).values,
-            "MediaPorVenda": media_por_venda.values
-        })
-
-        return agrupado
-
-    anual     = agrupar("Ano")
-    semestre  = agrupar("Semestre")
-    trimestre = agrupar("Trimestre")
-    mensal    = agrupar("MesPeriodo").rename(columns={"MesPeriodo": "Mês"})
-    semanal   = agrupar("SemanaInicioDt").rename(columns={"SemanaInicioDt": "Semana"})
-    dia_sem   = agrupar("DiaSemana")
-    diario    = agrupar("Dia").rename(columns={"Dia": "Data"})
-
-    if "Semana" in semanal.columns and "Data" in df.columns:
-        meses_semanais = (
-            df.groupby("SemanaInicioDt")["Data"]
-              .agg(lambda x: "-".join(sorted(set(x.dt.strftime("%b")))))
-              .reset_index(name="Meses")
-              .rename(columns={"SemanaInicioDt": "Semana"})
-        )
-        semanal = semanal.merge(meses_semanais, on="Semana", how="left")
-
-    return anual, semestre, trimestre, mensal, semanal, dia_sem, diario
+# As tabelas vêm do cubo diário pré-agregado da base compartilhada, calculadas
+# uma vez por versão dos dados e por opção de filtro.
+tabelas, total_clientes, total_vendas_raw = carregar_indicadores_temporais(ignore_99999)
 
 # ---------------- EXIBIÇÃO DE TABELAS ----------------
 
@@ -85,16 +34,13 @@ def exibir_tabela(df: pd.DataFrame, titulo: Optional[str] = None) -> None:
     if titulo == "Dia da Semana" and "DiaSemana" in df.columns:
         df["DiaSemana"] = pd.Categorical(
             df["DiaSemana"],
-            categories=[
-                "segunda-feira", "terça-feira", "quarta-feira",
-                "quinta-feira", "sexta-feira", "sábado", "domingo"
-            ],
+            categories=DIAS_SEMANA_ORDENADOS,
             ordered=True
         )
         df = df.sort_values("DiaSemana")
 
-    df["TotalVenda"] = df["TotalVenda"].map(formatar_moeda_brasileira)
-    df["MediaPorCliente"] = df["MediaPorCliente"].map(formatar_moeda_brasileira)
+    df["TotalVenda"] = formatar_coluna_moeda(df["TotalVenda"])
+    df["MediaPorCliente"] = formatar_coluna_moeda(df["MediaPorCliente"])
 
     if titulo:
         st.markdown(f"### 📈 {titulo}")
@@ -102,14 +48,6 @@ def exibir_tabela(df: pd.DataFrame, titulo: Optional[str] = None) -> None:
 
 # ---------------- KPIs GERAIS ----------------
 
-total_clientes = df_vendas_agrupado["Cliente"].nunique()
-
-# Garante que a coluna TotalVenda é numérica, ignorando valores inválidos
-df_vendas_agrupado["TotalVenda"] = pd.to_numeric(df_vendas_agrupado["TotalVenda"], errors="coerce")
-
-# Remove valores NaN antes de somar
-total_vendas_raw = df_vendas_agrupado["TotalVenda"].dropna().sum()
-
 # Agora com segurança convertendo para float
 try:
     total_vendas = float(total_vendas_raw)
@@ -137,7 +75,6 @@ col3.metric("Média de Vendas/Cliente", formatar_moeda_brasileira(ticket_medio))
 
 # ---------------- TABELAS DETALHADAS ----------------
 
-tabelas = agrupar_tabelas_temporais(df_vendas_agrupado)
 nomes = [
     "Ano", "Semestre", "Trimestre", "Mês",
     "Semana", "Dia da Semana", "Data"
@@ -146,3 +83,5 @@ nomes = [
 for nome, df_tab in zip(nomes, tabelas):
     with st.expander(f"Detalhamento por {nome}"):
         exibir_tabela(df_tab, titulo=nome)
+
+mostrar_painel_desempenho()
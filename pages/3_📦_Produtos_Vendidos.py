@@ -1,14 +1,19 @@
 import streamlit as st
 import pandas as pd
 import altair as alt
-from typing import Tuple, Optional
+from typing import Dict, Tuple, Optional
+from utils.analise import calcular_produtos_vendidos
 from utils.processamento import (
-    calcular_vendas_agrupadas,
-    adicionar_nomes_produtos,
-    carregar_df_vendas,
-    carregar_df_cadastro
+    carregar_df_cadastro,
+    carregar_df_produtos_totais,
+    carregar_dimensao_produtos,
+    carregar_giro_vendas,
+    carregar_versao_dados,
 )
-from utils.moeda import formatar_moeda_brasileira
+from utils.desempenho import dados_em_cache, mostrar_painel_desempenho
+from utils.giro import fatiar_giro
+from utils.instrumentacao import medir_etapa
+from utils.moeda import formatar_coluna_moeda
 from utils.sessao import inicializar_app, validar_df
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
@@ -17,83 +22,23 @@ inicializar_app()
 st.title("📦 Produtos Vendidos")
 
 # ---------------- CARREGAMENTO DOS DADOS ----------------
-df_vendas = validar_df("df_vendas", carregar_df_vendas)
+# A chave de versão identifica os dados nas funções com cache, sem hashear os DataFrames
+versao_dados = carregar_versao_dados()
 df_cadastro = validar_df("df_cadastro", carregar_df_cadastro)
+df_produtos_totais = validar_df("df_produtos_totais", carregar_df_produtos_totais)
+dimensao_produtos = carregar_dimensao_produtos()
 
 # ---------------- FUNÇÕES AUXILIARES ----------------
 
-@st.cache_data
-def preparar_produtos(df_vendas: pd.DataFrame, df_cadastro: pd.DataFrame) -> pd.DataFrame:
+@dados_em_cache()
+def preparar_produtos(versao_dados: str, _df_produtos_totais: pd.DataFrame, _dimensao_produtos: Dict[str, object]) -> pd.DataFrame:
     """Prepara os dados de produtos vendidos com formatação adequada."""
-    df = calcular_vendas_agrupadas(df_vendas)
-    df = adicionar_nomes_produtos(df, df_cadastro)
-    df = df.rename(columns={"ProNom": "Produto"})
-    
-    # Garantir que as colunas numéricas estão corretas
-    df["TotalItem"] = pd.to_numeric(df["TotalItem"], errors="coerce")
-    df["Quantidade"] = pd.to_numeric(df["Quantidade"], errors="coerce")
-    
-    df = df.sort_values(by="TotalItem", ascending=False)
-    df["TotalFormatado"] = df["TotalItem"].apply(
-        lambda x: formatar_moeda_brasileira(x) if not pd.isna(x) else "R$ 0,00"
-    )
-    return df.dropna(subset=["TotalItem", "Quantidade"])
-
-@st.cache_data
-def detalhar_giro_vendas(df_vendas: pd.DataFrame, df_cadastro: pd.DataFrame, periodo: str) -> pd.DataFrame:
-    """Prepara os dados para análise temporal de vendas por produto."""
-    df = df_vendas.copy()
-
-    # Verificação e limpeza inicial
-    if "ProNom" in df.columns:
-        df = df.drop(columns=["ProNom"])
-    
-    if "ProCod" not in df.columns or "ProCod" not in df_cadastro.columns:
-        st.error("❌ Coluna 'ProCod' não encontrada nos DataFrames.")
-        st.stop()
-
-    # Merge com nome do produto
-    df = df.merge(
-        df_cadastro[["ProCod", "ProNom"]].drop_duplicates(subset=["ProCod"]),
-        how="left",
-        on="ProCod"
-    ).rename(columns={"ProNom": "Produto"})
-
-    # Verificações pós-merge
-    required_cols = ["Produto", "Quantidade", "Data"]
-    for col in required_cols:
-        if col not in df.columns:
-            st.error(f"❌ Coluna '{col}' não encontrada após o merge.")
-            st.stop()
-
-    # Conversão e limpeza de dados
-    df["Data"] = pd.to_datetime(df["Data"], errors="coerce")
-    df["Quantidade"] = pd.to_numeric(df["Quantidade"], errors="coerce")
-    df = df.dropna(subset=["Data", "Quantidade", "Produto"])
-
-    # Criação do período
-    if periodo == "Ano":
-        df["Periodo"] = df["Data"].dt.year
-    elif periodo == "Semestre":
-        df["Periodo"] = df["Data"].dt.year.astype(str) + " - S" + ((df["Data"].dt.month - 1) // 6 + 1).astype(str)
-    elif periodo == "Trimestre":
-        df["Periodo"] = df["Data"].dt.year.astype(str) + " - T" + ((df["Data"].dt.month - 1) // 3 + 1).astype(str)
-    elif periodo == "Mês":
-        df["Periodo"] = df["Data"].dt.to_period("M").astype(str)
-    elif periodo == "Semana":
-        df["Periodo"] = df["Data"].dt.strftime("%Y - Semana %U")
-    elif periodo == "Dia da Semana":
-        df["Periodo"] = df["Data"].dt.day_name()
-    elif periodo == "Data":
-        df["Periodo"] = df["Data"].dt.date
-    else:
-        st.error("❌ Período inválido selecionado.")
-        st.stop()
-
-    return df.groupby(["Periodo", "Produto"]).agg(Quantidade=("Quantidade", "sum")).reset_index()
+    df = calcular_produtos_vendidos(_df_produtos_totais, _dimensao_produtos)
+    df["TotalFormatado"] = formatar_coluna_moeda(df["TotalItem"])
+    return df
 
 # ---------------- TABELA GERAL ----------------
-df_produtos = preparar_produtos(df_vendas, df_cadastro)
+df_produtos = preparar_produtos(versao_dados, df_produtos_totais, dimensao_produtos)
 
 st.markdown("### 📝 Lista de Produtos Vendidos")
 st.dataframe(
@@ -144,7 +89,8 @@ if not top_df.empty:
             title=f"Top {top_n} Produtos por Valor Vendido"
         )
     )
-    st.altair_chart(bar_chart, use_container_width=True)
+    with medir_etapa("grafico_top_produtos"):
+        st.altair_chart(bar_chart, use_container_width=True)
 else:
     st.warning("Não há dados suficientes para exibir o gráfico.")
 
@@ -157,17 +103,19 @@ opcoes_periodo = [
 periodo_selecionado = st.selectbox("Selecionar tipo de período:", opcoes_periodo)
 
 try:
-    df_giro = detalhar_giro_vendas(df_vendas, df_cadastro, periodo_selecionado)
+    # Tabela produto x período pré-calculada por granularidade; trocar de período
+    # apenas fatia as linhas do período escolhido
+    giro = carregar_giro_vendas(periodo_selecionado)
     
-    if df_giro.empty:
+    if not giro["indice"]:
         st.warning("Nenhum dado disponível para o período selecionado.")
         st.stop()
     
-    # Lista de períodos únicos para seleção
-    periodos_disponiveis = sorted(df_giro["Periodo"].unique().tolist())
+    # Lista de períodos únicos para seleção (já em ordem)
+    periodos_disponiveis = list(giro["indice"])
     periodo_especifico = st.selectbox("Selecionar período específico:", periodos_disponiveis)
     
-    df_filtrado = df_giro[df_giro["Periodo"] == periodo_especifico]
+    df_filtrado = fatiar_giro(giro, periodo_especifico)
     df_filtrado = df_filtrado.sort_values("Quantidade", ascending=False)
     
     if df_filtrado.empty:
@@ -186,7 +134,8 @@ try:
         )
         .properties(height=500)
     )
-    st.altair_chart(pie_chart, use_container_width=True)
+    with medir_etapa("grafico_giro_periodo"):
+        st.altair_chart(pie_chart, use_container_width=True)
     
     # Tabela com TODOS os itens (sem limite)
     st.markdown(f"### 📋 Detalhamento Completo ({len(df_filtrado)} itens)")
@@ -200,4 +149,6 @@ try:
     )
 
 except Exception as e:
-    st.error(f"Ocorreu um erro ao processar os dados: {str(e)}")
\ No newline at end of file
+    st.error(f"Ocorreu um erro ao processar os dados: {str(e)}")
+
+mostrar_painel_desempenho()
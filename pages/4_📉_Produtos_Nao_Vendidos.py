@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 from typing import List, Optional
-from utils.processamento import calcular_vendas_agrupadas, carregar_df_vendas, carregar_df_cadastro
+from utils.desempenho import dados_em_cache, mostrar_painel_desempenho
+from utils.processamento import calcular_vendas_agrupadas, carregar_df_cadastro, carregar_produtos_nao_vendidos, carregar_versao_dados
 from utils.sessao import inicializar_app, validar_df
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
@@ -11,26 +12,19 @@ st.title("📉 Produtos Não Vendidos")
 
 # ---------------- FUNÇÕES AUXILIARES ----------------
 
-def obter_produtos_nao_vendidos(
-    df_vendas: pd.DataFrame,
-    df_cadastro: pd.DataFrame
-) -> pd.DataFrame:
-    """Retorna os produtos do cadastro que não aparecem nas vendas."""
-    codigos_vendidos = set(df_vendas["ProCod"].dropna().unique())
-    return df_cadastro[~df_cadastro["ProCod"].isin(codigos_vendidos)].copy()
-
-@st.cache_data
+@dados_em_cache()
 def preparar_view(
-    df: pd.DataFrame,
+    versao_dados: str,
+    _df: pd.DataFrame,
     colunas: List[str]
 ) -> pd.DataFrame:
     """Retorna somente as colunas selecionadas, se existirem no DataFrame."""
-    colunas_validas = [col for col in colunas if col in df.columns]
-    return df[colunas_validas]
+    colunas_validas = [col for col in colunas if col in _df.columns]
+    return _df[colunas_validas]
 
 # ---------------- CARREGAMENTO DOS DADOS ----------------
 
-df_vendas = validar_df("df_vendas", carregar_df_vendas)
+versao_dados = carregar_versao_dados()
 df_cadastro = validar_df("df_cadastro", carregar_df_cadastro)
 
 # ---------------- INTERFACE DE COLUNAS ----------------
@@ -44,8 +38,9 @@ colunas_escolhidas = st.multiselect(
 
 # ---------------- PROCESSAMENTO ----------------
 
-df_nao_vendidos = obter_produtos_nao_vendidos(df_vendas, df_cadastro)
-df_view = preparar_view(df_nao_vendidos, colunas_escolhidas)
+# Diferença entre o cadastro e os produtos vendidos, pré-calculada por versão dos dados
+df_nao_vendidos = carregar_produtos_nao_vendidos()
+df_view = preparar_view(versao_dados, df_nao_vendidos, colunas_escolhidas)
 
 # ---------------- EXIBIÇÃO ----------------
 
@@ -57,3 +52,5 @@ else:
     st.dataframe(df_view, use_container_width=True)
 
 st.markdown("---")
+
+mostrar_painel_desempenho()
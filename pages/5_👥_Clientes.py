@@ -3,8 +3,11 @@ import pandas as pd
 import altair as alt
 import math
 from typing import Tuple
-from utils.moeda import formatar_moeda_brasileira
-from utils.processamento import carregar_df_cadastro, processa_df_venda_agrupado
+from utils.desempenho import dados_em_cache, mostrar_painel_desempenho
+from utils.instrumentacao import medir_etapa
+from utils.moeda import formatar_coluna_moeda
+from utils.processamento import carregar_df_cadastro, carregar_vendas_agrupadas
+from utils.processamento import calcular_metricas_clientes as calcular_metricas_por_cliente
 from utils.sessao import inicializar_app, validar_df
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
@@ -14,59 +17,33 @@ st.title("👥 Análise de Clientes")
 
 # ---------------- FUNÇÕES AUXILIARES ----------------
 
-@st.cache_data
-def calcular_metricas_clientes(df_vendas_agrupado: pd.DataFrame) -> Tuple[int, int, pd.DataFrame]:
+@dados_em_cache()
+def calcular_metricas_clientes(chave_dados: str, _df_vendas_agrupado: pd.DataFrame) -> Tuple[int, int, pd.DataFrame]:
     """
-    Calcula estatísticas relacionadas aos clientes:
-    - Total de clientes
-    - Quantos retornaram (mais de uma compra)
-    - DataFrame com métricas por cliente
+    Calcula as métricas por cliente (totais, compras, itens, ticket médio e RFM).
+
+    O cache usa apenas `chave_dados` (versão dos dados + variante do filtro);
+    o DataFrame não é hasheado.
     """
-    df = df_vendas_agrupado.copy()
-
-    # Garante que as colunas numéricas são tratadas corretamente
-    df["TotalVenda"] = pd.to_numeric(df["TotalVenda"], errors="coerce")
-    df["QuantidadeItens"] = pd.to_numeric(df["QuantidadeItens"], errors="coerce")
-
-    df_group = df.groupby("Cliente").agg(
-        total_vendas=("TotalVenda", "sum"),
-        num_compras=("Data", "count"),
-        itens_totais=("QuantidadeItens", "sum")
-    ).reset_index()
-
-    # Cálculo seguro do ticket médio
-    df_group["ticket_medio"] = df_group.apply(
-        lambda row: row["total_vendas"] / row["num_compras"] if row["num_compras"] > 0 else 0,
-        axis=1
-    )
+    return calcular_metricas_por_cliente(_df_vendas_agrupado)
 
-    total_customers = df_group.shape[0]
-    returning_customers = df_group[df_group["num_compras"] > 1].shape[0]
+# ---------------- FILTRO DE CLIENTES ----------------
 
-    return total_customers, returning_customers, df_group
+ignorar_99999 = st.checkbox("Ignorar cliente 99999", value=True)
 
 # ---------------- CARREGAMENTO DE DADOS ----------------
 
-# Usando a abordagem mais segura do segundo código
-if "df_vendas_agrupado" not in st.session_state:
-    processa_df_venda_agrupado()
-
-df_vendas_agrupado = st.session_state.get("df_vendas_agrupado")
+# As variantes com e sem o cliente 99999 já vêm filtradas do registro compartilhado
+chave_dados, df_vendas_agrupado = carregar_vendas_agrupadas(ignorar_99999)
 if not isinstance(df_vendas_agrupado, pd.DataFrame) or df_vendas_agrupado.empty:
     st.error("❌ O DataFrame 'df_vendas_agrupado' não está disponível ou está vazio.")
     st.stop()
 
 df_cadastro = validar_df("df_cadastro", carregar_df_cadastro)
 
-# ---------------- FILTRO DE CLIENTES ----------------
-
-ignorar_99999 = st.checkbox("Ignorar cliente 99999", value=True)
-if ignorar_99999:
-    df_vendas_agrupado = df_vendas_agrupado[df_vendas_agrupado["Cliente"] != 99999]
-
 # ---------------- CÁLCULO DE MÉTRICAS ----------------
 
-total_customers, returning_customers, df_clientes = calcular_metricas_clientes(df_vendas_agrupado)
+total_customers, returning_customers, df_clientes = calcular_metricas_clientes(chave_dados, df_vendas_agrupado)
 
 # Cálculo seguro da taxa de retorno
 return_rate = 0
@@ -90,11 +67,14 @@ st.markdown("### 📋 Perfil dos Clientes")
 df_clientes = df_clientes.sort_values("total_vendas", ascending=False)
 
 # Formatação segura dos valores monetários
-df_clientes["total_vendas_fmt"] = df_clientes["total_vendas"].apply(
-    lambda x: formatar_moeda_brasileira(x) if not pd.isna(x) else "R$ 0,00"
-)
-df_clientes["ticket_medio_fmt"] = df_clientes["ticket_medio"].apply(
-    lambda x: formatar_moeda_brasileira(x) if not pd.isna(x) else "R$ 0,00"
+df_clientes["total_vendas_fmt"] = formatar_coluna_moeda(df_clientes["total_vendas"])
+df_clientes["ticket_medio_fmt"] = formatar_coluna_moeda(df_clientes["ticket_medio"])
+
+# Notas nulas (cliente sem valor ou sem data) aparecem como "-"
+df_clientes["rfm"] = (
+    df_clientes["nota_recencia"].astype("string").fillna("-") + "-"
+    + df_clientes["nota_frequencia"].astype("string").fillna("-") + "-"
+    + df_clientes["nota_monetaria"].astype("string").fillna("-")
 )
 
 df_display = df_clientes.rename(columns={
@@ -102,8 +82,10 @@ df_display = df_clientes.rename(columns={
     "total_vendas_fmt": "Total Vendido",
     "num_compras": "Compras",
     "ticket_medio_fmt": "Ticket Médio",
-    "itens_totais": "Itens Totais"
-})[["Cliente", "Total Vendido", "Compras", "Ticket Médio", "Itens Totais"]]
+    "itens_totais": "Itens Totais",
+    "recencia_dias": "Dias desde a Última Compra",
+    "rfm": "RFM (R-F-M)"
+})[["Cliente", "Total Vendido", "Compras", "Ticket Médio", "Itens Totais", "Dias desde a Última Compra", "RFM (R-F-M)"]]
 
 st.dataframe(df_display, use_container_width=True)
 
@@ -159,6 +141,9 @@ if not top_df.empty:
         )
     )
     
-    st.altair_chart(chart, use_container_width=True)
+    with medir_etapa("grafico_top_clientes"):
+        st.altair_chart(chart, use_container_width=True)
 else:
-    st.warning("Não há dados suficientes para exibir o gráfico.")
\ No newline at end of file
+    st.warning("Não há dados suficientes para exibir o gráfico.")
+
+mostrar_painel_desempenho()
@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
 from typing import Optional
+from utils.analise import calcular_vendas_por_local
+from utils.desempenho import dados_em_cache, mostrar_painel_desempenho
 from utils.processamento import (
     carregar_df_cadastro,
-    carregar_df_vendas,
+    carregar_versao_dados,
     processa_df_venda_agrupado,
 )
-from utils.moeda import formatar_moeda_brasileira
+from utils.moeda import formatar_coluna_moeda
 from utils.sessao import inicializar_app, validar_df
 
 # ---------------- CONFIGURAÇÃO INICIAL ----------------
@@ -16,33 +18,18 @@ st.title("📊 Indicadores de Vendas")
 
 # ---------------- FUNÇÕES AUXILIARES ----------------
 
-@st.cache_data
-def calcular_vendas_por_localizacao(df: pd.DataFrame, campo: str) -> pd.DataFrame:
+@dados_em_cache()
+def calcular_vendas_por_localizacao(versao_dados: str, _df: pd.DataFrame, campo: str) -> pd.DataFrame:
     """
     Agrupa o número de vendas e o valor total por campo de localização (ex: Bairro).
     """
-    if campo not in df.columns or "Controle" not in df.columns or "TotalVenda" not in df.columns:
-        print(f"⚠️ Campo '{campo}' não encontrado no DataFrame.")
-        return pd.DataFrame(columns=[campo, "Vendas", "ValorTotal"])
-
-    df_filtrado = df.dropna(subset=[campo, "Controle", "TotalVenda"])
-    print(f"🔍 Agrupando por: {campo} (total de registros: {len(df_filtrado)})")
-
-    df_grouped = (
-        df_filtrado
-        .groupby(campo, as_index=False)
-        .agg(
-            Vendas=("Controle", "nunique"),
-            ValorTotal=("TotalVenda", "sum")
-        )
-        .sort_values("Vendas", ascending=False, ignore_index=True)
-    )
-
-    df_grouped["ValorTotalFormatado"] = df_grouped["ValorTotal"].map(formatar_moeda_brasileira)
+    df_grouped = calcular_vendas_por_local(_df, campo)
+    df_grouped["ValorTotalFormatado"] = formatar_coluna_moeda(df_grouped["ValorTotal"])
     return df_grouped
 
 # ---------------- CARREGAMENTO DE DADOS ----------------
 
+versao_dados = carregar_versao_dados()
 df_cadastro = validar_df("df_cadastro", carregar_df_cadastro)
 df_vendas_agrupado = validar_df("df_vendas_agrupado", processa_df_venda_agrupado)
 
@@ -64,7 +51,7 @@ if not coluna_local:
     st.warning("⚠️ Nenhuma coluna relacionada a bairro ou local de entrega foi encontrada.")
 else:
     st.markdown(f"**Campo analisado:** `{coluna_local}`")
-    df_bairro = calcular_vendas_por_localizacao(df_vendas_agrupado, coluna_local)
+    df_bairro = calcular_vendas_por_localizacao(versao_dados, df_vendas_agrupado, coluna_local)
 
     if df_bairro.empty:
         st.warning("⚠️ Não há dados suficientes para agrupar por esse campo.")
@@ -73,3 +60,5 @@ else:
             df_bairro[[coluna_local, "Vendas", "ValorTotalFormatado"]],
             use_container_width=True
         )
+
+mostrar_painel_desempenho()
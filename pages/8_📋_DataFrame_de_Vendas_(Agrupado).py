@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
+from utils.desempenho import mostrar_painel_desempenho
 from utils.visualizacao import mostrar_paginado
 from utils.sessao import inicializar_app
-from utils.processamento import processa_df_venda_agrupado
+from utils.processamento import processa_df_venda_agrupado, carregar_versao_dados
 
 st.set_page_config(page_title="df_vendas_agrupado", layout="wide")
 
 inicializar_app()
+versao_dados = carregar_versao_dados()
 
 st.title("📋 DataFrame de Vendas (Agrupado)")
 
@@ -21,4 +23,6 @@ if not isinstance(df, pd.DataFrame) or df.empty:
 
 df_vendas_agrupado: pd.DataFrame = df
 
-mostrar_paginado(df_vendas_agrupado, "df_vendas_agrupado")
+mostrar_paginado(df_vendas_agrupado, "df_vendas_agrupado", chave_dados=versao_dados)
+
+mostrar_painel_desempenho()
@@ -1,12 +1,14 @@
 import streamlit as st
 import pandas as pd
+from utils.desempenho import mostrar_painel_desempenho
 from utils.visualizacao import mostrar_paginado
 from utils.sessao import inicializar_app
-from utils.processamento import carregar_df_vendas
+from utils.processamento import carregar_df_vendas, carregar_versao_dados
 
 st.set_page_config(page_title="df_vendas", layout="wide")
 
 inicializar_app()
+versao_dados = carregar_versao_dados()
 
 st.title("📋 DataFrame de Vendas (Original)")
 
@@ -24,4 +26,6 @@ if not isinstance(df, pd.DataFrame) or df.empty:
 df_vendas: pd.DataFrame = df
 
 # Exibe o DataFrame paginado
-mostrar_paginado(df_vendas, "df_vendas")
+mostrar_paginado(df_vendas, "df_vendas", chave_dados=versao_dados)
+
+mostrar_painel_desempenho()
@@ -1,7 +1,8 @@
 import streamlit as st
-from utils.sessao import salvar_caminhos
+from utils.desempenho import mostrar_painel_desempenho
+from utils.sessao import atualizar_vendas, salvar_caminhos
 from utils.constantes import CAMINHO_PADRAO_VENDAS, CAMINHO_PADRAO_CADASTRO
-from utils.sessao import inicializar_app
+from utils.sessao import inicializar_app, mostrar_preaquecimento
 import tempfile
 import os
 import shutil
@@ -26,7 +27,7 @@ def salvar_upload_temp(uploaded_file, tipo: str) -> str:
 # --- Upload ou caminho manual do arquivo de vendas
 uploaded_vendas = st.file_uploader("📄 Selecionar Arquivo de Vendas (.csv)", type=["csv"])
 caminho_vendas_texto = st.text_input(
-    "📄 Ou digite o caminho do Arquivo de Vendas",
+    "📄 Ou digite o caminho do Arquivo de Vendas (arquivo, diretório ou padrão como dados/vendas_*.csv)",
     value=st.session_state.get("caminho_vendas", CAMINHO_PADRAO_VENDAS)
 )
 
@@ -47,7 +48,25 @@ if submit:
     salvar_caminhos(caminho_vendas_final, caminho_cadastro_final)
     st.success("✅ Caminhos atualizados com sucesso!")
 
+# --- Atualização incremental das vendas
+st.markdown("### 🔄 Vendas novas")
+st.markdown(
+    "Se o arquivo de vendas recebeu novas linhas, ou se o caminho configurado é um diretório "
+    "onde o ERP grava uma exportação por dia, apenas os dados novos são lidos e anexados."
+)
+
+if st.button("🔄 Buscar vendas novas"):
+    linhas = atualizar_vendas()
+    if linhas is not None:
+        antes, depois = linhas
+        st.success(f"✅ Vendas atualizadas: {depois - antes} linhas novas ({depois} no total).")
+
 # --- Exibe caminhos carregados
 st.markdown("### 🔍 Caminhos atuais carregados")
 st.write(f"**Arquivo de Vendas:** `{st.session_state.get('caminho_vendas', CAMINHO_PADRAO_VENDAS)}`")
 st.write(f"**Arquivo de Cadastro:** `{st.session_state.get('caminho_cadastro', CAMINHO_PADRAO_CADASTRO)}`")
+
+# --- Preparação dos dados em segundo plano, iniciada ao salvar os caminhos ou buscar vendas novas
+st.markdown("### ⏳ Preparação dos dados")
+mostrar_painel_desempenho()
+mostrar_preaquecimento()
@@ -0,0 +1,72 @@
+# python precalcular.py --vendas <origem> --cadastro <csv> --saida <diretório> [--formato CSV|Parquet]
+#
+# Calcula, sem o Streamlit, todas as tabelas derivadas exibidas pelo dashboard
+# (utils/analise.py) e grava cada uma em um arquivo no diretório de saída,
+# junto com um manifesto (manifesto.json) com a versão dos dados e a
+# quantidade de linhas de cada tabela. Serve para pré-calcular as tabelas em
+# lote (por exemplo, em uma tarefa agendada) ou para consumi-las fora do app.
+
+import argparse
+import json
+import os
+import sys
+import time
+from utils.analise import calcular_tabelas_dashboard
+from utils.caminho import caminho_valido, origem_vendas_valida
+from utils.carregamento import ler_df_cadastro
+from utils.exportacao import FORMATOS_EXPORTACAO, exportar_arquivo
+from utils.incremental import atualizar_base_vendas
+from utils.produtos import montar_dimensao_produtos
+
+NOME_MANIFESTO = "manifesto.json"
+
+def precalcular(caminho_vendas: str, caminho_cadastro: str, diretorio_saida: str, formato: str = "Parquet") -> dict:
+    """Grava as tabelas do dashboard em `diretorio_saida` e retorna o manifesto gravado."""
+    inicio = time.perf_counter()
+    base = atualizar_base_vendas(caminho_vendas)
+    dimensao = montar_dimensao_produtos(ler_df_cadastro(caminho_cadastro))
+    tabelas = calcular_tabelas_dashboard(base, dimensao)
+
+    os.makedirs(diretorio_saida, exist_ok=True)
+    arquivos = {}
+    for nome, tabela in tabelas.items():
+        caminho = exportar_arquivo(tabela, formato, diretorio_saida, nome)
+        arquivos[nome] = {"arquivo": os.path.basename(caminho), "linhas": len(tabela)}
+        print(f"✅ {nome}: {len(tabela)} linhas")
+
+    manifesto = {
+        "versao": base["versao"],
+        "vendas": caminho_vendas,
+        "cadastro": caminho_cadastro,
+        "linhas_vendas": base["linhas_vendas"],
+        "resumida": base["resumida"],
+        "formato": formato,
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "segundos": round(time.perf_counter() - inicio, 2),
+        "tabelas": arquivos,
+    }
+    with open(os.path.join(diretorio_saida, NOME_MANIFESTO), "w", encoding="utf-8") as destino:
+        json.dump(manifesto, destino, ensure_ascii=False, indent=2)
+    return manifesto
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pré-calcula as tabelas do dashboard sem o Streamlit.")
+    parser.add_argument("--vendas", required=True, help="CSV, diretório ou padrão glob com as vendas")
+    parser.add_argument("--cadastro", required=True, help="CSV do cadastro de produtos")
+    parser.add_argument("--saida", required=True, help="diretório onde as tabelas serão gravadas")
+    parser.add_argument("--formato", choices=list(FORMATOS_EXPORTACAO), default="Parquet")
+    args = parser.parse_args()
+
+    if not origem_vendas_valida(args.vendas):
+        print(f"❌ Origem de vendas inválida: {args.vendas}", file=sys.stderr)
+        return 1
+    if not caminho_valido(args.cadastro):
+        print(f"❌ Caminho do cadastro inválido: {args.cadastro}", file=sys.stderr)
+        return 1
+
+    manifesto = precalcular(args.vendas, args.cadastro, args.saida, args.formato)
+    print(f"📁 {len(manifesto['tabelas'])} tabelas gravadas em {args.saida} ({manifesto['segundos']} s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import io
+import os
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.gerador import gerar_df_vendas
+from utils.exportacao import exportar_arquivo, exportar_parquet
+
+# Pico de memória alocada aceito na exportação em blocos de 100 mil vendas. O
+# CSV inteiro tem cerca de 5 MB, e montá-lo em memória a partir da visão
+# ordenada passa de 20 MB.
+NUM_LINHAS = 100_000
+LINHAS_POR_BLOCO = 5_000
+ORCAMENTO_MB = 4
+
+@pytest.fixture(scope="module")
+def vendas():
+    df = gerar_df_vendas(NUM_LINHAS)
+    return df, np.argsort(df["TotalItem"].to_numpy(), kind="stable")
+
+@pytest.mark.parametrize("formato", ["CSV", "Parquet"])
+def test_exportacao_em_blocos_respeita_orcamento_de_memoria(vendas, formato, tmp_path):
+    df, posicoes = vendas
+    tracemalloc.start()
+    try:
+        caminho = exportar_arquivo(df, formato, str(tmp_path), "vendas", posicoes, linhas_por_bloco=LINHAS_POR_BLOCO)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert os.path.getsize(caminho) > 0
+    assert pico / 1024 ** 2 < ORCAMENTO_MB
+
+def test_csv_em_blocos_igual_ao_to_csv(vendas, tmp_path):
+    df, posicoes = vendas
+    caminho = exportar_arquivo(df, "CSV", str(tmp_path), "vendas", posicoes, linhas_por_bloco=LINHAS_POR_BLOCO)
+    with open(caminho, "rb") as arquivo:
+        assert arquivo.read() == df.take(posicoes).to_csv(index=False).encode("utf-8")
+
+def test_parquet_com_coluna_de_texto_nula_no_primeiro_bloco():
+    df = pd.DataFrame({
+        "Bairro": [None, None, None, "Centro", None, "Jardim"],
+        "Controle": range(6),
+        "Cliente": pd.array([1, None, 3, 4, 5, 6], dtype="Int32"),
+        "Vazia": [None] * 6,
+    })
+    destino = io.BytesIO()
+    exportar_parquet(df, destino, linhas_por_bloco=3)
+    pd.testing.assert_frame_equal(pd.read_parquet(io.BytesIO(destino.getvalue())), df)
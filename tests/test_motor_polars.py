@@ -0,0 +1,62 @@
+import io
+import pandas as pd
+import pytest
+from benchmarks.bench_motor_duckdb import injetar_nulos
+from benchmarks.bench_motor_polars import TOLERANCIA_SOMAS, variantes_datas
+from benchmarks.gerador import gerar_df_vendas, salvar_csv
+from utils.carregamento import agrupar_vendas_por_controle, calcular_vendas_agrupadas, ler_df_vendas
+
+pytest.importorskip("polars")
+
+NUM_LINHAS = 20_000
+
+@pytest.fixture(scope="module")
+def vendas():
+    return injetar_nulos(gerar_df_vendas(NUM_LINHAS))
+
+@pytest.fixture(scope="module")
+def caminho_vendas(vendas, tmp_path_factory):
+    caminho = str(tmp_path_factory.mktemp("vendas") / "NotasFW_ProdInfo.csv")
+    salvar_csv(vendas, caminho)
+    return caminho
+
+def _tabelas(caminho, motor: str):
+    """Leitura, vendas por controle e totais por produto, como na montagem da base."""
+    df_vendas = ler_df_vendas(caminho, motor=motor)
+    return df_vendas, agrupar_vendas_por_controle(df_vendas, motor=motor), calcular_vendas_agrupadas(df_vendas, motor=motor)
+
+def _comparar(caminho):
+    esperadas = _tabelas(caminho, "pandas")
+    obtidas = _tabelas(caminho, "polars")
+    # Vendas lidas iguais; totais em reais com a tolerância da soma sem compensação
+    pd.testing.assert_frame_equal(obtidas[0], esperadas[0])
+    for esperada, obtida in zip(esperadas[1:], obtidas[1:]):
+        pd.testing.assert_frame_equal(obtida, esperada, check_exact=False, rtol=TOLERANCIA_SOMAS, atol=0)
+
+def test_leitura_e_agrupamento_iguais_ao_pandas(caminho_vendas):
+    _comparar(caminho_vendas)
+
+def test_leitura_em_memoria_igual_ao_pandas(caminho_vendas):
+    with open(caminho_vendas, "rb") as arquivo:
+        conteudo = arquivo.read()
+    pd.testing.assert_frame_equal(
+        ler_df_vendas(io.BytesIO(conteudo), motor="polars"),
+        ler_df_vendas(io.BytesIO(conteudo), motor="pandas"),
+    )
+
+@pytest.mark.parametrize("variante", ["datas fora do formato", "fração de segundo", "apenas a data"])
+def test_formatos_de_data_iguais_ao_pandas(vendas, variante, tmp_path):
+    caminho = str(tmp_path / "vendas.csv")
+    salvar_csv(variantes_datas(vendas)[variante], caminho)
+    _comparar(caminho)
+
+def test_totais_por_produto_e_por_controle_nao_vazios(caminho_vendas):
+    _, por_controle, por_produto = _tabelas(caminho_vendas, "polars")
+    assert len(por_controle) > 0 and len(por_produto) > 0
+    assert por_controle["Controle"].is_monotonic_increasing
+    assert por_produto["ProCod"].is_monotonic_increasing
+
+@pytest.mark.parametrize("motor", ["Polars", "polar", "duckdb"])
+def test_motor_de_leitura_invalido(caminho_vendas, motor):
+    with pytest.raises(ValueError, match="Motor de leitura das vendas inválido"):
+        ler_df_vendas(caminho_vendas, motor=motor)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+from benchmarks.gerador import gerar_df_vendas, salvar_csv
+from utils.registro import obter_base_vendas
+
+def _dados(valores: pd.Series) -> np.ndarray:
+    """Buffer numpy que guarda os valores da coluna (códigos, no caso de categorias)."""
+    array = valores.array
+    if isinstance(array, pd.Categorical):
+        return array.codes
+    for atributo in ("_ndarray", "_data"):
+        if isinstance(getattr(array, atributo, None), np.ndarray):
+            return getattr(array, atributo)
+    return np.asarray(array)
+
+def pagina():
+    import streamlit as st
+    from utils.processamento import carregar_df_vendas
+    from utils.sessao import validar_df
+
+    st.session_state.setdefault("execucoes", []).append(validar_df("df_vendas", carregar_df_vendas))
+
+def test_validar_df_nao_copia_as_vendas_na_reexecucao(tmp_path, monkeypatch):
+    # Os snapshots das vendas são gravados em um diretório relativo ao atual
+    monkeypatch.chdir(tmp_path)
+    caminho = str(tmp_path / "NotasFW_ProdInfo.csv")
+    salvar_csv(gerar_df_vendas(10_000), caminho)
+
+    app = AppTest.from_function(pagina)
+    app.session_state["caminho_vendas"] = caminho
+    app.run()
+    app.run()
+    assert not app.exception and not app.error
+
+    primeira, segunda = app.session_state["execucoes"]
+    compartilhado = obter_base_vendas(caminho)["df_vendas"]
+    assert segunda is primeira is compartilhado
+    for coluna in compartilhado.columns:
+        assert np.shares_memory(_dados(segunda[coluna]), _dados(compartilhado[coluna])), coluna
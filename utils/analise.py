@@ -0,0 +1,118 @@
+import unicodedata
+import pandas as pd
+from typing import Dict, Tuple
+from utils import motor_duckdb
+from utils.carregamento import eh_cliente_anonimo
+from utils.clientes import calcular_metricas_clientes
+from utils.constantes import MOTOR_AGREGACAO
+from utils.cubo import GRANULARIDADES, agregar_tabelas_temporais, calcular_totais_cubo
+from utils.giro import ROTULOS_PERIODO, montar_giro
+from utils.instrumentacao import instrumentar
+from utils.produtos import anexar_cadastro, filtrar_nao_vendidos, marcar_vendidos
+
+# Núcleo analítico: as tabelas exibidas pelo dashboard, calculadas a partir de
+# uma base de vendas (utils/incremental.py) e da dimensão de produtos
+# (utils/produtos.py), sem depender do Streamlit. O registro compartilhado
+# (utils/registro.py) guarda em memória os resultados destas funções para as
+# páginas; o `precalcular.py` as usa para gravar todas as tabelas em disco.
+
+# Nome de cada tabela temporal, na ordem de `agregar_tabelas_temporais`
+NOMES_TABELAS_TEMPORAIS = list(GRANULARIDADES.values())
+
+@instrumentar()
+def calcular_indicadores_temporais(cubo: Dict[str, object], ignorar_anonimo: bool) -> Tuple[Tuple[pd.DataFrame, ...], int, float]:
+    """Tabelas temporais, total de clientes distintos e total vendido do cubo diário."""
+    total_clientes, total_vendas = calcular_totais_cubo(cubo, ignorar_anonimo)
+    return agregar_tabelas_temporais(cubo, ignorar_anonimo), total_clientes, total_vendas
+
+def filtrar_vendas_agrupadas(df_vendas_agrupado: pd.DataFrame, ignorar_anonimo: bool) -> pd.DataFrame:
+    """Vendas agrupadas por controle, com ou sem o cliente não identificado (ID 99999)."""
+    if not ignorar_anonimo:
+        return df_vendas_agrupado
+    return df_vendas_agrupado[~eh_cliente_anonimo(df_vendas_agrupado["Cliente"])].reset_index(drop=True)
+
+@instrumentar()
+def calcular_produtos_vendidos(df_produtos_totais: pd.DataFrame, dimensao: Dict[str, object]) -> pd.DataFrame:
+    """Totais por produto com os dados do cadastro, do maior para o menor valor vendido."""
+    df = anexar_cadastro(df_produtos_totais, dimensao).rename(columns={"ProNom": "Produto"})
+    df["TotalItem"] = pd.to_numeric(df["TotalItem"], errors="coerce")
+    df["Quantidade"] = pd.to_numeric(df["Quantidade"], errors="coerce")
+    return df.sort_values(by="TotalItem", ascending=False).dropna(subset=["TotalItem", "Quantidade"])
+
+@instrumentar()
+def calcular_produtos_nao_vendidos(df_produtos_totais: pd.DataFrame, dimensao: Dict[str, object]) -> pd.DataFrame:
+    """Linhas do cadastro cujos produtos não aparecem nas vendas (os totais têm um código por produto vendido)."""
+    return filtrar_nao_vendidos(dimensao, marcar_vendidos(dimensao, df_produtos_totais["ProCod"]))
+
+def vendas_para_giro(base: Dict[str, object]) -> pd.DataFrame:
+    """Vendas usadas no giro: item a item ou, na base resumida, por dia e produto (com o mesmo resultado)."""
+    return base["df_vendas_produto_dia"] if base["resumida"] else base["df_vendas"]
+
+@instrumentar()
+def calcular_vendas_por_local(
+    df_vendas_agrupado: pd.DataFrame,
+    campo: str,
+    motor: str = MOTOR_AGREGACAO,
+) -> pd.DataFrame:
+    """Número de vendas e valor total por campo de localização (ex: Bairro), da maior para a menor quantidade."""
+    df = df_vendas_agrupado
+    colunas = [campo, "Controle", "TotalVenda"]
+    if not all(coluna in df.columns for coluna in colunas):
+        return pd.DataFrame(columns=[campo, "Vendas", "ValorTotal"])
+
+    if motor_duckdb.usa_duckdb(motor):
+        por_local = motor_duckdb.calcular_vendas_por_local(df, campo)
+    else:
+        por_local = (
+            df[colunas]
+            .dropna()
+            .groupby(campo, as_index=False, observed=True)
+            .agg(
+                Vendas=("Controle", "nunique"),
+                ValorTotal=("TotalVenda", "sum")
+            )
+        )
+    return por_local.sort_values("Vendas", ascending=False, ignore_index=True)
+
+def _sufixo_variante(ignorar_anonimo: bool) -> str:
+    return "sem_anonimo" if ignorar_anonimo else "completo"
+
+def _nome_tabela(texto: str) -> str:
+    """Nome sem acentos, em minúsculas e com "_" no lugar de espaços ("Dia da Semana" -> "dia_da_semana")."""
+    sem_acentos = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+    return sem_acentos.lower().replace(" ", "_")
+
+def calcular_tabelas_dashboard(base: Dict[str, object], dimensao: Dict[str, object]) -> Dict[str, pd.DataFrame]:
+    """
+    Calcula todas as tabelas derivadas exibidas pelo dashboard, por nome:
+    - "indicadores_<granularidade>_<variante>": tabelas temporais (página 2)
+    - "totais_<variante>": total de clientes distintos e total vendido
+    - "produtos_vendidos" e "giro_<período>" (página 3)
+    - "produtos_nao_vendidos" (página 4)
+    - "clientes_<variante>": métricas e notas RFM por cliente (página 5)
+    - "vendas_por_bairro" (página 6) e "vendas_agrupadas" (página 8)
+    As variantes são "completo" e "sem_anonimo" (sem o cliente 99999).
+    """
+    tabelas: Dict[str, pd.DataFrame] = {}
+
+    for ignorar_anonimo in (True, False):
+        variante = _sufixo_variante(ignorar_anonimo)
+        temporais, total_clientes, total_vendas = calcular_indicadores_temporais(base["cubo_diario"], ignorar_anonimo)
+        for nome, tabela in zip(NOMES_TABELAS_TEMPORAIS, temporais):
+            tabelas[f"indicadores_{_nome_tabela(nome)}_{variante}"] = tabela
+        tabelas[f"totais_{variante}"] = pd.DataFrame({"TotalClientes": [total_clientes], "TotalVenda": [total_vendas]})
+
+        _, _, df_clientes = calcular_metricas_clientes(filtrar_vendas_agrupadas(base["df_vendas_agrupado"], ignorar_anonimo))
+        tabelas[f"clientes_{variante}"] = df_clientes
+
+    tabelas["produtos_vendidos"] = calcular_produtos_vendidos(base["df_produtos_totais"], dimensao)
+    tabelas["produtos_nao_vendidos"] = calcular_produtos_nao_vendidos(base["df_produtos_totais"], dimensao)
+
+    vendas = vendas_para_giro(base)
+    for periodo in ROTULOS_PERIODO:
+        tabelas[f"giro_{_nome_tabela(periodo)}"] = montar_giro(vendas, dimensao, periodo)["tabela"]
+
+    tabelas["vendas_por_bairro"] = calcular_vendas_por_local(base["df_vendas_agrupado"], "Bairro")
+    tabelas["vendas_agrupadas"] = base["df_vendas_agrupado"]
+
+    return tabelas
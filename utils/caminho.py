@@ -1,7 +1,36 @@
 import pandas as pd
-from typing import Union, IO, Optional
+from typing import List, Union, IO, Optional
+import glob
+import hashlib
 import os
 
 def caminho_valido(path: Optional[Union[str, IO]]) -> bool:
     """Verifica se o caminho é uma string válida e aponta para um arquivo existente."""
-    return isinstance(path, str) and os.path.isfile(path)
\ No newline at end of file
+    return isinstance(path, str) and os.path.isfile(path)
+
+def listar_arquivos_vendas(caminho: str) -> List[str]:
+    """
+    Lista os arquivos de vendas de uma origem: o próprio arquivo ou, se for um
+    diretório (por exemplo, exportações diárias do ERP), os CSVs contidos nele
+    em ordem de nome. Padrões glob ("dados/vendas_2024-*.csv") listam os
+    arquivos correspondentes, também em ordem de nome.
+    """
+    if glob.has_magic(caminho):
+        return sorted(arquivo for arquivo in glob.glob(caminho) if os.path.isfile(arquivo))
+    if os.path.isdir(caminho):
+        return sorted(
+            os.path.join(caminho, nome)
+            for nome in os.listdir(caminho)
+            if nome.lower().endswith(".csv") and os.path.isfile(os.path.join(caminho, nome))
+        )
+    return [caminho] if os.path.isfile(caminho) else []
+
+def origem_vendas_valida(path: Optional[Union[str, IO]]) -> bool:
+    """Verifica se o caminho é um arquivo de vendas ou um diretório com arquivos CSV."""
+    return isinstance(path, str) and bool(listar_arquivos_vendas(path))
+
+def assinatura_arquivo(caminho: str) -> str:
+    """Gera uma assinatura curta do arquivo a partir do caminho absoluto, tamanho e data de modificação."""
+    info = os.stat(caminho)
+    chave = f"{os.path.abspath(caminho)}|{info.st_size}|{info.st_mtime_ns}"
+    return hashlib.sha1(chave.encode("utf-8")).hexdigest()[:16]
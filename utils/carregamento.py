@@ -0,0 +1,324 @@
+import io
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from typing import Callable, Dict, Iterator, List, Optional, Union, IO
+from utils import motor_duckdb, motor_polars
+from utils.constantes import CLIENTE_ANONIMO, DIAS_SEMANA_ORDENADOS, MOTOR_AGREGACAO, SEMESTRES
+from utils.esquema import (
+    COLUNA_DATA_VENDAS,
+    DELIMITADOR_CSV,
+    ESQUEMA_CADASTRO,
+    ESQUEMA_VENDAS,
+    FORMATO_DATA_VENDAS,
+    MOTOR_CSV,
+    MOTOR_LEITURA_VENDAS,
+)
+from utils.instrumentacao import instrumentar
+
+# Copy-on-write em todo o projeto: os DataFrames compartilhados pelo registro
+# são entregues às páginas como visões, e qualquer alteração feita por uma
+# página gera uma cópia local apenas da parte alterada, sem afetar os demais.
+pd.set_option("mode.copy_on_write", True)
+
+def _ler_cabecalho(caminho: Union[str, IO]) -> List[str]:
+    """Lê apenas a linha de cabeçalho do CSV."""
+    colunas = pd.read_csv(caminho, delimiter=DELIMITADOR_CSV, nrows=0).columns.tolist()
+    if hasattr(caminho, "seek"):
+        caminho.seek(0)
+    return colunas
+
+def _compactar_inteiros(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte colunas "Int32" sem valores ausentes para o tipo numpy "int32"."""
+    compactas = {
+        coluna: "int32"
+        for coluna, tipo in df.dtypes.items()
+        if tipo == "Int32" and not df[coluna].hasnans
+    }
+    return df.astype(compactas) if compactas else df
+
+def _opcoes_leitura(
+    caminho: Union[str, IO],
+    esquema: Dict[str, Optional[str]],
+    colunas_extras: Optional[List[str]],
+) -> Dict[str, object]:
+    """Argumentos `usecols` e `dtype` do `pd.read_csv` para o esquema informado."""
+    cabecalho = _ler_cabecalho(caminho)
+    tipos = {
+        coluna: tipo
+        for coluna, tipo in esquema.items()
+        if coluna in cabecalho and tipo is not None
+    }
+
+    usecols = None
+    if colunas_extras is not None:
+        desejadas = set(esquema) | set(colunas_extras)
+        usecols = [coluna for coluna in cabecalho if coluna in desejadas]
+
+    return {"usecols": usecols, "dtype": tipos}
+
+def ler_csv_tipado(
+    caminho: Union[str, IO],
+    esquema: Dict[str, Optional[str]],
+    colunas_extras: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """
+    Lê um CSV aplicando os tipos do esquema.
+
+    Se `colunas_extras` for informado, apenas as colunas do esquema e as extras
+    são carregadas; caso contrário, todas as colunas do arquivo são lidas.
+    """
+    df = pd.read_csv(
+        caminho,
+        delimiter=DELIMITADOR_CSV,
+        engine=MOTOR_CSV,
+        **_opcoes_leitura(caminho, esquema, colunas_extras),
+    )
+    return _compactar_inteiros(df)
+
+def converter_datas(valores: pd.Series, formato: str) -> pd.Series:
+    """
+    Converte a coluna para datetime usando o formato fixo. Valores que não seguem
+    o formato são interpretados individualmente; os inválidos viram NaT.
+    """
+    datas = pd.to_datetime(valores, format=formato, errors="coerce")
+
+    falhas = datas.isna() & valores.notna()
+    if falhas.any():
+        datas[falhas] = pd.to_datetime(valores[falhas], errors="coerce")
+
+    return datas
+
+@instrumentar()
+def calcular_vendas_agrupadas(df_vendas: pd.DataFrame, motor: str = MOTOR_AGREGACAO) -> pd.DataFrame:
+    if not {"ProCod", "Quantidade", "TotalItem"}.issubset(df_vendas.columns):
+        raise ValueError("Colunas necessárias não estão presentes no DataFrame.")
+    if motor_duckdb.usa_duckdb(motor):
+        return motor_duckdb.calcular_vendas_agrupadas(df_vendas)
+    if motor_polars.usa_polars(motor):
+        return motor_polars.calcular_vendas_agrupadas(df_vendas)
+    return df_vendas.groupby("ProCod")[["Quantidade", "TotalItem"]].sum().reset_index()
+
+def concatenar_vendas(partes: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatena DataFrames de vendas preservando as colunas categóricas: as
+    categorias das partes são unidas (em ordem) em vez de virarem texto.
+    """
+    if len(partes) == 1:
+        return partes[0]
+
+    colunas = {}
+    for coluna in dict.fromkeys(c for parte in partes for c in parte.columns):
+        series = [parte[coluna] for parte in partes if coluna in parte.columns]
+        if len(series) == len(partes) and all(isinstance(s.dtype, pd.CategoricalDtype) for s in series):
+            colunas[coluna] = union_categoricals(series, sort_categories=not series[0].cat.ordered)
+        else:
+            colunas[coluna] = pd.concat(
+                [parte.reindex(columns=[coluna])[coluna] for parte in partes],
+                ignore_index=True,
+            )
+    return pd.DataFrame(colunas)
+
+def eh_cliente_anonimo(clientes: pd.Series) -> np.ndarray:
+    """Máscara das linhas do cliente não identificado (ID 99999); clientes nulos não contam como anônimos."""
+    return (clientes == CLIENTE_ANONIMO).fillna(False).to_numpy(dtype=bool)
+
+@instrumentar()
+def ler_df_cadastro(caminho: Union[str, IO]) -> pd.DataFrame:
+    """Lê o arquivo de cadastro de produtos."""
+    return ler_csv_tipado(caminho, ESQUEMA_CADASTRO)
+
+def ler_linhas_novas_vendas(caminho: str, inicio: int, fim: int) -> pd.DataFrame:
+    """Lê apenas as linhas do CSV de vendas gravadas entre as posições (em bytes) informadas."""
+    with open(caminho, "rb") as arquivo:
+        cabecalho = arquivo.readline()
+        arquivo.seek(inicio)
+        linhas = arquivo.read(fim - inicio)
+    return ler_df_vendas(io.BytesIO(cabecalho + linhas))
+
+def _preparar_df_vendas(df: pd.DataFrame) -> pd.DataFrame:
+    df["Data"] = converter_datas(df[COLUNA_DATA_VENDAS], FORMATO_DATA_VENDAS)
+    df = df.dropna(subset=["Data"])  # Garante que todas as datas são válidas
+
+    return adicionar_colunas_temporais(df)
+
+def _ler_df_vendas_polars(caminho: Union[str, IO]) -> pd.DataFrame:
+    """Leitura pelo Polars (ver utils/motor_polars.py), com as colunas temporais obtidas por dia distinto."""
+    opcoes = _opcoes_leitura(caminho, ESQUEMA_VENDAS, [COLUNA_DATA_VENDAS])
+    df, codigos_dia, dias = motor_polars.ler_vendas(
+        caminho, opcoes["usecols"], opcoes["dtype"], COLUNA_DATA_VENDAS, DELIMITADOR_CSV
+    )
+    rotulos = adicionar_colunas_temporais(pd.DataFrame({"Data": dias}))
+    return _compactar_inteiros(df).assign(**{
+        coluna: rotulos[coluna].array.take(codigos_dia)
+        for coluna in rotulos.columns.drop("Data")
+    })
+
+@instrumentar()
+def ler_df_vendas(caminho: Union[str, IO], motor: str = MOTOR_LEITURA_VENDAS) -> pd.DataFrame:
+    """Lê o CSV de vendas e adiciona as colunas temporais derivadas da coluna 'Data'."""
+    if motor_polars.le_com_polars(motor):
+        return _ler_df_vendas_polars(caminho)
+    return _preparar_df_vendas(ler_csv_tipado(caminho, ESQUEMA_VENDAS, colunas_extras=[COLUNA_DATA_VENDAS]))
+
+def ler_df_vendas_em_blocos(caminho: Union[str, IO], linhas_por_bloco: int) -> Iterator[pd.DataFrame]:
+    """
+    Lê o CSV de vendas em blocos de até `linhas_por_bloco` linhas, cada um já com
+    os tipos do esquema e as colunas temporais, sem carregar o arquivo inteiro.
+
+    A leitura em blocos usa o motor "c" do pandas (o "pyarrow" não lê em blocos).
+    """
+    opcoes = _opcoes_leitura(caminho, ESQUEMA_VENDAS, [COLUNA_DATA_VENDAS])
+
+    # O motor "c" converte colunas "Int32" valor a valor, a partir do texto: elas
+    # são lidas como numéricas e convertidas depois, bloco a bloco
+    inteiros = {coluna: tipo for coluna, tipo in opcoes["dtype"].items() if tipo == "Int32"}
+    opcoes["dtype"] = {coluna: tipo for coluna, tipo in opcoes["dtype"].items() if coluna not in inteiros}
+
+    blocos = pd.read_csv(
+        caminho,
+        delimiter=DELIMITADOR_CSV,
+        engine="c",
+        chunksize=linhas_por_bloco,
+        **opcoes,
+    )
+    with blocos:
+        for bloco in blocos:
+            yield _preparar_df_vendas(_compactar_inteiros(bloco.astype(inteiros)))
+
+def _categorizar(valores: pd.Series, formatar: Callable[[pd.Index], pd.Index]) -> pd.Categorical:
+    """Codifica os valores como categóricos, formatando como texto apenas os valores únicos."""
+    codigos, unicos = pd.factorize(valores, sort=True)
+    return pd.Categorical.from_codes(codigos, categories=formatar(unicos))
+
+def adicionar_colunas_temporais(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adiciona as colunas temporais derivadas da coluna 'Data' (sem datas nulas).
+
+    Os períodos são guardados como categóricos ordenados cronologicamente: o
+    texto de cada rótulo é gerado uma vez por período, e não uma vez por linha.
+    """
+    datas = df["Data"].dt
+
+    return df.assign(
+        Ano=datas.year.astype("int16"),
+        Semestre=pd.Categorical.from_codes((datas.month > 6).astype("int8"), categories=SEMESTRES),
+        Trimestre=_categorizar(datas.to_period("Q"), lambda p: p.astype(str)),
+        MesPeriodo=_categorizar(datas.to_period("M"), lambda p: p.astype(str)),
+        SemanaInicioDt=_categorizar(datas.to_period("W"), lambda p: p.astype(str)),
+        Dia=_categorizar(datas.normalize(), lambda d: d.strftime("%Y-%m-%d")),
+        DiaSemana=pd.Categorical.from_codes(datas.dayofweek, categories=DIAS_SEMANA_ORDENADOS, ordered=True),
+    )
+
+# Colunas de cabeçalho da venda: iguais em todas as linhas de um mesmo controle,
+# são copiadas da primeira linha de cada venda
+COLUNAS_CABECALHO_VENDA = [
+    "Cliente", "Data", "Ano", "Semestre", "Trimestre", "MesPeriodo",
+    "SemanaInicioDt", "Dia", "DiaSemana", "Bairro",
+]
+
+def _primeiras_posicoes_validas(codigos: np.ndarray, valores: pd.Series, num_vendas: int) -> np.ndarray:
+    """Posição da primeira linha não nula de cada venda (-1 se todas forem nulas)."""
+    posicoes = np.flatnonzero((codigos >= 0) & valores.notna().to_numpy())
+    vendas, primeiras = np.unique(codigos[posicoes], return_index=True)
+
+    resultado = np.full(num_vendas, -1, dtype=np.int64)
+    resultado[vendas] = posicoes[primeiras]
+    return resultado
+
+def _montar_vendas_agrupadas(
+    df: pd.DataFrame,
+    total_venda: np.ndarray,
+    quantidade_itens: np.ndarray,
+    controles: np.ndarray,
+    posicoes_cabecalho: Dict[str, np.ndarray],
+) -> pd.DataFrame:
+    """Monta as vendas agrupadas, copiando os campos de cabeçalho das posições informadas."""
+    cabecalho = {
+        coluna: df[coluna].array.take(posicoes, allow_fill=True)
+        for coluna, posicoes in posicoes_cabecalho.items()
+    }
+    return pd.DataFrame({
+        "Cliente": cabecalho["Cliente"],
+        "TotalVenda": total_venda,
+        "Data": cabecalho["Data"],
+        "QuantidadeItens": quantidade_itens,
+        "Controle": controles,
+        **{coluna: cabecalho[coluna] for coluna in COLUNAS_CABECALHO_VENDA[2:] if coluna in cabecalho},
+    })
+
+@instrumentar()
+def agrupar_vendas_por_controle(df: pd.DataFrame, motor: str = MOTOR_AGREGACAO) -> pd.DataFrame:
+    """
+    Agrupa as vendas por controle em uma única passada.
+
+    O controle é fatorado uma vez; o total da venda e a quantidade de itens são
+    acumulados por índice de grupo e os campos de cabeçalho (cliente, data, colunas
+    temporais, bairro) são lidos da primeira linha de cada venda. Colunas de
+    cabeçalho com valores nulos usam a primeira linha não nula, como o "first"
+    do groupby.
+
+    Com os motores "duckdb" e "polars", os totais e as posições das primeiras
+    linhas vêm do motor escolhido (ver utils/motor_duckdb.py e utils/motor_polars.py).
+    """
+    if "Controle" not in df.columns:
+        raise ValueError("Coluna 'Controle' não está presente no DataFrame de vendas.")
+
+    colunas_cabecalho = [coluna for coluna in COLUNAS_CABECALHO_VENDA if coluna in df.columns]
+
+    if motor_duckdb.usa_duckdb(motor) or motor_polars.usa_polars(motor):
+        agregar_por_controle = (
+            motor_duckdb.agregar_por_controle if motor_duckdb.usa_duckdb(motor)
+            else motor_polars.agregar_por_controle
+        )
+        agregado = agregar_por_controle(
+            df, [coluna for coluna in colunas_cabecalho if df[coluna].hasnans]
+        )
+        primeiras_linhas = agregado["Primeira"].to_numpy()
+        return _montar_vendas_agrupadas(
+            df,
+            agregado["TotalVenda"].to_numpy(),
+            agregado["QuantidadeItens"].to_numpy(),
+            np.asarray(df["Controle"].array.take(primeiras_linhas)),
+            {
+                coluna: agregado.get(f"Primeira_{coluna}", agregado["Primeira"]).to_numpy()
+                for coluna in colunas_cabecalho
+            },
+        )
+
+    # Códigos na ordem de primeira aparição; controles nulos recebem -1
+    codigos, controles = pd.factorize(df["Controle"])
+    num_vendas = len(controles)
+    validos = codigos >= 0
+
+    # Uma linha é a primeira da sua venda quando seu código supera todos os anteriores
+    maximo_anterior = np.maximum.accumulate(np.concatenate(([-1], codigos))[:-1])
+    primeiras_linhas = np.flatnonzero(codigos > maximo_anterior)
+
+    # Soma pelo groupby sobre os códigos já fatorados: mantém a soma compensada do
+    # pandas, evitando diferenças de arredondamento nos totais em reais
+    total_venda = (
+        df["TotalItem"].groupby(codigos, sort=False).sum()
+        .reindex(np.arange(num_vendas), fill_value=0)
+        .to_numpy()
+    )
+    quantidade_itens = np.bincount(
+        codigos[validos & df["ProCod"].notna().to_numpy()],
+        minlength=num_vendas,
+    )
+
+    # Resultado ordenado por controle, como no groupby
+    ordem = np.argsort(np.asarray(controles), kind="stable")
+    primeiras_linhas = primeiras_linhas[ordem]
+
+    posicoes_cabecalho = {}
+    for coluna in colunas_cabecalho:
+        valores = df[coluna]
+        posicoes = primeiras_linhas
+        if valores.hasnans:
+            posicoes = _primeiras_posicoes_validas(codigos, valores, num_vendas)[ordem]
+        posicoes_cabecalho[coluna] = posicoes
+
+    return _montar_vendas_agrupadas(
+        df, total_venda[ordem], quantidade_itens[ordem], np.asarray(controles)[ordem], posicoes_cabecalho
+    )
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from utils import motor_duckdb
+from utils.constantes import MOTOR_AGREGACAO
+
+# Número de faixas das notas RFM (recência, frequência e valor monetário)
+FAIXAS_RFM = 5
+
+def _nota_rfm(valores: pd.Series) -> pd.Series:
+    """Nota de 1 a FAIXAS_RFM pela posição percentual do valor entre os clientes (nula se o valor for nulo)."""
+    return np.ceil(valores.rank(method="average", pct=True) * FAIXAS_RFM).astype("Int64")
+
+def _agregar_por_cliente(df_vendas_agrupado: pd.DataFrame) -> pd.DataFrame:
+    """Total vendido, número de compras, itens e última compra por cliente, em ordem de cliente."""
+    codigos, clientes = pd.factorize(df_vendas_agrupado["Cliente"], sort=True)
+    validos = codigos >= 0
+
+    colunas = pd.DataFrame({
+        "total_vendas": pd.to_numeric(df_vendas_agrupado["TotalVenda"], errors="coerce"),
+        "num_compras": df_vendas_agrupado["Data"],
+        "itens_totais": pd.to_numeric(df_vendas_agrupado["QuantidadeItens"], errors="coerce"),
+        "ultima_compra": df_vendas_agrupado["Data"],
+    })[validos]
+
+    df_clientes = (
+        colunas.groupby(codigos[validos], sort=True)
+          .agg({"total_vendas": "sum", "num_compras": "count", "itens_totais": "sum", "ultima_compra": "max"})
+          .reset_index(drop=True)
+    )
+    df_clientes.insert(0, "Cliente", clientes)
+    return df_clientes
+
+def calcular_metricas_clientes(
+    df_vendas_agrupado: pd.DataFrame,
+    data_referencia: Optional[pd.Timestamp] = None,
+    motor: str = MOTOR_AGREGACAO,
+) -> Tuple[int, int, pd.DataFrame]:
+    """
+    Calcula, em uma única passada agrupada por cliente:
+    - total vendido, número de compras, itens comprados e ticket médio
+    - data da última compra e recência em dias até `data_referencia`
+      (por padrão, a data da venda mais recente)
+    - notas RFM de 1 a 5 (recência, frequência e valor monetário)
+
+    Retorna o total de clientes, quantos retornaram (mais de uma compra) e o
+    DataFrame com as métricas por cliente, ordenado pelo código do cliente.
+    """
+    if motor_duckdb.usa_duckdb(motor):
+        df_clientes = motor_duckdb.agregar_por_cliente(df_vendas_agrupado)
+    else:
+        df_clientes = _agregar_por_cliente(df_vendas_agrupado)
+
+    total_vendas = df_clientes["total_vendas"].to_numpy()
+    num_compras = df_clientes["num_compras"].to_numpy()
+    df_clientes["ticket_medio"] = np.divide(
+        total_vendas, num_compras,
+        out=np.zeros(len(df_clientes)), where=num_compras > 0,
+    )
+
+    if data_referencia is None:
+        data_referencia = df_vendas_agrupado["Data"].max()
+    df_clientes["recencia_dias"] = (data_referencia - df_clientes["ultima_compra"]).dt.days
+    df_clientes["nota_recencia"] = _nota_rfm(-df_clientes["recencia_dias"])
+    df_clientes["nota_frequencia"] = _nota_rfm(df_clientes["num_compras"])
+    df_clientes["nota_monetaria"] = _nota_rfm(df_clientes["total_vendas"])
+
+    total_clientes = len(df_clientes)
+    clientes_retornaram = int((num_compras > 1).sum())
+
+    return total_clientes, clientes_retornaram, df_clientes
@@ -9,4 +9,60 @@ DIAS_SEMANA_PT = {
     "Friday": "sexta-feira",
     "Saturday": "sábado",
     "Sunday": "domingo"
-}
\ No newline at end of file
+}
+
+# Dias da semana na ordem de `Series.dt.dayofweek` (segunda = 0)
+DIAS_SEMANA_ORDENADOS = list(DIAS_SEMANA_PT.values())
+
+SEMESTRES = ["S1", "S2"]
+
+# Código do cliente não identificado (vendas sem cadastro de cliente)
+CLIENTE_ANONIMO = 99999
+
+# Diretório dos snapshots colunares (Parquet) gerados a partir dos CSVs
+DIRETORIO_SNAPSHOTS = "dados/.snapshots"
+
+# Incrementar sempre que as colunas derivadas no carregamento mudarem,
+# para que snapshots antigos sejam descartados automaticamente
+VERSAO_SNAPSHOT = 3
+
+# Quantidade máxima de versões de cada dataset mantidas em memória pelo registro compartilhado
+MAX_DATASETS_EM_MEMORIA = 2
+
+# Contagem de clientes distintos nos indicadores temporais: "exato" ou
+# "aproximado" (HyperLogLog, erro relativo típico de 1,04 / sqrt(2 ** PRECISAO_HLL),
+# ~1,6% com precisão 12). Detalhes em utils/contagem_distinta.py.
+MODO_CONTAGEM_CLIENTES = "exato"
+PRECISAO_HLL = 12
+
+# Origens de vendas maiores que este total (em bytes) são lidas em blocos de
+# LINHAS_POR_BLOCO_LEITURA linhas, e apenas as tabelas agregadas ficam em memória
+# (sem as vendas item a item). Detalhes em utils/resumo.py.
+BYTES_LEITURA_EM_BLOCOS = 1024 ** 3
+LINHAS_POR_BLOCO_LEITURA = 500_000
+
+# Processos usados para ler, em paralelo, os arquivos de uma origem de vendas
+# com vários arquivos (None: um por núcleo). Abaixo de BYTES_LEITURA_PARALELA
+# no total, a leitura é sequencial: iniciar os processos custaria mais que ler.
+PROCESSOS_LEITURA = None
+BYTES_LEITURA_PARALELA = 64 * 1024 ** 2
+
+# Pré-aquecimento em segundo plano das tabelas derivadas ao iniciar o app e ao
+# salvar novos caminhos (ver utils/preaquecimento.py)
+PREAQUECER_DADOS = True
+
+# Instrumentação de desempenho (ver utils/instrumentacao.py): tempo, memória e
+# linhas de cada etapa medida, exibidos no painel da barra lateral. Com um
+# caminho em ARQUIVO_LOG_DESEMPENHO, os registros também são gravados nele em
+# JSON lines (ex.: "dados/desempenho.jsonl").
+INSTRUMENTAR_DESEMPENHO = True
+ARQUIVO_LOG_DESEMPENHO = None
+
+# Motor das agregações sobre as vendas item a item: "pandas", "duckdb" (SQL
+# embutido, em paralelo e com uso de disco quando a memória não basta; requer o
+# pacote duckdb) ou "polars" (em paralelo; requer o pacote polars, e vale apenas
+# para o agrupamento por controle e os totais por produto, as demais agregações
+# usam o pandas). Os resultados são os mesmos, a menos do arredondamento das
+# somas em reais. Detalhes em utils/motor_duckdb.py e utils/motor_polars.py.
+MOTOR_AGREGACAO = "pandas"
+MOTORES_AGREGACAO = ("pandas", "duckdb", "polars")
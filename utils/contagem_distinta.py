@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict
+
+# Contagem distinta de clientes por "balde" (por exemplo, dia x cliente anônimo),
+# que pode ser combinada entre baldes e filtros sem voltar às vendas.
+#
+# Modos:
+# - "exato": guarda os pares únicos (chaves do balde, Cliente). Resultado exato;
+#   memória proporcional ao número de pares distintos.
+# - "aproximado": HyperLogLog com 2**precisao registradores de 1 byte por balde.
+#   Erro relativo padrão de 1,04 / sqrt(2**precisao): com precisão 12 (4096
+#   registradores, 4 KB por balde) o erro típico é ~1,6% e fica abaixo de ~3,3%
+#   em 95% das contagens, independentemente do volume de clientes. Contagens
+#   pequenas (até ~2,5 x 2**precisao) usam a correção de baixa cardinalidade e
+#   são praticamente exatas.
+#
+# Uma contagem é um dicionário:
+#   {"modo": "exato", "pares": DataFrame(chaves..., Cliente)}
+#   {"modo": "aproximado", "precisao": p, "chaves": DataFrame(chaves...), "registros": ndarray(n, 2**p)}
+
+MODOS_CONTAGEM = ("exato", "aproximado")
+
+def _comprimento_bits(valores: np.ndarray) -> np.ndarray:
+    """Número de bits significativos de cada inteiro sem sinal de 64 bits."""
+    restante = valores.copy()
+    comprimento = np.zeros(valores.shape, dtype=np.int64)
+    for deslocamento in (32, 16, 8, 4, 2, 1):
+        grandes = restante >= (np.uint64(1) << np.uint64(deslocamento))
+        comprimento[grandes] += deslocamento
+        restante[grandes] >>= np.uint64(deslocamento)
+    return comprimento + (restante > 0)
+
+def _estimar_hll(registros: np.ndarray) -> np.ndarray:
+    """Estimativa HyperLogLog da cardinalidade de cada linha de registradores."""
+    m = registros.shape[1]
+    alfa = 0.7213 / (1 + 1.079 / m)
+    estimativa = alfa * m * m / np.exp2(-registros.astype(np.float64)).sum(axis=1)
+
+    # Correção para baixa cardinalidade (contagem linear dos registradores vazios)
+    vazios = (registros == 0).sum(axis=1)
+    baixa = (estimativa <= 2.5 * m) & (vazios > 0)
+    estimativa[baixa] = m * np.log(m / vazios[baixa])
+
+    return np.rint(estimativa).astype(np.int64)
+
+def criar_contagem(
+    chaves: pd.DataFrame,
+    clientes: pd.Series,
+    modo: str = "exato",
+    precisao: int = 12,
+) -> Dict[str, object]:
+    """
+    Cria a contagem distinta de `clientes` por balde; `chaves` tem uma linha por
+    cliente com as colunas que identificam o balde.
+    """
+    if modo not in MODOS_CONTAGEM:
+        raise ValueError(f"Modo de contagem inválido: '{modo}'. Use um de {MODOS_CONTAGEM}.")
+
+    validos = clientes.notna().to_numpy()
+    chaves = chaves[validos].reset_index(drop=True)
+    clientes = clientes[validos].reset_index(drop=True)
+
+    if modo == "exato":
+        pares = chaves.assign(Cliente=clientes).drop_duplicates(ignore_index=True)
+        return {"modo": modo, "pares": pares}
+
+    baldes, unicos = pd.MultiIndex.from_frame(chaves).factorize()
+    m = 1 << precisao
+
+    hashes = pd.util.hash_pandas_object(clientes, index=False).to_numpy()
+    indice = (hashes >> np.uint64(64 - precisao)).astype(np.int64)
+    resto = hashes & np.uint64((1 << (64 - precisao)) - 1)
+    posto = (64 - precisao) - _comprimento_bits(resto) + 1
+
+    # Maior posto por (balde, registrador)
+    maximos = pd.Series(posto).groupby(baldes * m + indice).max()
+    registros = np.zeros((len(unicos), m), dtype=np.uint8)
+    registros.flat[maximos.index.to_numpy()] = maximos.to_numpy()
+
+    return {
+        "modo": modo,
+        "precisao": precisao,
+        "chaves": unicos.to_frame(index=False, name=list(chaves.columns)),
+        "registros": registros,
+    }
+
+def combinar_contagens(contagem: Dict[str, object], outra: Dict[str, object]) -> Dict[str, object]:
+    """União de duas contagens do mesmo modo (baldes iguais são mesclados)."""
+    if contagem["modo"] != outra["modo"]:
+        raise ValueError("Não é possível combinar contagens de modos diferentes.")
+
+    if contagem["modo"] == "exato":
+        pares = pd.concat([contagem["pares"], outra["pares"]], ignore_index=True).drop_duplicates(ignore_index=True)
+        return {"modo": "exato", "pares": pares}
+
+    chaves = pd.concat([contagem["chaves"], outra["chaves"]], ignore_index=True)
+    baldes, unicos = pd.MultiIndex.from_frame(chaves).factorize()
+    primeiro, segundo = baldes[:len(contagem["chaves"])], baldes[len(contagem["chaves"]):]
+
+    registros = np.zeros((len(unicos), contagem["registros"].shape[1]), dtype=np.uint8)
+    registros[primeiro] = contagem["registros"]
+    registros[segundo] = np.maximum(registros[segundo], outra["registros"])
+
+    return {**contagem, "chaves": unicos.to_frame(index=False, name=list(chaves.columns)), "registros": registros}
+
+def filtrar_contagem(contagem: Dict[str, object], manter: Callable[[pd.DataFrame], np.ndarray]) -> Dict[str, object]:
+    """Mantém apenas os baldes cujas chaves satisfazem o filtro."""
+    if contagem["modo"] == "exato":
+        pares = contagem["pares"]
+        return {**contagem, "pares": pares[manter(pares)]}
+
+    mascara = np.asarray(manter(contagem["chaves"]))
+    return {
+        **contagem,
+        "chaves": contagem["chaves"][mascara].reset_index(drop=True),
+        "registros": contagem["registros"][mascara],
+    }
+
+def contar_por_rotulo(contagem: Dict[str, object], rotular: Callable[[pd.DataFrame], pd.Index]) -> pd.Series:
+    """
+    Conta os clientes distintos por rótulo, onde `rotular` associa cada balde a um
+    rótulo (por exemplo, o mês de cada dia). Clientes presentes em vários baldes
+    de um mesmo rótulo são contados uma única vez.
+    """
+    if contagem["modo"] == "exato":
+        pares = contagem["pares"]
+        return (
+            pd.DataFrame({"Rotulo": rotular(pares).array, "Cliente": pares["Cliente"].array})
+              .drop_duplicates()
+              .groupby("Rotulo", observed=True)
+              .size()
+        )
+
+    codigos, rotulos = pd.factorize(rotular(contagem["chaves"]), sort=True)
+    if len(rotulos) == 0:
+        return pd.Series([], dtype=np.int64)
+
+    ordem = np.argsort(codigos, kind="stable")
+    inicios = np.flatnonzero(np.r_[True, np.diff(codigos[ordem]) != 0])
+    registros = np.maximum.reduceat(contagem["registros"][ordem], inicios, axis=0)
+
+    return pd.Series(_estimar_hll(registros), index=rotulos[codigos[ordem][inicios]])
+
+def contar_total(contagem: Dict[str, object]) -> int:
+    """Total de clientes distintos em todos os baldes da contagem."""
+    if contagem["modo"] == "exato":
+        return int(contagem["pares"]["Cliente"].nunique())
+
+    if len(contagem["registros"]) == 0:
+        return 0
+    return int(_estimar_hll(contagem["registros"].max(axis=0, keepdims=True))[0])
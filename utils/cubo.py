@@ -0,0 +1,127 @@
+import pandas as pd
+from typing import Dict, Tuple
+from utils.carregamento import adicionar_colunas_temporais, eh_cliente_anonimo
+from utils import motor_duckdb
+from utils.constantes import MODO_CONTAGEM_CLIENTES, MOTOR_AGREGACAO, PRECISAO_HLL
+from utils.contagem_distinta import (
+    combinar_contagens,
+    contar_por_rotulo,
+    contar_total,
+    criar_contagem,
+    filtrar_contagem,
+)
+from utils.instrumentacao import instrumentar
+
+# Cubo diário de vendas: fatos pré-agregados por dia e por indicador de cliente
+# anônimo, a partir dos quais todas as tabelas temporais da página de
+# indicadores são obtidas por reagregação, sem percorrer o histórico de vendas.
+#   "fatos":    Dia, Anonimo, TotalVenda (soma), QuantVendas (contagem)
+#   "clientes": contagem distinta de clientes por Dia e Anonimo (exata ou
+#               aproximada, conforme MODO_CONTAGEM_CLIENTES)
+
+# Coluna temporal -> nome da coluna na tabela exibida, na ordem da página
+GRANULARIDADES = {
+    "Ano": "Ano",
+    "Semestre": "Semestre",
+    "Trimestre": "Trimestre",
+    "MesPeriodo": "Mês",
+    "SemanaInicioDt": "Semana",
+    "DiaSemana": "DiaSemana",
+    "Dia": "Data",
+}
+
+def _chaves_cubo(df_vendas_agrupado: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        "Dia": df_vendas_agrupado["Data"].dt.normalize(),
+        "Anonimo": eh_cliente_anonimo(df_vendas_agrupado["Cliente"]),
+    })
+
+@instrumentar()
+def montar_cubo_diario(df_vendas_agrupado: pd.DataFrame, motor: str = MOTOR_AGREGACAO) -> Dict[str, object]:
+    """Monta o cubo diário a partir das vendas agrupadas por controle."""
+    chaves = _chaves_cubo(df_vendas_agrupado)
+
+    if motor_duckdb.usa_duckdb(motor):
+        fatos = motor_duckdb.agregar_fatos_diarios(chaves, df_vendas_agrupado)
+    else:
+        fatos = (
+            df_vendas_agrupado[["TotalVenda", "Controle"]]
+              .groupby([chaves["Dia"], chaves["Anonimo"]])
+              .agg(TotalVenda=("TotalVenda", "sum"), QuantVendas=("Controle", "count"))
+              .reset_index()
+        )
+
+    clientes = criar_contagem(chaves, df_vendas_agrupado["Cliente"], MODO_CONTAGEM_CLIENTES, PRECISAO_HLL)
+
+    return {"fatos": fatos, "clientes": clientes}
+
+def combinar_cubos(cubo: Dict[str, object], outro: Dict[str, object]) -> Dict[str, object]:
+    """Soma dois cubos diários (por exemplo, o cubo existente e o de vendas novas)."""
+    fatos = (
+        pd.concat([cubo["fatos"], outro["fatos"]], ignore_index=True)
+          .groupby(["Dia", "Anonimo"], as_index=False)[["TotalVenda", "QuantVendas"]]
+          .sum()
+    )
+    clientes = combinar_contagens(cubo["clientes"], outro["clientes"])
+    return {"fatos": fatos, "clientes": clientes}
+
+def _filtrar_cubo(cubo: Dict[str, object], ignorar_anonimo: bool) -> Tuple[pd.DataFrame, Dict[str, object]]:
+    fatos, clientes = cubo["fatos"], cubo["clientes"]
+    if ignorar_anonimo:
+        fatos = fatos[~fatos["Anonimo"]]
+        clientes = filtrar_contagem(clientes, lambda chaves: ~chaves["Anonimo"].to_numpy())
+    return fatos, clientes
+
+def agregar_tabelas_temporais(cubo: Dict[str, object], ignorar_anonimo: bool) -> Tuple[pd.DataFrame, ...]:
+    """
+    Agrega o cubo em cada granularidade temporal (ano, semestre, trimestre, mês,
+    semana, dia da semana e data), com total vendido, clientes distintos,
+    quantidade de vendas e médias por cliente e por venda.
+    """
+    fatos, clientes = _filtrar_cubo(cubo, ignorar_anonimo)
+
+    # Rótulos temporais calculados uma vez por dia do cubo
+    dias = pd.DatetimeIndex(fatos["Dia"].unique()).sort_values()
+    rotulos = adicionar_colunas_temporais(pd.DataFrame({"Data": dias}))
+    posicoes_fatos = dias.get_indexer(fatos["Dia"])
+
+    tabelas = []
+    for coluna, nome in GRANULARIDADES.items():
+        rotulo = rotulos[coluna]
+
+        soma = (
+            fatos[["TotalVenda", "QuantVendas"]]
+              .groupby(pd.Index(rotulo.take(posicoes_fatos).array), observed=True)
+              .sum()
+        )
+        quant_clientes = contar_por_rotulo(
+            clientes,
+            lambda chaves: pd.Index(rotulo.take(dias.get_indexer(chaves["Dia"])).array),
+        ).reindex(soma.index, fill_value=0)
+
+        tabelas.append(pd.DataFrame({
+            nome: soma.index,
+            "TotalVenda": soma["TotalVenda"].to_numpy(),
+            "QuantClientes": quant_clientes.to_numpy(),
+            "QuantVendas": soma["QuantVendas"].to_numpy(),
+            "MediaPorCliente": soma["TotalVenda"].to_numpy() / quant_clientes.replace(0, 1).to_numpy(),
+            "MediaPorVenda": soma["TotalVenda"].to_numpy() / soma["QuantVendas"].to_numpy(),
+        }))
+
+    # Meses abrangidos por cada semana
+    meses_semanais = (
+        pd.DataFrame({"Semana": rotulos["SemanaInicioDt"], "Mes": dias.strftime("%b")})
+          .drop_duplicates()
+          .groupby("Semana", observed=True)["Mes"]
+          .agg(lambda meses: "-".join(sorted(meses)))
+          .reset_index(name="Meses")
+    )
+    indice_semanal = list(GRANULARIDADES.values()).index("Semana")
+    tabelas[indice_semanal] = tabelas[indice_semanal].merge(meses_semanais, on="Semana", how="left")
+
+    return tuple(tabelas)
+
+def calcular_totais_cubo(cubo: Dict[str, object], ignorar_anonimo: bool) -> Tuple[int, float]:
+    """Retorna o total de clientes distintos e o valor total vendido no cubo."""
+    fatos, clientes = _filtrar_cubo(cubo, ignorar_anonimo)
+    return contar_total(clientes), float(fatos["TotalVenda"].sum())
@@ -0,0 +1,61 @@
+import functools
+import streamlit as st
+import pandas as pd
+from typing import Callable, Optional
+from utils.constantes import INSTRUMENTAR_DESEMPENHO
+from utils.instrumentacao import etapas_coletadas, instrumentar, marcar_cache
+
+# Lado Streamlit da instrumentação (utils/instrumentacao.py): funções com cache
+# medidas e o painel de desempenho da barra lateral.
+
+def dados_em_cache(nome: Optional[str] = None, **opcoes_cache) -> Callable[[Callable], Callable]:
+    """
+    Equivalente a `@st.cache_data(**opcoes_cache)` que mede cada chamada como
+    uma etapa e registra se o resultado veio do cache ("acerto") ou foi
+    calculado ("calculo").
+    """
+    def decorador(funcao: Callable) -> Callable:
+        @functools.wraps(funcao)
+        def calcular(*args, **kwargs):
+            # Só é executada quando o resultado não está no cache
+            marcar_cache(False)
+            return funcao(*args, **kwargs)
+
+        return instrumentar(nome or funcao.__name__, cache="acerto")(st.cache_data(**opcoes_cache)(calcular))
+    return decorador
+
+def mostrar_painel_desempenho() -> None:
+    """
+    Exibe na barra lateral, se solicitado, o tempo, a memória, as linhas e o
+    uso do cache de cada etapa medida na execução atual da página. Chame ao
+    final da página, depois de todas as etapas.
+    """
+    if not INSTRUMENTAR_DESEMPENHO:
+        return
+    if not st.sidebar.toggle("⏱️ Painel de desempenho", key="painel_desempenho"):
+        return
+
+    etapas = etapas_coletadas()
+    if not etapas:
+        st.sidebar.info("Nenhuma etapa medida nesta execução.")
+        return
+
+    # Cada etapa termina depois das internas; a tabela segue a ordem em que começaram
+    df = pd.DataFrame(etapas).sort_values("ordem", ignore_index=True)
+    total = df.loc[df["nivel"] == 0, "segundos"].sum()
+    st.sidebar.metric("Tempo medido", f"{total:.3f} s")
+
+    colunas = {
+        "etapa": "Etapa",
+        "segundos": "Segundos",
+        "memoria_mb": "Memória (MB)",
+        "linhas_entrada": "Linhas (entrada)",
+        "linhas_saida": "Linhas (saída)",
+        "cache": "Cache",
+    }
+    df["etapa"] = ["· " * nivel + etapa for nivel, etapa in zip(df["nivel"], df["etapa"])]
+    st.sidebar.dataframe(
+        df[[coluna for coluna in colunas if coluna in df.columns]].rename(columns=colunas),
+        hide_index=True,
+        use_container_width=True,
+    )
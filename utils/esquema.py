@@ -0,0 +1,44 @@
+from typing import Dict, Optional
+
+# Esquema declarado dos arquivos CSV lidos pelo dashboard.
+#
+# As colunas listadas em ESQUEMA_VENDAS definem tanto o `usecols` quanto os
+# tipos da leitura: colunas ausentes do arquivo são simplesmente ignoradas e
+# as demais colunas do CSV não são carregadas.
+
+# Motor do `pd.read_csv`: "pyarrow" lê em paralelo; "c" é o motor padrão do pandas
+MOTOR_CSV = "pyarrow"
+
+# Leitura das vendas: "pandas" (`pd.read_csv` com MOTOR_CSV) ou "polars"
+# (varredura preguiçosa e em paralelo; requer o pacote polars). O resultado é o
+# mesmo; a leitura em blocos das origens grandes é sempre feita pelo pandas.
+# Detalhes em utils/motor_polars.py.
+MOTOR_LEITURA_VENDAS = "pandas"
+MOTORES_LEITURA_VENDAS = ("pandas", "polars")
+
+DELIMITADOR_CSV = ";"
+
+# Códigos inteiros são lidos como "Int32" (aceita vazios) e compactados para
+# "int32" quando a coluna não tem valores ausentes. Tipo None: a coluna é
+# carregada, mas o tipo é inferido (a quantidade pode ser inteira ou fracionada).
+ESQUEMA_VENDAS: Dict[str, Optional[str]] = {
+    "Controle": "Int32",
+    "Cliente": "Int32",
+    "ProCod": "Int32",
+    "Quantidade": None,
+    "TotalItem": "float64",
+    "Bairro": "category",
+}
+
+COLUNA_DATA_VENDAS = "Data"
+
+# Formato esperado da coluna de data; valores fora do formato são interpretados
+# individualmente pelo pandas, como antes da adoção do esquema
+FORMATO_DATA_VENDAS = "ISO8601"
+
+# O cadastro é pequeno e todas as suas colunas são exibidas na página de
+# produtos não vendidos, então apenas os tipos são fixados (sem `usecols`)
+ESQUEMA_CADASTRO: Dict[str, Optional[str]] = {
+    "ProCod": "Int32",
+    "ProNom": "string",
+}
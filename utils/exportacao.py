@@ -0,0 +1,124 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, IO, Iterator, Optional
+from utils.instrumentacao import instrumentar
+
+# Exportação dos DataFrames exibidos nas páginas de exploração.
+#
+# Os arquivos são gravados em blocos de linhas: cada bloco é extraído do
+# DataFrame (pelas posições da consulta), convertido e gravado antes do
+# próximo, de modo que a memória extra fica limitada ao tamanho de um bloco,
+# e não ao do arquivo inteiro.
+
+FORMATOS_EXPORTACAO = {
+    "CSV": {"extensao": "csv", "mime": "text/csv"},
+    "Parquet": {"extensao": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+
+LINHAS_POR_BLOCO = 100_000
+
+def _blocos(df: pd.DataFrame, posicoes: Optional[np.ndarray], linhas_por_bloco: int) -> Iterator[pd.DataFrame]:
+    """Blocos de linhas de `df`, nas posições informadas (ou em ordem, se não houver)."""
+    total = len(df) if posicoes is None else len(posicoes)
+    for inicio in range(0, total, linhas_por_bloco):
+        if posicoes is None:
+            yield df.iloc[inicio:inicio + linhas_por_bloco]
+        else:
+            yield df.take(posicoes[inicio:inicio + linhas_por_bloco])
+
+def gerar_blocos_csv(
+    df: pd.DataFrame,
+    posicoes: Optional[np.ndarray] = None,
+    linhas_por_bloco: int = LINHAS_POR_BLOCO,
+) -> Iterator[bytes]:
+    """
+    Gera o CSV (UTF-8, sem índice) de `df` em pedaços de bytes, um por bloco de
+    linhas. Concatenados, são idênticos a `df.to_csv(index=False)`.
+    """
+    cabecalho = True
+    for bloco in _blocos(df, posicoes, linhas_por_bloco):
+        yield bloco.to_csv(index=False, header=cabecalho).encode("utf-8")
+        cabecalho = False
+    if cabecalho:
+        yield df.iloc[:0].to_csv(index=False).encode("utf-8")
+
+def exportar_csv(
+    df: pd.DataFrame,
+    destino: IO[bytes],
+    posicoes: Optional[np.ndarray] = None,
+    linhas_por_bloco: int = LINHAS_POR_BLOCO,
+) -> None:
+    """Grava `df` em CSV no arquivo `destino`, bloco a bloco."""
+    for pedaco in gerar_blocos_csv(df, posicoes, linhas_por_bloco):
+        destino.write(pedaco)
+
+def _esquema_parquet(df: pd.DataFrame, linhas_por_bloco: int) -> pa.Schema:
+    """
+    Esquema Parquet de todo o `df`, igual para todos os blocos. O tipo das
+    colunas de objetos (texto, por exemplo) vem dos seus primeiros valores não
+    nulos, que podem não estar no primeiro bloco.
+    """
+    amostra = {}
+    for coluna in df.columns:
+        valores = df[coluna]
+        if valores.dtype == object:
+            validos = np.flatnonzero(valores.notna().to_numpy())[:linhas_por_bloco]
+            amostra[coluna] = valores.iloc[validos].reset_index(drop=True)
+        else:
+            amostra[coluna] = valores.iloc[:linhas_por_bloco].reset_index(drop=True)
+    return pa.Schema.from_pandas(pd.DataFrame(amostra, columns=df.columns), preserve_index=False)
+
+def exportar_parquet(
+    df: pd.DataFrame,
+    destino: IO[bytes],
+    posicoes: Optional[np.ndarray] = None,
+    linhas_por_bloco: int = LINHAS_POR_BLOCO,
+) -> None:
+    """Grava `df` em Parquet no arquivo `destino`, um row group por bloco de linhas."""
+    esquema = _esquema_parquet(df, linhas_por_bloco)
+    with pq.ParquetWriter(destino, esquema) as escritor:
+        for bloco in _blocos(df, posicoes, linhas_por_bloco):
+            escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+
+@instrumentar()
+def exportar_arquivo(
+    df: pd.DataFrame,
+    formato: str,
+    diretorio: str,
+    nome: str,
+    posicoes: Optional[np.ndarray] = None,
+    linhas_por_bloco: int = LINHAS_POR_BLOCO,
+) -> str:
+    """
+    Grava `df` (ou as linhas em `posicoes`) no formato informado ("CSV" ou
+    "Parquet") em `diretorio` e retorna o caminho do arquivo.
+    """
+    if formato not in FORMATOS_EXPORTACAO:
+        raise ValueError(f"Formato de exportação inválido: '{formato}'.")
+
+    caminho = os.path.join(diretorio, f"{nome}.{FORMATOS_EXPORTACAO[formato]['extensao']}")
+    with open(caminho, "wb") as destino:
+        if formato == "CSV":
+            exportar_csv(df, destino, posicoes, linhas_por_bloco)
+        else:
+            exportar_parquet(df, destino, posicoes, linhas_por_bloco)
+    return caminho
+
+def exportar_temporario(
+    df: pd.DataFrame,
+    formato: str,
+    nome: str,
+    posicoes: Optional[np.ndarray] = None,
+) -> Dict[str, object]:
+    """
+    Grava o arquivo exportado em um diretório temporário próprio. Retorna
+    {"caminho", "tamanho", "diretorio"}; o diretório (e o arquivo) é removido
+    quando o dicionário deixa de ser referenciado.
+    """
+    diretorio = tempfile.TemporaryDirectory(prefix="exportacao_")
+    caminho = exportar_arquivo(df, formato, diretorio.name, nome, posicoes)
+    return {"caminho": caminho, "tamanho": os.path.getsize(caminho), "diretorio": diretorio}
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict
+from utils import motor_duckdb
+from utils.constantes import MOTOR_AGREGACAO
+from utils.instrumentacao import instrumentar
+from utils.produtos import posicoes_produtos
+
+# Giro de venda: quantidade vendida por produto em cada período de uma
+# granularidade, como uma matriz esparsa produto x período guardada em formato
+# de lista ordenada por período (Periodo, Produto, Quantidade). O índice
+# período -> faixa de linhas permite obter os produtos de um período fatiando a
+# tabela, sem filtrar todas as linhas.
+
+# Rótulo de cada período, calculado sobre os dias distintos das vendas
+ROTULOS_PERIODO: Dict[str, Callable[[pd.DatetimeIndex], pd.Index]] = {
+    "Ano": lambda dias: dias.year,
+    "Semestre": lambda dias: dias.year.astype(str) + " - S" + ((dias.month - 1) // 6 + 1).astype(str),
+    "Trimestre": lambda dias: dias.year.astype(str) + " - T" + ((dias.month - 1) // 3 + 1).astype(str),
+    "Mês": lambda dias: dias.to_period("M").astype(str),
+    "Semana": lambda dias: dias.strftime("%Y - Semana %U"),
+    "Dia da Semana": lambda dias: dias.day_name(),
+    "Data": lambda dias: pd.Index(dias.date),
+}
+
+@instrumentar()
+def montar_giro(
+    df_vendas: pd.DataFrame,
+    dimensao: Dict[str, object],
+    periodo: str,
+    motor: str = MOTOR_AGREGACAO,
+) -> Dict[str, object]:
+    """
+    Monta a tabela de giro de venda da granularidade `periodo`.
+
+    Retorna um dicionário com:
+    - "tabela": DataFrame (Periodo, Produto, Quantidade) ordenado por período e produto
+    - "indice": período -> (início, fim) das suas linhas na tabela, em ordem de período
+
+    Com o motor "duckdb", as vendas são antes reduzidas a uma linha por dia e
+    produto em SQL; o restante é feito sobre esse resultado, bem menor.
+    """
+    if periodo not in ROTULOS_PERIODO:
+        raise ValueError(f"Período inválido: '{periodo}'.")
+    if "ProCod" not in df_vendas.columns:
+        raise ValueError("Coluna 'ProCod' não encontrada no DataFrame de vendas.")
+
+    if motor_duckdb.usa_duckdb(motor):
+        df_vendas = motor_duckdb.vendas_por_dia_e_produto(df_vendas)
+
+    # Rótulos calculados uma vez por dia distinto, e não por linha de venda
+    codigos_dia, dias = pd.factorize(pd.to_datetime(df_vendas["Data"], errors="coerce").dt.normalize())
+    codigos_periodo_dia, periodos = pd.factorize(ROTULOS_PERIODO[periodo](pd.DatetimeIndex(dias)), sort=True)
+
+    posicoes_produto = posicoes_produtos(dimensao, df_vendas["ProCod"])
+    quantidade = pd.to_numeric(df_vendas["Quantidade"], errors="coerce")
+
+    validas = (codigos_dia >= 0) & (posicoes_produto >= 0) & quantidade.notna().to_numpy()
+
+    # Primeiro por (período, código do produto), com chaves inteiras; depois por
+    # nome, já sobre o resultado reduzido (códigos diferentes podem ter o mesmo nome)
+    parcial = (
+        quantidade[validas]
+          .groupby([codigos_periodo_dia[codigos_dia[validas]], posicoes_produto[validas]], sort=False)
+          .sum()
+    )
+    linhas = dimensao["linhas"][parcial.index.get_level_values(1).to_numpy()]
+    nomes = dimensao["cadastro"]["ProNom"].array.take(linhas)
+    por_nome = (
+        pd.DataFrame({
+            "Periodo": parcial.index.get_level_values(0).to_numpy(),
+            "Produto": nomes,
+            "Quantidade": parcial.to_numpy(),
+        })
+          .dropna(subset=["Produto"])
+          .groupby(["Periodo", "Produto"], sort=True)["Quantidade"]
+          .sum()
+    )
+
+    codigos = por_nome.index.get_level_values(0).to_numpy()
+    tabela = pd.DataFrame({
+        "Periodo": periodos.take(codigos),
+        "Produto": por_nome.index.get_level_values(1).array,
+        "Quantidade": por_nome.to_numpy(),
+    })
+
+    limites = np.searchsorted(codigos, np.arange(len(periodos) + 1)).tolist()
+    indice = {
+        rotulo: (inicio, fim)
+        for rotulo, inicio, fim in zip(periodos.tolist(), limites[:-1], limites[1:])
+        if fim > inicio
+    }
+
+    return {"tabela": tabela, "indice": indice}
+
+def fatiar_giro(giro: Dict[str, object], periodo_especifico: object) -> pd.DataFrame:
+    """Retorna as linhas da tabela de giro de um período específico."""
+    inicio, fim = giro["indice"].get(periodo_especifico, (0, 0))
+    return giro["tabela"].iloc[inicio:fim]
@@ -0,0 +1,259 @@
+import os
+import hashlib
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, TypeVar
+from utils.caminho import assinatura_arquivo, listar_arquivos_vendas
+from utils.carregamento import (
+    agrupar_vendas_por_controle,
+    calcular_vendas_agrupadas,
+    concatenar_vendas,
+    ler_df_vendas,
+    ler_df_vendas_em_blocos,
+    ler_linhas_novas_vendas,
+)
+from utils.constantes import (
+    BYTES_LEITURA_EM_BLOCOS,
+    BYTES_LEITURA_PARALELA,
+    LINHAS_POR_BLOCO_LEITURA,
+    PROCESSOS_LEITURA,
+)
+from utils.cubo import combinar_cubos, montar_cubo_diario
+from utils.resumo import combinar_resumos, resumir_em_blocos, resumir_vendas
+from utils.snapshot import carregar_snapshot, salvar_snapshot
+
+# Uma "base de vendas" é um dicionário com as mesmas chaves usadas no
+# session_state ("df_vendas", "df_vendas_agrupado", "df_produtos_totais"), o
+# cubo diário usado pelos indicadores ("cubo_diario") e o controle dos arquivos
+# já lidos:
+#   "arquivos":      {caminho: {"assinatura", "tamanho", "marca"}}
+#   "versao":        assinatura combinada de todos os arquivos da base
+#   "linhas_vendas": quantidade de linhas de vendas lidas
+#
+# Quando novos dados chegam, a base é atualizada incrementalmente: apenas os
+# arquivos novos (ou as linhas novas de um arquivo que só cresceu) são lidos,
+# e as tabelas derivadas são atualizadas a partir deles.
+#
+# Origens maiores que BYTES_LEITURA_EM_BLOCOS geram uma base resumida
+# ("resumida": True): os arquivos são lidos em blocos e "df_vendas" é None, com
+# as vendas por dia e produto ("df_vendas_produto_dia") no lugar das vendas
+# item a item (ver utils/resumo.py).
+#
+# Origens com vários arquivos (diretório ou padrão glob) têm os arquivos lidos
+# em paralelo, um por processo, e concatenados na ordem de nome.
+
+# Tamanho do trecho final já lido que é comparado para confirmar que um arquivo
+# apenas recebeu linhas novas (e não foi regravado)
+BYTES_MARCA = 64 * 1024
+
+def _marca_arquivo(caminho: str, tamanho: int) -> str:
+    """Hash dos últimos bytes do arquivo até a posição `tamanho`."""
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(max(0, tamanho - BYTES_MARCA))
+        trecho = arquivo.read(min(tamanho, BYTES_MARCA))
+    return hashlib.sha1(trecho).hexdigest()
+
+def _descrever_arquivo(caminho: str) -> Dict[str, object]:
+    tamanho = os.path.getsize(caminho)
+    return {
+        "assinatura": assinatura_arquivo(caminho),
+        "tamanho": tamanho,
+        "marca": _marca_arquivo(caminho, tamanho),
+    }
+
+def _versao(arquivos: Dict[str, Dict[str, object]]) -> str:
+    assinaturas = "|".join(f"{caminho}:{info['assinatura']}" for caminho, info in sorted(arquivos.items()))
+    return hashlib.sha1(assinaturas.encode("utf-8")).hexdigest()[:16]
+
+def _ler_arquivo_vendas(caminho: str) -> pd.DataFrame:
+    """Lê um arquivo de vendas completo, reaproveitando seu snapshot quando válido."""
+    df = carregar_snapshot(caminho)
+    if df is None:
+        df = ler_df_vendas(caminho)
+        salvar_snapshot(df, caminho)
+    return df
+
+def _cresceu_sem_alteracao(caminho: str, anterior: Dict[str, object]) -> bool:
+    """Verifica se o arquivo apenas recebeu linhas novas desde a última leitura."""
+    tamanho_anterior = int(anterior["tamanho"])
+    if os.path.getsize(caminho) <= tamanho_anterior or tamanho_anterior == 0:
+        return False
+
+    with open(caminho, "rb") as arquivo:
+        arquivo.seek(tamanho_anterior - 1)
+        terminou_em_linha = arquivo.read(1) == b"\n"
+
+    return terminou_em_linha and _marca_arquivo(caminho, tamanho_anterior) == anterior["marca"]
+
+def montar_base_vendas(df_vendas: pd.DataFrame, arquivos: Dict[str, Dict[str, object]]) -> Dict[str, object]:
+    """Calcula todas as tabelas derivadas a partir do DataFrame de vendas completo."""
+    df_vendas_agrupado = agrupar_vendas_por_controle(df_vendas)
+    return {
+        "df_vendas": df_vendas,
+        "df_vendas_agrupado": df_vendas_agrupado,
+        "df_produtos_totais": calcular_vendas_agrupadas(df_vendas),
+        "cubo_diario": montar_cubo_diario(df_vendas_agrupado),
+        "arquivos": arquivos,
+        "versao": _versao(arquivos),
+        "linhas_vendas": len(df_vendas),
+        "resumida": False,
+    }
+
+def montar_base_resumida(resumo: Dict[str, object], arquivos: Dict[str, Dict[str, object]]) -> Dict[str, object]:
+    """Monta uma base resumida (sem as vendas item a item) a partir do resumo das vendas."""
+    return {
+        **resumo,
+        "df_vendas": None,
+        "cubo_diario": montar_cubo_diario(resumo["df_vendas_agrupado"]),
+        "arquivos": arquivos,
+        "versao": _versao(arquivos),
+        "resumida": True,
+    }
+
+def anexar_vendas(
+    base: Dict[str, object],
+    df_novo: pd.DataFrame,
+    arquivos: Dict[str, Dict[str, object]],
+) -> Dict[str, object]:
+    """
+    Retorna uma nova base com as vendas de `df_novo` anexadas.
+
+    O agrupamento por controle é calculado só para as linhas novas; vendas que já
+    existiam na base (itens divididos entre dois lotes) são reagrupadas com todas
+    as suas linhas. Os totais por produto e o cubo diário são somados aos anteriores.
+    """
+    if df_novo.empty:
+        return {**base, "arquivos": arquivos, "versao": _versao(arquivos)}
+
+    df_vendas = concatenar_vendas([base["df_vendas"], df_novo])
+
+    agrupado = base["df_vendas_agrupado"]
+    controles_novos = df_novo["Controle"].unique()
+    repetidos = agrupado["Controle"].isin(controles_novos)
+
+    if repetidos.any():
+        linhas_afetadas = df_vendas[df_vendas["Controle"].isin(controles_novos)]
+        agrupado = concatenar_vendas([agrupado[~repetidos], agrupar_vendas_por_controle(linhas_afetadas)])
+        # Vendas reagrupadas mudam fatos já somados no cubo: recalcula a partir do agrupado
+        cubo = montar_cubo_diario(agrupado)
+    else:
+        agrupado_novo = agrupar_vendas_por_controle(df_novo)
+        agrupado = concatenar_vendas([agrupado, agrupado_novo])
+        cubo = combinar_cubos(base["cubo_diario"], montar_cubo_diario(agrupado_novo))
+
+    if not agrupado["Controle"].is_monotonic_increasing:
+        agrupado = agrupado.sort_values("Controle", ignore_index=True)
+
+    produtos_totais = (
+        pd.concat([base["df_produtos_totais"], calcular_vendas_agrupadas(df_novo)])
+          .groupby("ProCod", as_index=False)[["Quantidade", "TotalItem"]]
+          .sum()
+    )
+
+    return {
+        "df_vendas": df_vendas,
+        "df_vendas_agrupado": agrupado,
+        "df_produtos_totais": produtos_totais,
+        "cubo_diario": cubo,
+        "arquivos": arquivos,
+        "versao": _versao(arquivos),
+        "linhas_vendas": len(df_vendas),
+        "resumida": False,
+    }
+
+def _resumir_arquivo(caminho: str) -> Dict[str, object]:
+    return resumir_em_blocos(ler_df_vendas_em_blocos(caminho, LINHAS_POR_BLOCO_LEITURA))
+
+def _ler_em_blocos(caminhos: List[str]) -> bool:
+    return sum(os.path.getsize(arquivo) for arquivo in caminhos) > BYTES_LEITURA_EM_BLOCOS
+
+Resultado = TypeVar("Resultado")
+
+def _ler_arquivos(ler: Callable[[str], Resultado], caminhos: List[str]) -> List[Resultado]:
+    """
+    Aplica `ler` a cada arquivo, em paralelo em um pool de processos quando há
+    mais de um arquivo (e ao menos BYTES_LEITURA_PARALELA no total), e retorna
+    os resultados na ordem de `caminhos`.
+
+    Os processos são iniciados com "spawn" (e não "fork"), seguro com as threads
+    do Streamlit e do pyarrow e disponível em todos os sistemas.
+    """
+    processos = min(len(caminhos), PROCESSOS_LEITURA or os.cpu_count() or 1)
+    if processos <= 1 or sum(os.path.getsize(arquivo) for arquivo in caminhos) < BYTES_LEITURA_PARALELA:
+        return [ler(arquivo) for arquivo in caminhos]
+
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return list(pool.map(ler, caminhos))
+
+def atualizar_base_vendas(caminho: str, base: Optional[Dict[str, object]] = None) -> Dict[str, object]:
+    """
+    Retorna a base de vendas atualizada para a origem `caminho` (arquivo ou diretório).
+
+    - Nenhum arquivo mudou: a base recebida é devolvida sem alterações.
+    - Apenas arquivos novos no diretório e/ou linhas novas no final de arquivos
+      já lidos: somente esses dados são lidos e anexados à base.
+    - Qualquer outra mudança (arquivo removido ou regravado): a base é recriada.
+    """
+    caminhos = listar_arquivos_vendas(caminho)
+    if not caminhos:
+        raise FileNotFoundError(f"Nenhum arquivo de vendas encontrado em '{caminho}'.")
+
+    assinaturas = {arquivo: assinatura_arquivo(arquivo) for arquivo in caminhos}
+    resumida = _ler_em_blocos(caminhos)
+
+    # Uma origem que passou do limite de leitura em blocos (ou voltou a caber na
+    # memória) é recriada no outro modo
+    if base is not None and base["resumida"] != resumida:
+        base = None
+
+    if base is not None:
+        anteriores: Dict[str, Dict[str, object]] = base["arquivos"]
+        if {arquivo: info["assinatura"] for arquivo, info in anteriores.items()} == assinaturas:
+            return base
+
+        removidos = set(anteriores) - set(assinaturas)
+        alterados = [
+            arquivo for arquivo in anteriores
+            if arquivo in assinaturas and anteriores[arquivo]["assinatura"] != assinaturas[arquivo]
+        ]
+
+        if not removidos and all(_cresceu_sem_alteracao(arquivo, anteriores[arquivo]) for arquivo in alterados):
+            partes: List[pd.DataFrame] = []
+            arquivos = dict(anteriores)
+            # Na base resumida, arquivos novos inteiros são lidos em blocos e resumidos
+            resumos: List[Dict[str, object]] = []
+
+            # A descrição é feita antes da leitura: linhas gravadas durante a leitura
+            # ficam para a próxima atualização, em vez de serem lidas duas vezes
+            for arquivo in alterados:
+                arquivos[arquivo] = _descrever_arquivo(arquivo)
+                partes.append(ler_linhas_novas_vendas(
+                    arquivo, int(anteriores[arquivo]["tamanho"]), int(arquivos[arquivo]["tamanho"])
+                ))
+
+            novos = [arquivo for arquivo in caminhos if arquivo not in anteriores]
+            for arquivo in novos:
+                arquivos[arquivo] = _descrever_arquivo(arquivo)
+            if resumida:
+                resumos.extend(_ler_arquivos(_resumir_arquivo, novos))
+            else:
+                partes.extend(_ler_arquivos(_ler_arquivo_vendas, novos))
+
+            if resumida:
+                resumos = [base] + [resumir_vendas(parte) for parte in partes] + resumos
+                return montar_base_resumida(combinar_resumos(resumos), arquivos)
+
+            base = anexar_vendas(base, concatenar_vendas(partes), arquivos)
+
+            # Snapshot do arquivo que cresceu já com as linhas novas, para a próxima inicialização
+            if len(caminhos) == 1 and alterados:
+                salvar_snapshot(base["df_vendas"], caminhos[0])
+            return base
+
+    arquivos = {arquivo: _descrever_arquivo(arquivo) for arquivo in caminhos}
+    if resumida:
+        return montar_base_resumida(combinar_resumos(_ler_arquivos(_resumir_arquivo, caminhos)), arquivos)
+
+    partes = _ler_arquivos(_ler_arquivo_vendas, caminhos)
+    return montar_base_vendas(concatenar_vendas(partes), arquivos)
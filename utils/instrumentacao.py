@@ -0,0 +1,179 @@
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import pandas as pd
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from utils.constantes import ARQUIVO_LOG_DESEMPENHO, INSTRUMENTAR_DESEMPENHO
+
+try:
+    import resource
+except ImportError:  # Windows: sem o pico de memória do processo
+    resource = None
+
+try:
+    import psutil
+except ImportError:  # opcional: fora do Linux, sem ele não há memória atual
+    psutil = None
+
+# Instrumentação dos pontos quentes: cada etapa medida (leitura do CSV,
+# agrupamento, cálculo de uma página, formatação, gráfico...) gera um registro
+#   "etapa":          nome da etapa
+#   "pai":            etapa em que esta foi chamada (None no nível mais externo)
+#   "nivel":          profundidade (0 no nível mais externo)
+#   "ordem":          número sequencial da etapa, na ordem em que começaram
+#   "segundos":       duração
+#   "memoria_mb":     quanto a memória residente do processo variou durante a
+#                     etapa (negativa se ela liberou mais do que alocou)
+#   "rss_mb":         memória residente do processo ao fim da etapa
+#   "rss_max_mb":     pico de memória residente do processo até o fim da etapa
+#   "linhas_entrada": linhas dos DataFrames recebidos, quando houver
+#   "linhas_saida":   linhas do resultado, quando houver
+#   "cache":          "acerto" (resultado já calculado), "calculo" ou None
+#   "erro":           tipo da exceção que interrompeu a etapa, se houver
+#
+# Os registros vão para o coletor da thread (iniciado a cada execução de uma
+# página, e exibido no painel de desempenho) e, se ARQUIVO_LOG_DESEMPENHO
+# estiver definido, para um log em JSON lines. Medir custa poucos microssegundos
+# por etapa; as medidas de memória são do processo inteiro, então incluem o que
+# outras threads (como o pré-aquecimento) alocarem ao mesmo tempo.
+
+_local = threading.local()
+_trava_log = threading.Lock()
+_sequencia = itertools.count()
+
+# ru_maxrss é informado em KB no Linux e em bytes no macOS
+_BYTES_RSS = 1 if sys.platform == "darwin" else 1024
+
+def _rss_maximo_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _BYTES_RSS / 1024 ** 2
+
+def _rss_atual_mb() -> Optional[float]:
+    """Memória residente atual do processo (/proc no Linux; psutil, se instalado, nos demais)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            paginas = int(statm.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+def _pilha() -> List[Dict[str, object]]:
+    if not hasattr(_local, "pilha"):
+        _local.pilha = []
+    return _local.pilha
+
+def contar_linhas(valor: object) -> Optional[int]:
+    """Linhas de um DataFrame/Series, de um giro ({"tabela": ...}) ou da soma dos DataFrames de uma tupla."""
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return len(valor)
+    if isinstance(valor, dict) and isinstance(valor.get("tabela"), pd.DataFrame):
+        return len(valor["tabela"])
+    if isinstance(valor, (tuple, list)):
+        contagens = [contar_linhas(item) for item in valor]
+        contagens = [contagem for contagem in contagens if contagem is not None]
+        return sum(contagens) if contagens else None
+    return None
+
+def _gravar_log(registro: Dict[str, object]) -> None:
+    linha = json.dumps(registro, ensure_ascii=False, default=str)
+    with _trava_log, open(ARQUIVO_LOG_DESEMPENHO, "a", encoding="utf-8") as log:
+        log.write(linha + "\n")
+
+@contextmanager
+def medir_etapa(nome: str, **campos) -> Iterator[Dict[str, object]]:
+    """
+    Mede o bloco como a etapa `nome` e retorna o seu registro, que pode receber
+    campos durante a execução (por exemplo, "linhas_saida").
+    """
+    if not INSTRUMENTAR_DESEMPENHO:
+        yield {}
+        return
+
+    pilha = _pilha()
+    registro = {
+        "etapa": nome,
+        "pai": pilha[-1]["etapa"] if pilha else None,
+        "nivel": len(pilha),
+        "ordem": next(_sequencia),
+        "linhas_entrada": None,
+        "linhas_saida": None,
+        "cache": None,
+        "erro": None,
+        **campos,
+    }
+    rss_antes = _rss_atual_mb()
+    pilha.append(registro)
+    inicio = time.perf_counter()
+    try:
+        yield registro
+    except BaseException as e:
+        # Inclui o st.stop() e o st.rerun(), que interrompem a página
+        registro["erro"] = type(e).__name__
+        raise
+    finally:
+        registro["segundos"] = round(time.perf_counter() - inicio, 6)
+        pilha.pop()
+        rss_depois = _rss_atual_mb()
+        if rss_depois is not None:
+            registro["memoria_mb"] = round(rss_depois - rss_antes, 1)
+            registro["rss_mb"] = round(rss_depois, 1)
+        rss_maximo = _rss_maximo_mb()
+        if rss_maximo is not None:
+            registro["rss_max_mb"] = round(rss_maximo, 1)
+        registro["momento"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+        coletor = getattr(_local, "coletor", None)
+        if coletor is not None:
+            coletor.append(registro)
+        if ARQUIVO_LOG_DESEMPENHO:
+            try:
+                _gravar_log(registro)
+            except OSError:
+                pass
+
+def instrumentar(nome: Optional[str] = None, **campos) -> Callable[[Callable], Callable]:
+    """
+    Decorador que mede cada chamada da função como uma etapa (por padrão, com o
+    nome da função), contando as linhas dos DataFrames recebidos e do resultado.
+    """
+    def decorador(funcao: Callable) -> Callable:
+        etapa = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            with medir_etapa(etapa, **campos) as registro:
+                if registro:
+                    registro["linhas_entrada"] = contar_linhas([*args, *kwargs.values()])
+                resultado = funcao(*args, **kwargs)
+                if registro and registro["linhas_saida"] is None:
+                    registro["linhas_saida"] = contar_linhas(resultado)
+                return resultado
+        return medida
+    return decorador
+
+def anotar_etapa(**campos) -> None:
+    """Acrescenta campos ao registro da etapa em andamento na thread (sem efeito fora de uma etapa)."""
+    pilha = _pilha()
+    if pilha:
+        pilha[-1].update(campos)
+
+def marcar_cache(acerto: bool) -> None:
+    """Indica se a etapa em andamento reaproveitou um resultado já calculado."""
+    anotar_etapa(cache="acerto" if acerto else "calculo")
+
+def iniciar_coleta() -> None:
+    """Passa a coletar, nesta thread, os registros das etapas concluídas (descartando os anteriores)."""
+    _local.coletor = []
+
+def etapas_coletadas() -> List[Dict[str, object]]:
+    """Registros coletados nesta thread desde `iniciar_coleta`, na ordem em que as etapas terminaram (veja "ordem")."""
+    return list(getattr(_local, "coletor", None) or [])
@@ -1,7 +1,64 @@
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+from utils.instrumentacao import instrumentar
+
+# Acima deste valor os centavos (valor * 100) deixam de ser inteiros exatos em float64
+LIMITE_VETORIZADO = 1e13
+
+# Textos de cada grupo de três dígitos e dos centavos, montados por indexação
+GRUPOS = np.array([str(numero) for numero in range(1000)])
+GRUPOS_COMPLETOS = np.array([f"{numero:03d}" for numero in range(1000)])
+CENTAVOS = np.array([f",{numero:02d}" for numero in range(100)])
 
 def formatar_moeda_brasileira(valor: float) -> str:
     """Formata valor numérico como moeda brasileira."""
     if pd.isnull(valor) or not isinstance(valor, (int, float)):
         return "R$ 0,00"
     return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def _centavos(modulos: np.ndarray) -> np.ndarray:
+    """Valores em centavos inteiros, arredondados como a formatação do Python."""
+    escalados = modulos * 100
+    centavos = np.rint(escalados)
+    # O produto arredondado só cai no meio centavo se o valor estiver perto dele;
+    # esses poucos casos são decididos pelo próprio Python, pelo valor exato
+    meio = np.flatnonzero(escalados - np.floor(escalados) == 0.5)
+    centavos[meio] = [int(f"{valor:.2f}".replace(".", "")) for valor in modulos[meio]]
+    return centavos.astype(np.int64)
+
+def _agrupar_milhares(reais: np.ndarray) -> np.ndarray:
+    """Reais inteiros como texto, com "." a cada três dígitos ("1.234.567")."""
+    digitos = len(str(reais.max()))
+    texto = GRUPOS[reais % 1000].astype(f"U{digitos + (digitos - 1) // 3}")
+    grandes = np.flatnonzero(reais >= 1000)
+    if len(grandes) > 0:
+        milhares = np.char.add(_agrupar_milhares(reais[grandes] // 1000), ".")
+        texto[grandes] = np.char.add(milhares, GRUPOS_COMPLETOS[reais[grandes] % 1000])
+    return texto
+
+@instrumentar()
+def formatar_coluna_moeda(valores: pd.Series) -> pd.Series:
+    """
+    Formata uma coluna numérica inteira como moeda brasileira, com o mesmo
+    resultado de `formatar_moeda_brasileira` aplicada a cada valor.
+
+    Infinitos e valores acima de LIMITE_VETORIZADO usam a formatação por valor.
+    """
+    if not is_numeric_dtype(valores) or is_bool_dtype(valores) or valores.empty:
+        return valores.map(formatar_moeda_brasileira)
+
+    numeros = valores.to_numpy(dtype=np.float64, na_value=np.nan)
+    with np.errstate(invalid="ignore"):
+        vetorizados = np.abs(numeros) < LIMITE_VETORIZADO
+    por_valor = ~vetorizados & ~np.isnan(numeros)
+
+    resultado = np.full(len(numeros), "R$ 0,00", dtype=object)
+    if vetorizados.any():
+        reais, centavos = np.divmod(_centavos(np.abs(numeros[vetorizados])), 100)
+        sinal = np.where(np.signbit(numeros[vetorizados]), "R$ -", "R$ ")
+        textos = np.char.add(sinal, _agrupar_milhares(reais))
+        resultado[vetorizados] = np.char.add(textos, CENTAVOS[centavos])
+    if por_valor.any():
+        resultado[por_valor] = valores[por_valor].map(formatar_moeda_brasileira).to_numpy()
+    return pd.Series(resultado, index=valores.index, name=valores.name)
@@ -0,0 +1,192 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+from utils.constantes import MOTORES_AGREGACAO
+
+# Motor de agregação DuckDB (opcional; requer o pacote `duckdb`).
+#
+# Com MOTOR_AGREGACAO = "duckdb", as agregações que percorrem as vendas linha a
+# linha (vendas por controle, totais por produto, vendas por dia e produto do
+# giro, fatos do cubo diário, vendas por local e métricas por cliente) são
+# executadas como SQL em um banco DuckDB embutido, em memória e no próprio
+# processo: os DataFrames são registrados sem cópia, a consulta usa todos os
+# núcleos e, se faltar memória, os resultados intermediários vão para o disco.
+#
+# Cada função retorna as mesmas colunas, tipos e ordem de linhas do caminho em
+# pandas, que continua fazendo o que não é agregação (rótulos, junção com o
+# cadastro por posição, notas RFM). As somas de valores em reais usam `fsum`
+# (soma compensada, como o groupby do pandas); como a ordem das parcelas muda
+# com o paralelismo, podem diferir do pandas na última casa do float64.
+
+DIRETORIO_TEMPORARIO = os.path.join(tempfile.gettempdir(), "dashboard_duckdb")
+
+def usa_duckdb(motor: str) -> bool:
+    """Indica se o motor informado é o DuckDB (ValueError se o motor for inválido)."""
+    if motor not in MOTORES_AGREGACAO:
+        raise ValueError(f"Motor de agregação inválido: '{motor}'. Use um de {MOTORES_AGREGACAO}.")
+    return motor == "duckdb"
+
+def _consultar(sql: str, **tabelas: pd.DataFrame) -> pd.DataFrame:
+    """Executa `sql` sobre os DataFrames informados (registrados com o nome do argumento)."""
+    try:
+        import duckdb
+    except ImportError as e:
+        raise ImportError("O motor de agregação 'duckdb' requer o pacote duckdb (pip install duckdb).") from e
+
+    conexao = duckdb.connect(config={"temp_directory": DIRETORIO_TEMPORARIO})
+    try:
+        for nome, df in tabelas.items():
+            conexao.register(nome, df)
+        return conexao.sql(sql).df()
+    finally:
+        conexao.close()
+
+def _soma(coluna: str, valores: pd.Series) -> str:
+    """Soma SQL com o tipo do pandas: compensada para floats e sem nulos (0 em grupos vazios)."""
+    if pd.api.types.is_float_dtype(valores.dtype):
+        return f'coalesce(fsum("{coluna}"), 0)'
+    return f'coalesce(sum("{coluna}"), 0)::BIGINT'
+
+def _como_datas(valores: pd.Series) -> pd.Series:
+    """Converte para datas apenas se ainda não forem (o to_datetime não é gratuito em colunas já convertidas)."""
+    if pd.api.types.is_datetime64_any_dtype(valores.dtype):
+        return valores
+    return pd.to_datetime(valores, errors="coerce")
+
+def _como_numeros(valores: pd.Series) -> pd.Series:
+    """Converte para números apenas se ainda não forem."""
+    if pd.api.types.is_numeric_dtype(valores.dtype):
+        return valores
+    return pd.to_numeric(valores, errors="coerce")
+
+def _com_tipos(resultado: pd.DataFrame, tipos: Dict[str, object]) -> pd.DataFrame:
+    """Converte as colunas do resultado para os tipos do caminho em pandas."""
+    return resultado.astype({
+        coluna: tipo for coluna, tipo in tipos.items()
+        if coluna in resultado.columns and resultado[coluna].dtype != tipo
+    })
+
+def calcular_vendas_agrupadas(df_vendas: pd.DataFrame) -> pd.DataFrame:
+    """Quantidade e valor total por produto, em ordem de código (como o groupby em ProCod)."""
+    vendas = df_vendas[["ProCod", "Quantidade", "TotalItem"]]
+    resultado = _consultar(f"""
+        SELECT ProCod,
+               {_soma("Quantidade", vendas["Quantidade"])} AS Quantidade,
+               {_soma("TotalItem", vendas["TotalItem"])} AS TotalItem
+        FROM vendas
+        WHERE ProCod IS NOT NULL
+        GROUP BY ProCod
+        ORDER BY ProCod
+    """, vendas=vendas)
+    return _com_tipos(resultado, dict(vendas.dtypes))
+
+def agregar_por_controle(df: pd.DataFrame, colunas_com_nulos: List[str]) -> pd.DataFrame:
+    """
+    Por controle, em ordem crescente: total da venda, quantidade de itens e
+    posição da primeira linha da venda ("Primeira"), além da posição da
+    primeira linha não nula de cada coluna em `colunas_com_nulos`
+    ("Primeira_<coluna>", -1 se todas forem nulas).
+    """
+    linhas = pd.DataFrame({
+        "Controle": df["Controle"].array,
+        "TotalItem": df["TotalItem"].array,
+        "TemProduto": df["ProCod"].notna().to_numpy(),
+        "Linha": np.arange(len(df)),
+        **{f"Valida_{coluna}": df[coluna].notna().to_numpy() for coluna in colunas_com_nulos},
+    })
+    primeiras_validas = "".join(
+        f', coalesce(min(Linha) FILTER (WHERE "Valida_{coluna}"), -1) AS "Primeira_{coluna}"'
+        for coluna in colunas_com_nulos
+    )
+    return _consultar(f"""
+        SELECT Controle,
+               {_soma("TotalItem", df["TotalItem"])} AS TotalVenda,
+               count(*) FILTER (WHERE TemProduto) AS QuantidadeItens,
+               min(Linha) AS Primeira
+               {primeiras_validas}
+        FROM linhas
+        WHERE Controle IS NOT NULL
+        GROUP BY Controle
+        ORDER BY Controle
+    """, linhas=linhas)
+
+def vendas_por_dia_e_produto(df_vendas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quantidade vendida por dia e produto (Data, ProCod, Quantidade), de onde o
+    giro de qualquer granularidade é montado com o mesmo resultado que a partir
+    das vendas item a item. Linhas sem data, produto ou quantidade ficam de fora.
+    """
+    vendas = pd.DataFrame({
+        "Data": _como_datas(df_vendas["Data"]).array,
+        "ProCod": df_vendas["ProCod"].array,
+        "Quantidade": _como_numeros(df_vendas["Quantidade"]).array,
+    })
+    resultado = _consultar(f"""
+        SELECT date_trunc('day', Data) AS Data,
+               ProCod,
+               {_soma("Quantidade", vendas["Quantidade"])} AS Quantidade
+        FROM vendas
+        WHERE Data IS NOT NULL AND ProCod IS NOT NULL AND Quantidade IS NOT NULL
+        GROUP BY ALL
+    """, vendas=vendas)
+    return _com_tipos(resultado, dict(vendas.dtypes))
+
+def agregar_fatos_diarios(chaves: pd.DataFrame, df_vendas_agrupado: pd.DataFrame) -> pd.DataFrame:
+    """Fatos do cubo diário (Dia, Anonimo, TotalVenda, QuantVendas), em ordem de dia e indicador."""
+    fatos = pd.DataFrame({
+        "Dia": chaves["Dia"].array,
+        "Anonimo": chaves["Anonimo"].array,
+        "TotalVenda": df_vendas_agrupado["TotalVenda"].array,
+        "Controle": df_vendas_agrupado["Controle"].array,
+    })
+    resultado = _consultar(f"""
+        SELECT Dia, Anonimo,
+               {_soma("TotalVenda", fatos["TotalVenda"])} AS TotalVenda,
+               count(Controle) AS QuantVendas
+        FROM fatos
+        WHERE Dia IS NOT NULL
+        GROUP BY Dia, Anonimo
+        ORDER BY Dia, Anonimo
+    """, fatos=fatos)
+    return _com_tipos(resultado, {"Dia": fatos["Dia"].dtype, "Anonimo": fatos["Anonimo"].dtype})
+
+def calcular_vendas_por_local(df_vendas_agrupado: pd.DataFrame, campo: str) -> pd.DataFrame:
+    """Número de vendas e valor total por valor de `campo`, na ordem do groupby (pelo valor do campo)."""
+    vendas = df_vendas_agrupado[[campo, "Controle", "TotalVenda"]]
+    resultado = _consultar(f"""
+        SELECT "{campo}",
+               count(DISTINCT Controle) AS Vendas,
+               {_soma("TotalVenda", vendas["TotalVenda"])} AS ValorTotal
+        FROM vendas
+        WHERE "{campo}" IS NOT NULL AND Controle IS NOT NULL AND TotalVenda IS NOT NULL
+        GROUP BY "{campo}"
+        ORDER BY "{campo}"
+    """, vendas=vendas)
+    return _com_tipos(resultado, {campo: vendas[campo].dtype})
+
+def agregar_por_cliente(df_vendas_agrupado: pd.DataFrame) -> pd.DataFrame:
+    """Total vendido, número de compras, itens e última compra por cliente, em ordem de cliente."""
+    vendas = pd.DataFrame({
+        "Cliente": df_vendas_agrupado["Cliente"].array,
+        "TotalVenda": _como_numeros(df_vendas_agrupado["TotalVenda"]).array,
+        "Data": df_vendas_agrupado["Data"].array,
+        "QuantidadeItens": _como_numeros(df_vendas_agrupado["QuantidadeItens"]).array,
+    })
+    resultado = _consultar(f"""
+        SELECT Cliente,
+               {_soma("TotalVenda", vendas["TotalVenda"])} AS total_vendas,
+               count(Data) AS num_compras,
+               {_soma("QuantidadeItens", vendas["QuantidadeItens"])} AS itens_totais,
+               max(Data) AS ultima_compra
+        FROM vendas
+        WHERE Cliente IS NOT NULL
+        GROUP BY Cliente
+        ORDER BY Cliente
+    """, vendas=vendas)
+    return _com_tipos(resultado, {
+        "Cliente": vendas["Cliente"].dtype,
+        "itens_totais": vendas["QuantidadeItens"].dtype,
+        "ultima_compra": vendas["Data"].dtype,
+    })
@@ -0,0 +1,202 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple, Union, IO
+from utils.esquema import MOTOR_CSV, MOTORES_LEITURA_VENDAS
+
+# Motor Polars (opcional; requer o pacote `polars`) para a leitura das vendas
+# e para o agrupamento por controle.
+#
+# Leitura (MOTOR_LEITURA_VENDAS = "polars"): o CSV é varrido de forma preguiçosa
+# (`scan_csv`), em um único plano: apenas as colunas do esquema são lidas, as
+# linhas sem data são descartadas já na varredura, e a conversão da data e a
+# chave do dia de cada linha são calculadas pelo Polars, em paralelo. As colunas
+# temporais são então obtidas a partir dos dias distintos, como em utils/cubo.py.
+# O DataFrame pandas resultante é igual ao do `pd.read_csv` (colunas, tipos,
+# categorias e índice).
+#
+# Agrupamento (MOTOR_AGREGACAO = "polars"): vendas por controle e totais por
+# produto, com as mesmas colunas, tipos e ordem do caminho em pandas. Como nos
+# demais motores, o agrupamento recebe o DataFrame pandas das vendas (que pode
+# vir de um snapshot ou de vários arquivos), convertido para o Polars em outro
+# plano; leitura e agrupamento não são executados juntos. O Polars não tem soma
+# compensada, então os totais em reais podem diferir do pandas na última casa
+# do float64.
+
+# Tipos do esquema (pandas) -> tipos da leitura no Polars; colunas sem tipo são
+# lidas como texto e têm o tipo inferido depois, como faz o pandas
+TIPOS_POLARS = {
+    "Int32": "Int32",
+    "float64": "Float64",
+    "category": "Categorical",
+}
+
+def usa_polars(motor: str) -> bool:
+    """Indica se o motor informado é o Polars."""
+    return motor == "polars"
+
+def le_com_polars(motor: str) -> bool:
+    """Indica se a leitura das vendas usa o Polars (ValueError se o motor de leitura for inválido)."""
+    if motor not in MOTORES_LEITURA_VENDAS:
+        raise ValueError(f"Motor de leitura das vendas inválido: '{motor}'. Use um de {MOTORES_LEITURA_VENDAS}.")
+    return usa_polars(motor)
+
+def _importar_polars():
+    try:
+        import polars
+    except ImportError as e:
+        raise ImportError("O motor 'polars' requer o pacote polars (pip install polars).") from e
+    return polars
+
+def _para_pandas(df) -> pd.DataFrame:
+    """Converte para pandas mantendo inteiros de 32 bits com nulos como "Int32" (e não float)."""
+    import pyarrow as pa
+    return df.to_pandas(types_mapper={pa.int32(): pd.Int32Dtype()}.get)
+
+def _escolher_tipo(vendas, coluna: str):
+    """Inteiro, real ou texto, como a inferência de tipos do `pd.read_csv` (o primeiro que converte todos os valores)."""
+    valores = vendas.get_column(coluna)
+    for candidato in (f"_inteiro_{coluna}", f"_real_{coluna}"):
+        convertidos = vendas.get_column(candidato)
+        if convertidos.null_count() == valores.null_count():
+            return convertidos.alias(coluna)
+    return valores
+
+def ler_vendas(
+    caminho: Union[str, IO],
+    colunas: List[str],
+    tipos: Dict[str, str],
+    coluna_data: str,
+    delimitador: str,
+) -> Tuple[pd.DataFrame, np.ndarray, pd.DatetimeIndex]:
+    """
+    Lê as `colunas` do CSV de vendas com os `tipos` do esquema, convertendo a
+    coluna de data e descartando as linhas sem data válida (o índice mantém a
+    posição original das linhas, como o `dropna`).
+
+    Retorna o DataFrame, o código do dia de cada linha e os dias distintos, em
+    ordem (o código é a posição do dia em `dias`).
+    """
+    pl = _importar_polars()
+    esquema = {coluna: getattr(pl, TIPOS_POLARS.get(tipos.get(coluna), "String")) for coluna in colunas}
+
+    # A posição de cada linha no arquivo é numerada pela própria leitura, o que
+    # mantém o descarte das linhas sem data dentro da varredura do CSV
+    opcoes = {"separator": delimitador, "schema_overrides": esquema, "row_index_name": "_linha"}
+    if isinstance(caminho, str):
+        vendas = pl.scan_csv(caminho, **opcoes)
+    else:
+        vendas = pl.read_csv(caminho, columns=colunas, **opcoes).lazy()
+
+    # Data no formato ISO, convertida pelo Polars; o texto é guardado apenas nas
+    # linhas que ele não converteu, interpretadas depois valor a valor pelo
+    # pandas. Colunas sem tipo no esquema são convertidas para inteiro e para
+    # real, e o tipo é escolhido depois pela quantidade de valores convertidos.
+    texto = pl.col(coluna_data)
+    datas = texto.str.to_datetime(time_unit="ns", strict=False)
+    sem_tipo = [coluna for coluna in colunas if coluna not in tipos and coluna != coluna_data]
+    dia = pl.col(coluna_data).dt.truncate("1d")
+    vendas = (
+        vendas.select("_linha", *colunas)
+          .filter(texto.is_not_null())
+          .with_columns(
+              datas,
+              pl.when(datas.is_null()).then(texto).alias("_texto"),
+              (texto.str.len_chars().max() <= 10).alias("_sem_hora"),
+              texto.str.contains(".", literal=True).any().alias("_fracao"),
+              *(pl.col(coluna).str.to_integer(strict=False).alias(f"_inteiro_{coluna}") for coluna in sem_tipo),
+              *(pl.col(coluna).cast(pl.Float64, strict=False).alias(f"_real_{coluna}") for coluna in sem_tipo),
+          )
+          .with_columns((dia.rank("dense") - 1).cast(pl.Int32).alias("_codigo_dia"))
+          .collect()
+    )
+
+    falhas = vendas.get_column("_texto").is_not_null()
+
+    # O pyarrow já lê como datas, com resolução de segundos, as colunas em que
+    # todos os valores têm data e hora sem fração de segundo; nas demais, a
+    # conversão do pandas resulta em nanossegundos
+    em_segundos = (
+        MOTOR_CSV == "pyarrow"
+        and len(vendas) > 0
+        and not falhas.any()
+        and not vendas.get_column("_sem_hora")[0]
+        and not vendas.get_column("_fracao")[0]
+    )
+    vendas = vendas.with_columns(_escolher_tipo(vendas, coluna) for coluna in sem_tipo)
+
+    # Datas fora do formato (raras): convertidas pelo pandas, e as linhas que
+    # continuam sem data são descartadas; os códigos dos dias são refeitos
+    if falhas.any():
+        convertidas = pd.to_datetime(vendas.get_column("_texto").filter(falhas).to_pandas(), errors="coerce")
+        vendas = vendas.with_columns(
+            vendas.get_column(coluna_data).scatter(falhas.arg_true(), pl.Series(convertidas.to_numpy()))
+        )
+        vendas = (
+            vendas.filter(pl.col(coluna_data).is_not_null())
+              .with_columns((dia.rank("dense") - 1).cast(pl.Int32).alias("_codigo_dia"))
+        )
+
+    dias = pd.DatetimeIndex(vendas.select(dia.unique().sort()).to_series().to_numpy())
+    codigos_dia = vendas.get_column("_codigo_dia").to_numpy()
+    linhas = vendas.get_column("_linha")
+
+    df = _para_pandas(vendas.select(colunas))
+    if em_segundos:
+        df[coluna_data] = df[coluna_data].astype("datetime64[s]")
+    if len(df) > 0 and linhas[-1] != len(df) - 1:
+        df.index = pd.Index(linhas.to_numpy().astype(np.int64))
+
+    # Categorias em ordem alfabética, como na leitura do pandas (o Polars usa a ordem de aparição)
+    for coluna in colunas:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].cat.reorder_categories(df[coluna].cat.categories.sort_values())
+
+    return df, codigos_dia, dias
+
+def agregar_por_controle(df: pd.DataFrame, colunas_com_nulos: List[str]) -> pd.DataFrame:
+    """
+    Por controle, em ordem crescente: total da venda, quantidade de itens e
+    posição da primeira linha da venda ("Primeira"), além da posição da
+    primeira linha não nula de cada coluna em `colunas_com_nulos`
+    ("Primeira_<coluna>", -1 se todas forem nulas).
+    """
+    pl = _importar_polars()
+    linhas = pl.from_pandas(pd.DataFrame({
+        "Controle": df["Controle"].array,
+        "TotalItem": df["TotalItem"].array,
+        "TemProduto": df["ProCod"].notna().to_numpy(),
+        "Linha": np.arange(len(df)),
+        **{f"Valida_{coluna}": df[coluna].notna().to_numpy() for coluna in colunas_com_nulos},
+    }))
+    primeiras_validas = [
+        pl.col("Linha").filter(pl.col(f"Valida_{coluna}")).min().fill_null(-1).alias(f"Primeira_{coluna}")
+        for coluna in colunas_com_nulos
+    ]
+    return _para_pandas(
+        linhas.lazy()
+          .filter(pl.col("Controle").is_not_null())
+          .group_by("Controle")
+          .agg(
+              pl.col("TotalItem").sum().alias("TotalVenda"),
+              pl.col("TemProduto").sum().cast(pl.Int64).alias("QuantidadeItens"),
+              pl.col("Linha").min().alias("Primeira"),
+              *primeiras_validas,
+          )
+          .sort("Controle")
+          .collect()
+    )
+
+def calcular_vendas_agrupadas(df_vendas: pd.DataFrame) -> pd.DataFrame:
+    """Quantidade e valor total por produto, em ordem de código (como o groupby em ProCod)."""
+    pl = _importar_polars()
+    vendas = df_vendas[["ProCod", "Quantidade", "TotalItem"]]
+    resultado = _para_pandas(
+        pl.from_pandas(vendas)
+          .lazy()
+          .filter(pl.col("ProCod").is_not_null())
+          .group_by("ProCod")
+          .agg(pl.col("Quantidade").sum(), pl.col("TotalItem").sum())
+          .sort("ProCod")
+          .collect()
+    )
+    return resultado.astype({coluna: tipo for coluna, tipo in vendas.dtypes.items() if resultado[coluna].dtype != tipo})
@@ -0,0 +1,97 @@
+import threading
+import traceback
+import streamlit as st
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.caminho import caminho_valido, origem_vendas_valida
+from utils.giro import ROTULOS_PERIODO
+from utils.registro import (
+    obter_base_vendas,
+    obter_dimensao_produtos,
+    obter_giro_vendas,
+    obter_indicadores_temporais,
+    obter_produtos_nao_vendidos,
+    obter_variante_vendas_agrupadas,
+)
+
+# Pré-aquecimento: ao iniciar o app ou salvar novos caminhos, uma thread em
+# segundo plano monta a base de vendas e as tabelas derivadas usadas pelas
+# páginas, que ficam guardadas no registro compartilhado. A navegação passa a
+# só consultar o que já foi calculado.
+#
+# O estado de cada par de caminhos (vendas, cadastro) é compartilhado por todas
+# as sessões, e há no máximo uma thread ativa por par:
+#   "etapa":      descrição da etapa atual
+#   "concluidas": etapas concluídas, de "total"
+#   "ativo":      se a thread ainda está trabalhando
+#   "erro":       mensagem do erro que interrompeu o pré-aquecimento, se houver
+
+@st.cache_resource
+def _estados_preaquecimento() -> Dict[Tuple[str, str], Dict[str, object]]:
+    return {}
+
+@st.cache_resource
+def _trava_preaquecimento() -> threading.Lock:
+    return threading.Lock()
+
+def _etapas(caminho_vendas: str, caminho_cadastro: str) -> List[Tuple[str, Callable[[], object]]]:
+    """Etapas do pré-aquecimento, na ordem em que as páginas mais dependem delas."""
+    return [
+        ("Carregando vendas", lambda: obter_base_vendas(caminho_vendas)),
+        ("Indexando o cadastro de produtos", lambda: obter_dimensao_produtos(caminho_cadastro)),
+        ("Calculando indicadores temporais", lambda: [
+            obter_indicadores_temporais(caminho_vendas, ignorar) for ignorar in (True, False)
+        ]),
+        ("Separando vendas com e sem cliente não identificado", lambda: [
+            obter_variante_vendas_agrupadas(caminho_vendas, ignorar) for ignorar in (True, False)
+        ]),
+        ("Calculando produtos não vendidos", lambda: obter_produtos_nao_vendidos(caminho_vendas, caminho_cadastro)),
+        *(
+            (f"Montando giro de venda ({periodo})", lambda periodo=periodo: obter_giro_vendas(caminho_vendas, caminho_cadastro, periodo))
+            for periodo in ROTULOS_PERIODO
+        ),
+    ]
+
+def _executar(estado: Dict[str, object], etapas: List[Tuple[str, Callable[[], object]]]) -> None:
+    try:
+        for descricao, calcular in etapas:
+            estado["etapa"] = descricao
+            calcular()
+            estado["concluidas"] += 1
+        estado["etapa"] = "Dados prontos"
+    except Exception as e:
+        estado["erro"] = str(e)
+        traceback.print_exc()
+    finally:
+        estado["ativo"] = False
+
+def iniciar_preaquecimento(caminho_vendas: str, caminho_cadastro: str) -> Optional[Dict[str, object]]:
+    """
+    Inicia o pré-aquecimento dos caminhos informados em segundo plano, se ainda
+    não houver um em andamento, e retorna seu estado (None se os caminhos forem
+    inválidos). Repetir o pré-aquecimento de dados que não mudaram é barato: as
+    etapas só consultam o registro.
+    """
+    if not origem_vendas_valida(caminho_vendas) or not caminho_valido(caminho_cadastro):
+        return None
+
+    chave = (caminho_vendas, caminho_cadastro)
+    with _trava_preaquecimento():
+        estados = _estados_preaquecimento()
+        estado = estados.get(chave)
+        if estado is not None and estado["ativo"]:
+            return estado
+
+        etapas = _etapas(caminho_vendas, caminho_cadastro)
+        estado = estados[chave] = {
+            "etapa": etapas[0][0],
+            "concluidas": 0,
+            "total": len(etapas),
+            "ativo": True,
+            "erro": None,
+        }
+        threading.Thread(target=_executar, args=(estado, etapas), name="preaquecimento", daemon=True).start()
+        return estado
+
+def estado_preaquecimento(caminho_vendas: str, caminho_cadastro: str) -> Optional[Dict[str, object]]:
+    """Estado do último pré-aquecimento dos caminhos informados (None se nunca iniciado)."""
+    return _estados_preaquecimento().get((caminho_vendas, caminho_cadastro))
@@ -1,16 +1,29 @@
 import pandas as pd
-from typing import Union, IO, Optional
+from typing import Dict, Tuple, Union, IO, Optional
 import streamlit as st  
-from utils.constantes import DIAS_SEMANA_PT
+from utils.carregamento import calcular_vendas_agrupadas
+from utils.clientes import calcular_metricas_clientes
+from utils.instrumentacao import anotar_etapa, instrumentar
+from utils.produtos import anexar_cadastro
+from utils.registro import (
+    obter_indicadores_temporais,
+    obter_df_cadastro,
+    obter_dimensao_produtos,
+    obter_df_produtos_totais,
+    obter_df_vendas,
+    obter_df_vendas_agrupado,
+    obter_giro_vendas,
+    obter_produtos_nao_vendidos,
+    obter_variante_vendas_agrupadas,
+    obter_versao_dados,
+)
+from utils.sessao import descartar_dfs_da_sessao
 
-def calcular_vendas_agrupadas(df_vendas: pd.DataFrame) -> pd.DataFrame:
-    if not {"ProCod", "Quantidade", "TotalItem"}.issubset(df_vendas.columns):
-        raise ValueError("Colunas necessárias não estão presentes no DataFrame.")
-    return df_vendas.groupby("ProCod")[["Quantidade", "TotalItem"]].sum().reset_index()
-
-def adicionar_nomes_produtos(df_vendidos: pd.DataFrame, df_cadastro: pd.DataFrame) -> pd.DataFrame:
-    return pd.merge(df_vendidos, df_cadastro, on="ProCod", how="left")
+def adicionar_nomes_produtos(df_vendidos: pd.DataFrame, dimensao: Dict[str, object]) -> pd.DataFrame:
+    """Junta os dados do cadastro (nome do produto etc.) por posição na dimensão de produtos."""
+    return anexar_cadastro(df_vendidos, dimensao)
 
+@instrumentar()
 def carregar_df_cadastro(caminho: Optional[Union[str, IO]] = None) -> None:
     """Carrega o arquivo de cadastro e retorna apenas as colunas de código e nome do produto."""
     
@@ -21,13 +34,27 @@ def carregar_df_cadastro(caminho: Optional[Union[str, IO]] = None) -> None:
         st.error("❌ Caminho para o arquivo de cadastro não foi definido.")
         st.stop()
     
-    df = pd.read_csv(caminho, delimiter=";", decimal=".")
-    st.session_state["df_cadastro"] = df
+    # A sessão guarda apenas uma referência à cópia compartilhada entre todos os usuários
+    st.session_state["df_cadastro"] = obter_df_cadastro(caminho)
+    anotar_etapa(linhas_saida=len(st.session_state["df_cadastro"]))
+
+    duplicados = obter_dimensao_produtos(caminho)["duplicados"]
+    if not duplicados.empty:
+        codigos = duplicados["ProCod"].drop_duplicates()
+        exemplos = ", ".join(str(codigo) for codigo in codigos.head(10))
+        st.warning(
+            f"⚠️ {len(codigos)} código(s) de produto repetido(s) no cadastro ({exemplos}"
+            f"{', ...' if len(codigos) > 10 else ''}). Será usado o primeiro registro de cada código."
+        )
 
+@instrumentar()
 def carregar_df_vendas(caminho: Optional[Union[str, IO]] = None) -> None:
     """
     Carrega os dados de vendas a partir de um caminho, adiciona colunas temporais
     e salva no session_state como 'df_vendas'.
+
+    O DataFrame vem do registro compartilhado (e, quando possível, de um snapshot
+    Parquet), então a sessão guarda apenas uma referência e não uma cópia própria.
     """
     # Recupera o caminho padrão da sessão, se não for fornecido diretamente
     if caminho is None:
@@ -38,62 +65,164 @@ def carregar_df_vendas(caminho: Optional[Union[str, IO]] = None) -> None:
         st.stop()
 
     try:
-        df = pd.read_csv(caminho, delimiter=";", decimal=".", low_memory=False)
+        with st.spinner("Carregando vendas..."):
+            df = obter_df_vendas(caminho)
     except Exception as e:
         st.error(f"❌ Falha ao carregar o arquivo de vendas: {e}")
         st.stop()
 
-    df["Data"] = pd.to_datetime(df["Data"], errors="coerce")
-    df = df.dropna(subset=["Data"])  # Garante que todas as datas são válidas
-
-    # Criação de colunas temporais (vetorizadas)
-    df["Ano"] = df["Data"].dt.year
-    df["Semestre"] = df["Data"].dt.month.apply(lambda m: "S1" if m <= 6 else "S2")
-    df["Trimestre"] = df["Data"].dt.to_period("Q").astype(str)
-    df["MesPeriodo"] = df["Data"].dt.to_period("M").astype(str)
-    df["SemanaInicioDt"] = df["Data"].dt.to_period("W").astype(str)
-    df["Dia"] = df["Data"].dt.strftime("%Y-%m-%d")
-    df["DiaSemana"] = df["Data"].dt.day_name().map(DIAS_SEMANA_PT)
-
     st.session_state["df_vendas"] = df
+    anotar_etapa(linhas_saida=len(df))
 
+@instrumentar()
 def processa_df_venda_agrupado() -> None:
-    """Agrupa as vendas por controle, com colunas temporais derivadas."""
-    
-    if "df_vendas" not in st.session_state:
-        carregar_df_vendas()
-        
-    df = st.session_state.get("df_vendas")
-    
-    if df is None or "Controle" not in df.columns:
-        st.error("❌ DataFrame de vendas não disponível ou mal formatado.")
-        return
-
-    df_vendas_agrupado = (
-        df.groupby("Controle", as_index=False)
-          .agg({
-              "Cliente": "first",
-              "TotalItem": "sum",
-              "Data": "first",
-              "ProCod": "count",
-              "Controle": "first",
-              "Ano": "first",
-              "Semestre": "first",
-              "Trimestre": "first",
-              "MesPeriodo": "first",
-              "SemanaInicioDt": "first",
-              "Dia": "first",
-              "DiaSemana": "first",
-              "Bairro": "first",
-          })
-          .rename(columns={
-              "TotalItem": "TotalVenda",
-              "ProCod": "QuantidadeItens"
-          })
-    )
-
-    df_vendas_agrupado["Ano"] = df_vendas_agrupado["Data"].dt.year
-    df_vendas_agrupado["MesPeriodo"] = df_vendas_agrupado["Data"].dt.to_period("M").astype(str)
-    df_vendas_agrupado["DiaSemana"] = df_vendas_agrupado["Data"].dt.day_name().map(DIAS_SEMANA_PT)
-
-    st.session_state["df_vendas_agrupado"] = df_vendas_agrupado
+    """
+    Carrega as vendas agrupadas por controle, com colunas temporais derivadas,
+    no session_state como 'df_vendas_agrupado'. As vendas item a item não são
+    necessárias (e não existem em memória nas origens lidas em blocos).
+    """
+    caminho = st.session_state.get("caminho_vendas")
+
+    if not caminho:
+        st.error("❌ Caminho para o arquivo de vendas não foi definido.")
+        st.stop()
+
+    try:
+        with st.spinner("Carregando vendas..."):
+            st.session_state["df_vendas_agrupado"] = obter_df_vendas_agrupado(caminho)
+        anotar_etapa(linhas_saida=len(st.session_state["df_vendas_agrupado"]))
+    except Exception as e:
+        st.error(f"❌ Falha ao agrupar as vendas: {e}")
+        st.stop()
+
+@instrumentar()
+def carregar_df_produtos_totais() -> None:
+    """Carrega a quantidade e o valor total vendidos por produto no session_state como 'df_produtos_totais'."""
+    caminho = st.session_state.get("caminho_vendas")
+
+    if not caminho:
+        st.error("❌ Caminho para o arquivo de vendas não foi definido.")
+        st.stop()
+
+    try:
+        st.session_state["df_produtos_totais"] = obter_df_produtos_totais(caminho)
+        anotar_etapa(linhas_saida=len(st.session_state["df_produtos_totais"]))
+    except Exception as e:
+        st.error(f"❌ Falha ao calcular os totais por produto: {e}")
+        st.stop()
+
+@instrumentar()
+def carregar_indicadores_temporais(ignorar_anonimo: bool) -> Tuple[Tuple[pd.DataFrame, ...], int, float]:
+    """
+    Retorna as tabelas temporais (ano, semestre, trimestre, mês, semana, dia da
+    semana e data), o total de clientes distintos e o total vendido.
+    """
+    caminho = st.session_state.get("caminho_vendas")
+
+    if not caminho:
+        st.error("❌ Caminho para o arquivo de vendas não foi definido.")
+        st.stop()
+
+    try:
+        return obter_indicadores_temporais(caminho, ignorar_anonimo)
+    except Exception as e:
+        st.error(f"❌ Falha ao calcular os indicadores de vendas: {e}")
+        st.stop()
+
+
+@instrumentar()
+def carregar_vendas_agrupadas(ignorar_anonimo: bool) -> Tuple[str, pd.DataFrame]:
+    """
+    Retorna a chave da versão dos dados e as vendas agrupadas por controle, com ou
+    sem o cliente não identificado (ID 99999). Use a chave como argumento das
+    funções com cache no lugar do DataFrame.
+    """
+    caminho = st.session_state.get("caminho_vendas")
+
+    if not caminho:
+        st.error("❌ Caminho para o arquivo de vendas não foi definido.")
+        st.stop()
+
+    try:
+        return obter_variante_vendas_agrupadas(caminho, ignorar_anonimo)
+    except Exception as e:
+        st.error(f"❌ Falha ao carregar as vendas agrupadas: {e}")
+        st.stop()
+
+@instrumentar()
+def carregar_versao_dados() -> str:
+    """
+    Retorna a chave da versão dos arquivos de vendas e de cadastro configurados.
+
+    Os DataFrames da sessão pertencem à versão guardada em 'versao_dados'; quando
+    os arquivos mudam, as referências antigas são descartadas para serem obtidas
+    novamente, mantendo a chave coerente com os dados usados nas funções com cache.
+    """
+    caminho_vendas = st.session_state.get("caminho_vendas")
+    caminho_cadastro = st.session_state.get("caminho_cadastro")
+
+    if not caminho_vendas or not caminho_cadastro:
+        st.error("❌ Caminhos para os arquivos de vendas e cadastro não foram definidos.")
+        st.stop()
+
+    try:
+        versao = obter_versao_dados(caminho_vendas, caminho_cadastro)
+    except Exception as e:
+        st.error(f"❌ Falha ao verificar a versão dos dados: {e}")
+        st.stop()
+
+    if st.session_state.get("versao_dados") != versao:
+        descartar_dfs_da_sessao()
+        st.session_state["versao_dados"] = versao
+    return versao
+
+@instrumentar()
+def carregar_giro_vendas(periodo: str) -> Dict[str, object]:
+    """
+    Retorna a tabela de giro de venda por produto da granularidade `periodo`
+    ("Ano", "Semestre", "Trimestre", "Mês", "Semana", "Dia da Semana" ou "Data"),
+    com o índice de períodos usado por `fatiar_giro`.
+    """
+    caminho_vendas = st.session_state.get("caminho_vendas")
+    caminho_cadastro = st.session_state.get("caminho_cadastro")
+
+    if not caminho_vendas or not caminho_cadastro:
+        st.error("❌ Caminhos para os arquivos de vendas e cadastro não foram definidos.")
+        st.stop()
+
+    try:
+        return obter_giro_vendas(caminho_vendas, caminho_cadastro, periodo)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+
+@instrumentar()
+def carregar_dimensao_produtos() -> Dict[str, object]:
+    """Retorna a dimensão de produtos (índice inteiro sobre ProCod) do cadastro configurado."""
+    caminho = st.session_state.get("caminho_cadastro")
+
+    if not caminho:
+        st.error("❌ Caminho para o arquivo de cadastro não foi definido.")
+        st.stop()
+
+    try:
+        return obter_dimensao_produtos(caminho)
+    except Exception as e:
+        st.error(f"❌ Falha ao indexar o cadastro de produtos: {e}")
+        st.stop()
+
+@instrumentar()
+def carregar_produtos_nao_vendidos() -> pd.DataFrame:
+    """Retorna os produtos do cadastro que não aparecem nas vendas."""
+    caminho_vendas = st.session_state.get("caminho_vendas")
+    caminho_cadastro = st.session_state.get("caminho_cadastro")
+
+    if not caminho_vendas or not caminho_cadastro:
+        st.error("❌ Caminhos para os arquivos de vendas e cadastro não foram definidos.")
+        st.stop()
+
+    try:
+        return obter_produtos_nao_vendidos(caminho_vendas, caminho_cadastro)
+    except Exception as e:
+        st.error(f"❌ Falha ao calcular os produtos não vendidos: {e}")
+        st.stop()
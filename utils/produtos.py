@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from typing import Dict
+from utils.instrumentacao import instrumentar
+
+# Dimensão de produtos: índice inteiro denso sobre os códigos (ProCod) do
+# cadastro, montado uma vez por arquivo de cadastro. Cada código distinto recebe
+# uma posição 0..n-1; juntar dados do cadastro a vendas passa a ser um `take`
+# por posição, e conjuntos de produtos (por exemplo, os vendidos) são vetores
+# booleanos indexados pela mesma posição.
+#   "cadastro":  DataFrame de cadastro original
+#   "codigos":   Index com os códigos distintos, na ordem de primeira aparição
+#   "linhas":    linha do cadastro usada para cada código (a primeira)
+#   "posicoes":  posição do código de cada linha do cadastro (-1 se nulo)
+#   "duplicados": linhas do cadastro cujo código aparece mais de uma vez
+
+@instrumentar()
+def montar_dimensao_produtos(df_cadastro: pd.DataFrame) -> Dict[str, object]:
+    """Monta a dimensão de produtos a partir do cadastro."""
+    if "ProCod" not in df_cadastro.columns:
+        raise ValueError("Coluna 'ProCod' não encontrada no cadastro.")
+
+    posicoes, codigos = pd.factorize(df_cadastro["ProCod"])
+
+    # Os códigos são numerados na ordem de aparição: a primeira linha de cada
+    # código é a que supera todos os códigos anteriores
+    maximo_anterior = np.maximum.accumulate(np.concatenate(([-1], posicoes))[:-1])
+    linhas = np.flatnonzero(posicoes > maximo_anterior)
+
+    repetidos = df_cadastro["ProCod"].notna() & df_cadastro["ProCod"].duplicated(keep=False)
+
+    return {
+        "cadastro": df_cadastro,
+        "codigos": codigos,
+        "linhas": linhas,
+        "posicoes": posicoes,
+        "duplicados": df_cadastro[repetidos.to_numpy()],
+    }
+
+def posicoes_produtos(dimensao: Dict[str, object], codigos: pd.Series) -> np.ndarray:
+    """Posição de cada código na dimensão; -1 para códigos nulos ou fora do cadastro."""
+    return dimensao["codigos"].get_indexer(codigos)
+
+@instrumentar()
+def anexar_cadastro(df: pd.DataFrame, dimensao: Dict[str, object]) -> pd.DataFrame:
+    """
+    Junta a `df` as colunas do cadastro (como um merge à esquerda em ProCod),
+    usando a primeira linha do cadastro de cada código.
+    """
+    cadastro = dimensao["cadastro"]
+    posicoes = posicoes_produtos(dimensao, df["ProCod"])
+    # Posição -1 (sem cadastro) cai na sentinela -1 do final, que vira nulo no take
+    linhas = np.append(dimensao["linhas"], -1)[posicoes]
+
+    colunas = {
+        coluna: cadastro[coluna].array.take(linhas, allow_fill=True)
+        for coluna in cadastro.columns if coluna not in df.columns
+    }
+    return df.assign(**colunas)
+
+def marcar_vendidos(dimensao: Dict[str, object], codigos_vendidos: pd.Series) -> np.ndarray:
+    """Vetor booleano, por posição da dimensão, dos produtos com vendas."""
+    vendidos = np.zeros(len(dimensao["codigos"]), dtype=bool)
+    posicoes = posicoes_produtos(dimensao, codigos_vendidos)
+    vendidos[posicoes[posicoes >= 0]] = True
+    return vendidos
+
+def filtrar_nao_vendidos(dimensao: Dict[str, object], vendidos: np.ndarray) -> pd.DataFrame:
+    """Linhas do cadastro cujos produtos não aparecem nas vendas."""
+    # Códigos nulos (posição -1) caem na sentinela "não vendido" do final
+    sem_venda = ~np.append(vendidos, False)[dimensao["posicoes"]]
+    return dimensao["cadastro"][sem_venda]
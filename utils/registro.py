@@ -0,0 +1,307 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+import streamlit as st
+import pandas as pd
+from typing import Callable, Dict, Optional, Tuple, Union, IO
+from utils.caminho import caminho_valido, origem_vendas_valida, assinatura_arquivo
+from utils.analise import (
+    calcular_indicadores_temporais,
+    calcular_produtos_nao_vendidos,
+    filtrar_vendas_agrupadas,
+    vendas_para_giro,
+)
+from utils.carregamento import (
+    agrupar_vendas_por_controle,
+    calcular_vendas_agrupadas,
+    ler_df_cadastro,
+    ler_df_vendas,
+)
+from utils.constantes import MAX_DATASETS_EM_MEMORIA
+from utils.cubo import montar_cubo_diario
+from utils.giro import montar_giro
+from utils.instrumentacao import marcar_cache, medir_etapa
+from utils.produtos import filtrar_nao_vendidos, marcar_vendidos, montar_dimensao_produtos
+from utils.incremental import atualizar_base_vendas
+
+# Registro de datasets compartilhado por todas as sessões do processo.
+# Cada origem de vendas (arquivo ou diretório) tem uma única base em memória,
+# reutilizada por todos os usuários simultâneos. Ficam em memória as bases das
+# MAX_DATASETS_EM_MEMORIA origens usadas mais recentemente. Os dados novos da
+# origem são anexados (ou a base é recriada) por `atualizar_vendas_compartilhadas`,
+# chamada uma vez por execução da página (utils/sessao.py) ou a pedido do
+# usuário, e não a cada consulta.
+
+@st.cache_resource
+def _bases_vendas() -> "OrderedDict[str, Dict[str, object]]":
+    return OrderedDict()
+
+@st.cache_resource
+def _trava_bases() -> threading.Lock:
+    return threading.Lock()
+
+@st.cache_resource
+def _travas_origens() -> Dict[str, threading.Lock]:
+    return {}
+
+def _trava_origem(caminho: str) -> threading.Lock:
+    """Trava da origem informada: a leitura de uma origem não bloqueia as demais."""
+    with _trava_bases():
+        return _travas_origens().setdefault(caminho, threading.Lock())
+
+def _base_em_memoria(caminho: str) -> Optional[Dict[str, object]]:
+    """Base da origem, se estiver em memória (marcando-a como usada mais recentemente)."""
+    with _trava_bases():
+        bases = _bases_vendas()
+        base = bases.get(caminho)
+        if base is not None:
+            bases.move_to_end(caminho)
+        return base
+
+def _guardar_base(caminho: str, base: Dict[str, object]) -> None:
+    """Guarda a base da origem, descartando as usadas há mais tempo além do limite."""
+    with _trava_bases():
+        bases = _bases_vendas()
+        bases[caminho] = base
+        bases.move_to_end(caminho)
+        while len(bases) > MAX_DATASETS_EM_MEMORIA:
+            bases.popitem(last=False)
+
+@st.cache_resource(max_entries=MAX_DATASETS_EM_MEMORIA, show_spinner="Carregando cadastro...")
+def _df_cadastro_compartilhado(caminho: str, assinatura: str) -> pd.DataFrame:
+    return ler_df_cadastro(caminho)
+
+@st.cache_resource(max_entries=MAX_DATASETS_EM_MEMORIA)
+def _dimensao_produtos_compartilhada(caminho: str, assinatura: str) -> Dict[str, object]:
+    return montar_dimensao_produtos(_df_cadastro_compartilhado(caminho, assinatura))
+
+def _atualizar_base(caminho: str) -> Tuple[Optional[Dict[str, object]], Dict[str, object]]:
+    """Anexa os dados novos da origem à sua base; retorna a base anterior (se havia) e a atual."""
+    with _trava_origem(caminho), medir_etapa("atualizar_base_vendas") as etapa:
+        anterior = _base_em_memoria(caminho)
+        base = atualizar_base_vendas(caminho, anterior)
+        _guardar_base(caminho, base)
+        # Sem dados novos, a base anterior é devolvida sem alterações
+        marcar_cache(base is anterior)
+        etapa["linhas_saida"] = base["linhas_vendas"]
+    return anterior, base
+
+def atualizar_vendas_compartilhadas(caminho: str) -> Tuple[int, int]:
+    """
+    Anexa à base compartilhada os dados novos da origem informada.
+    Retorna a quantidade de linhas de vendas antes e depois da atualização.
+    """
+    anterior, base = _atualizar_base(caminho)
+    linhas_depois = base["linhas_vendas"]
+    linhas_antes = linhas_depois if anterior is None else anterior["linhas_vendas"]
+    return linhas_antes, linhas_depois
+
+def versao_vendas_em_memoria(caminho: str) -> Optional[str]:
+    """Versão da base da origem informada, se estiver em memória (sem verificar os arquivos)."""
+    base = _base_em_memoria(caminho)
+    return None if base is None else base["versao"]
+
+def obter_base_vendas(caminho: str) -> Dict[str, object]:
+    """
+    Retorna a base de vendas compartilhada da origem informada, lendo-a na
+    primeira consulta (ou se tiver sido descartada da memória).
+    """
+    base = _base_em_memoria(caminho)
+    if base is None:
+        _, base = _atualizar_base(caminho)
+    else:
+        marcar_cache(True)
+    return base
+
+def obter_df_vendas(caminho: Union[str, IO]) -> pd.DataFrame:
+    """
+    Retorna o DataFrame de vendas compartilhado para o caminho informado.
+    Origens lidas em blocos não guardam as vendas item a item (ValueError).
+    """
+    if not origem_vendas_valida(caminho):
+        # Arquivos em memória não têm identidade estável: leitura direta, sem compartilhamento
+        return ler_df_vendas(caminho)
+
+    base = obter_base_vendas(caminho)
+    if base["resumida"]:
+        raise ValueError(
+            "a origem de vendas é grande demais para a memória e foi lida em blocos; "
+            "apenas as tabelas agregadas estão disponíveis"
+        )
+    return base["df_vendas"]
+
+def obter_df_vendas_agrupado(caminho: Union[str, IO]) -> pd.DataFrame:
+    """Retorna o DataFrame de vendas agrupado por controle, compartilhado para o caminho informado."""
+    if not origem_vendas_valida(caminho):
+        return agrupar_vendas_por_controle(ler_df_vendas(caminho))
+    return obter_base_vendas(caminho)["df_vendas_agrupado"]
+
+def _versao_em_memoria(arquivo: IO) -> str:
+    """Versão de um arquivo em memória (sem caminho estável), pelo hash do conteúdo."""
+    posicao = arquivo.tell()
+    arquivo.seek(0)
+    conteudo = arquivo.read()
+    arquivo.seek(posicao)
+    if isinstance(conteudo, str):
+        conteudo = conteudo.encode("utf-8")
+    return hashlib.sha1(conteudo).hexdigest()[:16]
+
+def _versao_cadastro(caminho: Union[str, IO]) -> str:
+    if caminho_valido(caminho):
+        return assinatura_arquivo(caminho)
+    return _versao_em_memoria(caminho)
+
+def obter_versao_dados(caminho_vendas: Union[str, IO], caminho_cadastro: Union[str, IO]) -> str:
+    """
+    Retorna uma chave curta que identifica a versão dos dados de vendas e de
+    cadastro, derivada da identidade dos arquivos (caminho, tamanho e data de
+    modificação) e não do conteúdo dos DataFrames.
+
+    Funções com @st.cache_data podem receber essa chave no lugar dos DataFrames
+    (passados em parâmetros com "_", que o Streamlit não hasheia).
+    """
+    if origem_vendas_valida(caminho_vendas):
+        versao_vendas = obter_base_vendas(caminho_vendas)["versao"]
+    else:
+        versao_vendas = _versao_em_memoria(caminho_vendas)
+
+    return f"{versao_vendas}-{_versao_cadastro(caminho_cadastro)}"
+
+def _chave_variante(versao: str, ignorar_anonimo: bool) -> str:
+    return f"{versao}:{'sem_anonimo' if ignorar_anonimo else 'completo'}"
+
+def obter_variante_vendas_agrupadas(caminho: Union[str, IO], ignorar_anonimo: bool) -> Tuple[str, pd.DataFrame]:
+    """
+    Retorna as vendas agrupadas por controle, com ou sem o cliente não identificado,
+    e uma chave curta que identifica a versão dos dados e a variante.
+
+    As duas variantes são calculadas uma vez por versão da base e compartilhadas;
+    a chave pode ser passada às funções com @st.cache_data no lugar do DataFrame
+    (recebido em um parâmetro com "_"), para que ele não seja hasheado a cada execução.
+    """
+    if not origem_vendas_valida(caminho):
+        versao = _versao_em_memoria(caminho)
+        df = filtrar_vendas_agrupadas(agrupar_vendas_por_controle(ler_df_vendas(caminho)), ignorar_anonimo)
+        return _chave_variante(versao, ignorar_anonimo), df
+
+    base = obter_base_vendas(caminho)
+    df = _memorizar(
+        base, "variantes_vendas_agrupadas", ignorar_anonimo,
+        lambda: filtrar_vendas_agrupadas(base["df_vendas_agrupado"], ignorar_anonimo),
+    )
+    return _chave_variante(base["versao"], ignorar_anonimo), df
+
+def obter_df_produtos_totais(caminho: Union[str, IO]) -> pd.DataFrame:
+    """Retorna a quantidade e o valor total vendidos por produto, compartilhados para o caminho informado."""
+    if not origem_vendas_valida(caminho):
+        return calcular_vendas_agrupadas(ler_df_vendas(caminho))
+    return obter_base_vendas(caminho)["df_produtos_totais"]
+
+def obter_df_cadastro(caminho: Union[str, IO]) -> pd.DataFrame:
+    """Retorna o DataFrame de cadastro compartilhado para o caminho informado."""
+    if not caminho_valido(caminho):
+        return ler_df_cadastro(caminho)
+    return _df_cadastro_compartilhado(caminho, assinatura_arquivo(caminho))
+
+def obter_dimensao_produtos(caminho: Union[str, IO]) -> Dict[str, object]:
+    """Retorna a dimensão de produtos (índice inteiro sobre ProCod) do cadastro informado."""
+    if not caminho_valido(caminho):
+        return montar_dimensao_produtos(ler_df_cadastro(caminho))
+    return _dimensao_produtos_compartilhada(caminho, assinatura_arquivo(caminho))
+
+def _trava_memorias(base: Dict[str, object]) -> threading.Lock:
+    """Trava dos resultados guardados na base (criada na primeira consulta)."""
+    with _trava_bases():
+        return base.setdefault("trava_memorias", threading.Lock())
+
+def _memorizar(
+    base: Dict[str, object],
+    nome: str,
+    chave: object,
+    calcular: Callable[[], object],
+    versao_cadastro: Optional[str] = None,
+) -> object:
+    """
+    Guarda na base, em `nome`, o resultado de `calcular` para a chave informada,
+    calculado uma única vez mesmo com várias sessões consultando ao mesmo tempo:
+    a primeira calcula e as demais aguardam o mesmo resultado. Resultados que
+    dependem do cadastro informam a sua versão; os de um cadastro anterior são
+    descartados. Se o cálculo falhar, a próxima consulta tenta de novo.
+    """
+    trava = _trava_memorias(base)
+    with trava:
+        memoria = base.get(nome)
+        if memoria is None or memoria["versao_cadastro"] != versao_cadastro:
+            memoria = base[nome] = {"versao_cadastro": versao_cadastro, "valores": {}}
+        futuro = memoria["valores"].get(chave)
+        calcula_aqui = futuro is None
+        if calcula_aqui:
+            futuro = memoria["valores"][chave] = Future()
+
+    marcar_cache(not calcula_aqui)
+    if calcula_aqui:
+        try:
+            futuro.set_result(calcular())
+        except BaseException as e:
+            with trava:
+                memoria["valores"].pop(chave, None)
+            futuro.set_exception(e)
+            raise
+    return futuro.result()
+
+def obter_indicadores_temporais(
+    caminho: Union[str, IO],
+    ignorar_anonimo: bool,
+) -> Tuple[Tuple[pd.DataFrame, ...], int, float]:
+    """
+    Retorna as tabelas temporais, o total de clientes distintos e o total vendido,
+    calculados a partir do cubo diário e guardados na base até a próxima atualização.
+    """
+    if not origem_vendas_valida(caminho):
+        cubo = montar_cubo_diario(agrupar_vendas_por_controle(ler_df_vendas(caminho)))
+        return calcular_indicadores_temporais(cubo, ignorar_anonimo)
+
+    base = obter_base_vendas(caminho)
+    return _memorizar(
+        base, "indicadores_temporais", ignorar_anonimo,
+        lambda: calcular_indicadores_temporais(base["cubo_diario"], ignorar_anonimo),
+    )
+
+def obter_giro_vendas(
+    caminho_vendas: Union[str, IO],
+    caminho_cadastro: Union[str, IO],
+    periodo: str,
+) -> Dict[str, object]:
+    """
+    Retorna a tabela de giro de venda (produto x período) da granularidade
+    informada, com o índice período -> linhas. Cada granularidade é montada na
+    primeira consulta e guardada na base até a próxima atualização dos dados.
+    """
+    dimensao = obter_dimensao_produtos(caminho_cadastro)
+    if not origem_vendas_valida(caminho_vendas):
+        return montar_giro(ler_df_vendas(caminho_vendas), dimensao, periodo)
+
+    base = obter_base_vendas(caminho_vendas)
+    return _memorizar(
+        base, "giro_vendas", periodo,
+        lambda: montar_giro(vendas_para_giro(base), dimensao, periodo),
+        versao_cadastro=_versao_cadastro(caminho_cadastro),
+    )
+
+def obter_produtos_nao_vendidos(caminho_vendas: Union[str, IO], caminho_cadastro: Union[str, IO]) -> pd.DataFrame:
+    """
+    Retorna as linhas do cadastro cujos produtos não aparecem nas vendas, pela
+    diferença entre o cadastro e o vetor de produtos vendidos da dimensão.
+    """
+    dimensao = obter_dimensao_produtos(caminho_cadastro)
+    if not origem_vendas_valida(caminho_vendas):
+        vendidos = marcar_vendidos(dimensao, ler_df_vendas(caminho_vendas)["ProCod"])
+        return filtrar_nao_vendidos(dimensao, vendidos)
+
+    base = obter_base_vendas(caminho_vendas)
+    return _memorizar(
+        base, "produtos_nao_vendidos", None,
+        lambda: calcular_produtos_nao_vendidos(base["df_produtos_totais"], dimensao),
+        versao_cadastro=_versao_cadastro(caminho_cadastro),
+    )
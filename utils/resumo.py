@@ -0,0 +1,91 @@
+import pandas as pd
+from typing import Dict, Iterable, List
+from utils.carregamento import agrupar_vendas_por_controle, calcular_vendas_agrupadas, concatenar_vendas
+
+# Resumo de vendas: as tabelas agregadas de uma base de vendas, sem as vendas
+# item a item. É usado para origens grandes demais para a memória (acima de
+# BYTES_LEITURA_EM_BLOCOS): o CSV é lido em blocos, cada bloco é resumido e
+# descartado, e os resumos parciais são combinados.
+#   "df_vendas_agrupado":    vendas agrupadas por controle
+#   "df_produtos_totais":    quantidade e valor total por produto
+#   "df_vendas_produto_dia": quantidade vendida por dia e produto (Data, ProCod,
+#                            Quantidade), de onde sai o giro de venda
+#   "linhas_vendas":         quantidade de linhas de vendas resumidas
+
+# Quantidade de resumos parciais acumulados antes de combiná-los em um só
+RESUMOS_POR_COMBINACAO = 16
+
+COLUNAS_SOMADAS_VENDA = ["TotalVenda", "QuantidadeItens"]
+
+def _vendas_produto_dia(df_vendas: pd.DataFrame) -> pd.DataFrame:
+    """Quantidade vendida por dia e produto; pares sem quantidade válida ficam de fora, como no giro."""
+    quantidade = pd.to_numeric(df_vendas["Quantidade"], errors="coerce")
+    return (
+        quantidade.groupby([df_vendas["Data"].dt.normalize(), df_vendas["ProCod"]], sort=False)
+          .sum(min_count=1)
+          .dropna()
+          .reset_index()
+    )
+
+def resumir_vendas(df_vendas: pd.DataFrame) -> Dict[str, object]:
+    """Resume um DataFrame de vendas (por exemplo, um bloco do CSV)."""
+    return {
+        "df_vendas_agrupado": agrupar_vendas_por_controle(df_vendas),
+        "df_produtos_totais": calcular_vendas_agrupadas(df_vendas),
+        "df_vendas_produto_dia": _vendas_produto_dia(df_vendas),
+        "linhas_vendas": len(df_vendas),
+    }
+
+def _combinar_vendas_agrupadas(partes: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Combina vendas agrupadas de resumos diferentes. Vendas com itens em mais de
+    um resumo (divididas entre dois blocos) têm o total e a quantidade de itens
+    somados, e os campos de cabeçalho vêm da primeira parte com valor não nulo,
+    como no agrupamento por controle.
+    """
+    agrupado = concatenar_vendas(partes)
+
+    repetidos = agrupado["Controle"].duplicated(keep=False).to_numpy()
+    if repetidos.any():
+        grupos = agrupado[repetidos].groupby("Controle", sort=False)
+        reagrupadas = grupos.first().assign(**grupos[COLUNAS_SOMADAS_VENDA].sum())
+        agrupado = concatenar_vendas([agrupado[~repetidos], reagrupadas.reset_index()[list(agrupado.columns)]])
+
+    if not agrupado["Controle"].is_monotonic_increasing:
+        agrupado = agrupado.sort_values("Controle", ignore_index=True)
+    return agrupado
+
+def combinar_resumos(resumos: List[Dict[str, object]]) -> Dict[str, object]:
+    """Combina resumos de vendas na ordem em que as vendas foram lidas."""
+    if len(resumos) == 1:
+        return resumos[0]
+
+    return {
+        "df_vendas_agrupado": _combinar_vendas_agrupadas([r["df_vendas_agrupado"] for r in resumos]),
+        "df_produtos_totais": (
+            pd.concat([r["df_produtos_totais"] for r in resumos])
+              .groupby("ProCod", as_index=False)[["Quantidade", "TotalItem"]]
+              .sum()
+        ),
+        "df_vendas_produto_dia": (
+            pd.concat([r["df_vendas_produto_dia"] for r in resumos])
+              .groupby(["Data", "ProCod"], as_index=False)["Quantidade"]
+              .sum()
+        ),
+        "linhas_vendas": sum(r["linhas_vendas"] for r in resumos),
+    }
+
+def resumir_em_blocos(blocos: Iterable[pd.DataFrame]) -> Dict[str, object]:
+    """
+    Resume as vendas bloco a bloco. Em memória ficam apenas o bloco atual e os
+    resumos, combinados a cada RESUMOS_POR_COMBINACAO blocos.
+    """
+    resumos: List[Dict[str, object]] = []
+    for bloco in blocos:
+        resumos.append(resumir_vendas(bloco))
+        if len(resumos) >= RESUMOS_POR_COMBINACAO:
+            resumos = [combinar_resumos(resumos)]
+
+    if not resumos:
+        raise ValueError("Nenhuma linha de vendas encontrada.")
+    return combinar_resumos(resumos)
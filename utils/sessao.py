@@ -1,21 +1,93 @@
 import streamlit as st
 import traceback
 import pandas as pd
-from typing import Optional, Callable, Tuple
+from typing import Optional, Callable, Dict, Tuple
 from utils.caminho import (
     caminho_valido,
+    origem_vendas_valida,
 )
 from utils.constantes import (
     CAMINHO_PADRAO_VENDAS,
     CAMINHO_PADRAO_CADASTRO,
+    PREAQUECER_DADOS,
 )
+from utils.instrumentacao import iniciar_coleta
+from utils.preaquecimento import estado_preaquecimento, iniciar_preaquecimento
+from utils.registro import atualizar_vendas_compartilhadas, versao_vendas_em_memoria
+
+DATAFRAMES_DA_SESSAO = ("df_vendas", "df_vendas_agrupado", "df_produtos_totais", "df_cadastro")
 
 def inicializar_app():
+    # As etapas medidas a partir daqui são as desta execução da página (painel de desempenho)
+    iniciar_coleta()
     if "inicializado" not in st.session_state:
         st.session_state["inicializado"] = True
         st.session_state["caminho_vendas"] = CAMINHO_PADRAO_VENDAS
         st.session_state["caminho_cadastro"] = CAMINHO_PADRAO_CADASTRO
         print("⚙️ App inicializado.")
+        preaquecer_dados()
+    verificar_vendas_novas()
+
+def verificar_vendas_novas() -> None:
+    """
+    Uma vez por execução da página: anexa à base compartilhada as vendas novas
+    da origem configurada, se a base já estiver em memória (a primeira leitura
+    fica com o pré-aquecimento ou com a página), e descarta as referências da
+    sessão a uma versão anterior dos dados.
+    """
+    caminho = st.session_state.get("caminho_vendas")
+    if not origem_vendas_valida(caminho) or versao_vendas_em_memoria(caminho) is None:
+        return
+
+    try:
+        atualizar_vendas_compartilhadas(caminho)
+    except Exception:
+        # A página segue com a base atual; o erro aparece ao atualizar pela página de arquivos
+        traceback.print_exc()
+        return
+
+    versao = versao_vendas_em_memoria(caminho)
+    if st.session_state.get("versao_vendas") != versao:
+        descartar_dfs_da_sessao()
+        st.session_state["versao_vendas"] = versao
+
+def preaquecer_dados() -> None:
+    """Inicia, em segundo plano, o pré-aquecimento dos arquivos configurados na sessão."""
+    if PREAQUECER_DADOS:
+        iniciar_preaquecimento(st.session_state.get("caminho_vendas"), st.session_state.get("caminho_cadastro"))
+
+def _desenhar_preaquecimento(estado: Dict[str, object]) -> None:
+    if estado["erro"]:
+        st.error(f"❌ Falha ao preparar os dados: {estado['erro']}")
+        return
+    st.progress(
+        estado["concluidas"] / estado["total"],
+        text=f"⏳ {estado['etapa']}... ({estado['concluidas']}/{estado['total']})" if estado["ativo"] else "✅ Dados prontos.",
+    )
+
+def mostrar_preaquecimento(intervalo: float = 0.5) -> None:
+    """
+    Exibe o progresso do pré-aquecimento dos arquivos configurados. Enquanto
+    ele estiver em andamento, apenas a barra é redesenhada a cada `intervalo`
+    segundos (um fragmento, sem prender a execução da página); ao terminar, a
+    página é executada de novo uma vez, já com os dados prontos.
+    """
+    caminhos = (st.session_state.get("caminho_vendas"), st.session_state.get("caminho_cadastro"))
+    estado = estado_preaquecimento(*caminhos)
+    if estado is None:
+        return
+    if not estado["ativo"]:
+        _desenhar_preaquecimento(estado)
+        return
+
+    @st.fragment(run_every=intervalo)
+    def progresso() -> None:
+        atual = estado_preaquecimento(*caminhos)
+        if atual is not estado or not atual["ativo"]:
+            st.rerun(scope="app")
+        _desenhar_preaquecimento(estado)
+
+    progresso()
 
 def carregar_arquivo_na_sessao(
     nome_chave: str,
@@ -53,11 +125,39 @@ def df_em_cache(nome_df: str) -> bool:
     df = st.session_state.get(nome_df)
     return isinstance(df, pd.DataFrame) and not df.empty
 
+def descartar_dfs_da_sessao() -> None:
+    """Remove da sessão as referências aos DataFrames, para que sejam obtidos novamente do registro."""
+    for chave in DATAFRAMES_DA_SESSAO:
+        st.session_state.pop(chave, None)
+
+def atualizar_vendas() -> Optional[Tuple[int, int]]:
+    """
+    Anexa à base compartilhada as vendas novas da origem configurada (arquivos
+    novos no diretório ou linhas novas no final do arquivo), sem recarregar o
+    que já foi lido. Retorna a quantidade de linhas antes e depois.
+    """
+    caminho = st.session_state.get("caminho_vendas")
+    if not origem_vendas_valida(caminho):
+        st.error(f"❌ Arquivo de vendas não encontrado: {caminho}")
+        return None
+
+    try:
+        with st.spinner("Verificando vendas novas..."):
+            linhas = atualizar_vendas_compartilhadas(caminho)
+    except Exception as e:
+        st.error(f"❌ Erro ao atualizar as vendas: {e}")
+        traceback.print_exc()
+        return None
+
+    descartar_dfs_da_sessao()
+    preaquecer_dados()
+    return linhas
+
 def salvar_caminhos(
     caminho_vendas: str = CAMINHO_PADRAO_VENDAS,
     caminho_cadastro: str = CAMINHO_PADRAO_CADASTRO
 ) -> bool:
-    if not caminho_valido(caminho_vendas):
+    if not origem_vendas_valida(caminho_vendas):
         st.error(f"❌ Arquivo de vendas não encontrado: {caminho_vendas}")
         return False
 
@@ -65,11 +165,15 @@ def salvar_caminhos(
         st.error(f"❌ Arquivo de cadastro não encontrado: {caminho_cadastro}")
         return False
 
-    st.cache_data.clear()
-    st.cache_resource.clear()
+    # O registro compartilhado identifica cada arquivo por caminho + assinatura,
+    # e os caches das páginas usam a versão dos dados como chave; então basta
+    # descartar as referências desta sessão para que os novos arquivos sejam
+    # usados, sem derrubar o cache dos demais usuários.
+    descartar_dfs_da_sessao()
 
     st.session_state["caminho_vendas"] = caminho_vendas
     st.session_state["caminho_cadastro"] = caminho_cadastro
+    preaquecer_dados()
 
     return True
 
@@ -77,6 +181,10 @@ def validar_df(nome: str, carregador: callable) -> pd.DataFrame:
     """
     Valida e retorna um DataFrame do session_state.
     Se não estiver carregado, tenta carregar com a função fornecida.
+
+    O DataFrame retornado é o mesmo objeto compartilhado entre as sessões (sem
+    cópia). Com copy-on-write, filtros e seleções geram visões baratas; para
+    alterar colunas, use `df.assign(...)` em vez de atribuição in-place.
     """
     if nome not in st.session_state:
         carregador()
@@ -86,4 +194,4 @@ def validar_df(nome: str, carregador: callable) -> pd.DataFrame:
         st.error(f"❌ O DataFrame '{nome}' não está disponível ou está vazio.")
         st.stop()
 
-    return df.copy()
\ No newline at end of file
+    return df
\ No newline at end of file
@@ -0,0 +1,60 @@
+import os
+import glob
+import hashlib
+import tempfile
+import pandas as pd
+from typing import Optional
+from utils.caminho import assinatura_arquivo
+from utils.constantes import DIRETORIO_SNAPSHOTS, VERSAO_SNAPSHOT
+
+def _prefixo_snapshot(caminho_csv: str) -> str:
+    """Prefixo comum a todos os snapshots de um mesmo arquivo de origem."""
+    nome_base = os.path.splitext(os.path.basename(caminho_csv))[0]
+    id_origem = hashlib.sha1(os.path.abspath(caminho_csv).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(DIRETORIO_SNAPSHOTS, f"{nome_base}-{id_origem}-")
+
+def caminho_snapshot(caminho_csv: str) -> str:
+    """Caminho do snapshot Parquet correspondente ao estado atual do CSV."""
+    return f"{_prefixo_snapshot(caminho_csv)}v{VERSAO_SNAPSHOT}-{assinatura_arquivo(caminho_csv)}.parquet"
+
+def carregar_snapshot(caminho_csv: str) -> Optional[pd.DataFrame]:
+    """
+    Retorna o DataFrame salvo no snapshot do CSV, se existir um válido.
+    Qualquer alteração no arquivo de origem (tamanho ou data de modificação)
+    muda a assinatura e invalida o snapshot anterior.
+    """
+    caminho = caminho_snapshot(caminho_csv)
+    if not os.path.isfile(caminho):
+        return None
+
+    try:
+        return pd.read_parquet(caminho)
+    except Exception as e:
+        print(f"⚠️ Snapshot inválido ignorado ({caminho}): {e}")
+        return None
+
+def salvar_snapshot(df: pd.DataFrame, caminho_csv: str) -> None:
+    """Grava o snapshot do CSV e remove os snapshots obsoletos do mesmo arquivo."""
+    caminho = caminho_snapshot(caminho_csv)
+    temporario = None
+
+    # Arquivo temporário de nome único: gravações simultâneas do mesmo snapshot
+    # (sessões ou processos diferentes) não se sobrescrevem antes da troca
+    try:
+        os.makedirs(DIRETORIO_SNAPSHOTS, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=DIRETORIO_SNAPSHOTS, suffix=".tmp", delete=False) as arquivo:
+            temporario = arquivo.name
+            df.to_parquet(arquivo, index=False)
+        os.replace(temporario, caminho)
+    except Exception as e:
+        print(f"⚠️ Não foi possível salvar o snapshot ({caminho}): {e}")
+        if temporario and os.path.exists(temporario):
+            os.remove(temporario)
+        return
+
+    for antigo in glob.glob(f"{glob.escape(_prefixo_snapshot(caminho_csv))}*.parquet"):
+        if antigo != caminho:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
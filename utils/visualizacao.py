@@ -1,15 +1,110 @@
+import numpy as np
 import streamlit as st
 import pandas as pd
+from typing import Dict, Optional, Tuple
+from utils.exportacao import FORMATOS_EXPORTACAO, exportar_temporario
+from utils.instrumentacao import instrumentar
 
 LINHAS_POR_PAGINA = 100
 
-def mostrar_paginado(df: pd.DataFrame, nome_df: str, linhas_por_pagina: int = LINHAS_POR_PAGINA):
-    """Exibe DataFrame com paginação e botão de download."""
+SEM_ORDENACAO = "(sem ordenação)"
+SEM_FILTRO = "(sem filtro)"
+
+@instrumentar()
+def posicoes_consulta(
+    df: pd.DataFrame,
+    coluna_ordem: Optional[str] = None,
+    crescente: bool = True,
+    coluna_filtro: Optional[str] = None,
+    texto_filtro: str = "",
+) -> np.ndarray:
+    """
+    Posições das linhas de `df` que contêm `texto_filtro` na coluna de filtro
+    (sem diferenciar maiúsculas), na ordem da coluna de ordenação. A página
+    exibida é uma fatia dessas posições, sem reordenar ou copiar o DataFrame.
+    """
+    posicoes = np.arange(len(df))
+
+    if coluna_filtro and texto_filtro:
+        valores = df[coluna_filtro]
+        if isinstance(valores.dtype, pd.CategoricalDtype):
+            # Compara só as categorias e expande pelos códigos (-1 = nulo, sem correspondência)
+            categorias = valores.cat.categories.astype(str).str.contains(texto_filtro, case=False, regex=False)
+            mascara = np.append(np.asarray(categorias, dtype=bool), False)[valores.cat.codes.to_numpy()]
+        else:
+            mascara = valores.astype(str).str.contains(texto_filtro, case=False, regex=False).to_numpy(dtype=bool)
+        posicoes = posicoes[mascara]
+
+    if coluna_ordem:
+        chave = df[coluna_ordem].take(posicoes).reset_index(drop=True)
+        ordem = chave.sort_values(ascending=crescente, kind="stable", na_position="last").index.to_numpy()
+        posicoes = posicoes[ordem]
+
+    return posicoes
+
+@st.cache_resource(max_entries=8)
+def _posicoes_consulta_cache(
+    chave_dados: str,
+    nome_df: str,
+    consulta: Tuple[Optional[str], bool, Optional[str], str],
+    _df: pd.DataFrame,
+) -> np.ndarray:
+    return posicoes_consulta(_df, *consulta)
+
+# Arquivos exportados ficam em disco; ao sair do cache, o diretório temporário é removido
+@st.cache_resource(max_entries=2, show_spinner="Gerando arquivo...")
+def _arquivo_exportado_cache(
+    chave_dados: str,
+    nome_df: str,
+    consulta: Tuple[Optional[str], bool, Optional[str], str],
+    formato: str,
+    _df: pd.DataFrame,
+    _posicoes: np.ndarray,
+) -> Dict[str, object]:
+    return exportar_temporario(_df, formato, nome_df, _posicoes)
+
+def mostrar_paginado(
+    df: pd.DataFrame,
+    nome_df: str,
+    linhas_por_pagina: int = LINHAS_POR_PAGINA,
+    chave_dados: Optional[str] = None,
+):
+    """
+    Exibe DataFrame com paginação, ordenação e filtro feitos no servidor e
+    exportação (CSV ou Parquet) gerada apenas sob demanda.
+
+    Com `chave_dados` (versão dos dados), as posições da consulta e o arquivo
+    exportado ficam em cache até os dados mudarem.
+    """
     if df is None or df.empty:
         st.info(f"O DataFrame '{nome_df}' está vazio ou não foi carregado.")
         return
 
-    total_linhas = len(df)
+    # ---------------- ORDENAÇÃO E FILTRO ----------------
+    colunas = list(df.columns)
+    col_ordem, col_sentido, col_filtro, col_texto = st.columns(4)
+    coluna_ordem = col_ordem.selectbox("Ordenar por", [SEM_ORDENACAO] + colunas, key=f"ordem_{nome_df}")
+    crescente = col_sentido.radio("Sentido", ["Crescente", "Decrescente"], horizontal=True, key=f"sentido_{nome_df}") == "Crescente"
+    coluna_filtro = col_filtro.selectbox("Filtrar coluna", [SEM_FILTRO] + colunas, key=f"filtro_{nome_df}")
+    texto_filtro = col_texto.text_input("Contém", key=f"texto_{nome_df}").strip()
+
+    consulta = (
+        None if coluna_ordem == SEM_ORDENACAO else coluna_ordem,
+        crescente,
+        None if coluna_filtro == SEM_FILTRO else coluna_filtro,
+        texto_filtro,
+    )
+    if chave_dados is None:
+        posicoes = posicoes_consulta(df, *consulta)
+    else:
+        posicoes = _posicoes_consulta_cache(chave_dados, nome_df, consulta, df)
+
+    total_linhas = len(posicoes)
+    if total_linhas == 0:
+        st.info("Nenhuma linha corresponde ao filtro.")
+        return
+
+    # ---------------- PÁGINA ----------------
     num_paginas = (total_linhas - 1) // linhas_por_pagina + 1
 
     pagina = st.number_input(
@@ -18,19 +113,44 @@ def mostrar_paginado(df: pd.DataFrame, nome_df: str, linhas_por_pagina: int = LI
         max_value=num_paginas,
         value=1,
         step=1,
-        key=f"pagina_{nome_df}"
+        # Uma nova consulta volta para a primeira página
+        key=f"pagina_{nome_df}_{abs(hash(consulta))}"
     )
 
     inicio = (pagina - 1) * linhas_por_pagina
     fim = inicio + linhas_por_pagina
-    st.dataframe(df.iloc[inicio:fim], use_container_width=True)
+    st.dataframe(df.take(posicoes[inicio:fim]), use_container_width=True)
     st.caption(f"Exibindo linhas {inicio + 1} a {min(fim, total_linhas)} de {total_linhas}.")
 
-    csv = df.to_csv(index=False).encode("utf-8")
+    # ---------------- EXPORTAÇÃO ----------------
+    # O arquivo só é gerado quando solicitado, e não a cada troca de página
+    col_formato, col_preparar = st.columns([3, 1])
+    formato = col_formato.radio("Formato do arquivo", list(FORMATOS_EXPORTACAO), horizontal=True, key=f"formato_{nome_df}")
+    pedido = (chave_dados, consulta, formato)
+
+    if col_preparar.button("⚙️ Preparar arquivo", key=f"preparar_{nome_df}"):
+        st.session_state[f"exportacao_{nome_df}"] = pedido
+
+    if st.session_state.get(f"exportacao_{nome_df}") != pedido:
+        return
+
+    if chave_dados is None:
+        with st.spinner("Gerando arquivo..."):
+            arquivo = exportar_temporario(df, formato, nome_df, posicoes)
+    else:
+        arquivo = _arquivo_exportado_cache(chave_dados, nome_df, consulta, formato, df, posicoes)
+
+    # O arquivo só é lido no clique do download, e não enviado a cada execução da página
+    def conteudo() -> bytes:
+        with open(arquivo["caminho"], "rb") as dados:
+            return dados.read()
+
+    extensao = FORMATOS_EXPORTACAO[formato]["extensao"]
     st.download_button(
-        label=f"📥 Baixar CSV completo ({nome_df})",
-        data=csv,
-        file_name=f"{nome_df}.csv",
-        mime="text/csv",
-        key=f"download_{nome_df}"
+        label=f"📥 Baixar {formato} ({nome_df}, {total_linhas} linhas, {arquivo['tamanho'] / 1024 ** 2:.1f} MB)",
+        data=conteudo,
+        file_name=f"{nome_df}.{extensao}",
+        mime=FORMATOS_EXPORTACAO[formato]["mime"],
+        key=f"download_{nome_df}",
+        on_click="ignore",
     )